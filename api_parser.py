@@ -1,12 +1,21 @@
 # api_parser.py
 import asyncio
+import hashlib
+import math
 import re
-from bs4 import BeautifulSoup
+from contextlib import aclosing
 import aiohttp
-from typing import List, Dict, Optional
+from typing import AsyncIterator, Callable, List, Dict, Optional, Tuple
 import json
-from datetime import datetime
-import aiofiles
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from application import Application, ApplicationIndex
+from metrics import registry as metrics
+from response_cache import ResponseCache
+from rate_limiter import AdaptiveRateLimiter
 
 # --- Классы исключений и вспомогательные функции (без изменений) ---
 class APIError(Exception):
@@ -32,142 +41,448 @@ def _parse_delay_from_message(message: str) -> Optional[int]:
         except (ValueError, IndexError): return None
     return None
 
-LOG_FILE = 'debug_log.txt'
-log_lock = asyncio.Lock()
+# Куда и на каком уровне писать, настраивает logging_setup (main); без него записи отбрасываются
+logger = logging.getLogger('pageparser.api')
+logger.addHandler(logging.NullHandler())
+
+API_BASE_URL = "http://abit-poisk.org.ua"
+API_PATH = "/api/statements/"
+API_URL = API_BASE_URL + API_PATH
+PARSER_BACKENDS = ('bs4', 'lxml')
+PARSE_EXECUTORS = ('process', 'thread')
+# 'browser' — заголовки браузера и nocache, как раньше; 'tuned' — см. TUNED_HEADERS и _decode_tuned
+TRANSPORT_MODES = ('browser', 'tuned')
+# Чем режим 'tuned' разбирает JSON; orjson — необязательная зависимость
+JSON_DECODERS = ('json', 'orjson')
+
+class ApiClient:
+    """
+    Долгоживущий HTTP-клиент к abit-poisk с пулом keep-alive соединений.
+
+    Создаётся один раз на весь прогон (в main_async_logic) и передаётся во все
+    fetch_applications_html, чтобы повторы и страницы пагинации переиспользовали
+    уже открытые TCP-соединения вместо нового рукопожатия на каждый POST.
+    """
+    def __init__(self, api_url: str = API_URL, limit: int = 100, limit_per_host: int = 0,
+                 dns_cache_ttl: int = 300, keepalive_timeout: float = 30, request_timeout: float = 30,
+                 parser_backend: str = 'bs4', parse_workers: int = 0, parse_executor: str = 'process',
+                 cache: Optional[ResponseCache] = None, transport: str = 'browser', json_decoder: str = 'json'):
+        if parser_backend not in PARSER_BACKENDS:
+            raise ValueError(f"Неизвестный parser_backend '{parser_backend}'. Допустимые значения: {', '.join(PARSER_BACKENDS)}")
+        if parse_executor not in PARSE_EXECUTORS:
+            raise ValueError(f"Неизвестный parse_executor '{parse_executor}'. Допустимые значения: {', '.join(PARSE_EXECUTORS)}")
+        if transport not in TRANSPORT_MODES:
+            raise ValueError(f"Неизвестный transport_mode '{transport}'. Допустимые значения: {', '.join(TRANSPORT_MODES)}")
+        if json_decoder not in JSON_DECODERS:
+            raise ValueError(f"Неизвестный json_decoder '{json_decoder}'. Допустимые значения: {', '.join(JSON_DECODERS)}")
+        self.api_url = api_url
+        self.transport = transport
+        self.json_loads = _json_loads(json_decoder)
+        self.parser_backend = parser_backend
+        self.parse_workers = parse_workers
+        self.parse_executor = parse_executor
+        self.executor: Optional[Executor] = None
+        self.cache = cache
+        # Запросы, которые уже выполняются: одинаковые поиски ждут один общий результат
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.merged_queries = 0
+        # Досрочно остановленная пагинация (fetch_applications с stop_when)
+        self.early_exits = 0
+        self.pages_avoided = 0
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'ApiClient':
+        concurrent = config.get("concurrent_requests", 5)
+        # api_base_url позволяет направить прогон на локальную заглушку (benchmarks/stub_server.py)
+        base_url = config.get("api_base_url", API_BASE_URL)
+        return cls(
+            api_url=base_url.rstrip('/') + API_PATH,
+            limit=config.get("connection_limit", max(concurrent, 100)),
+            limit_per_host=config.get("connection_limit_per_host", concurrent),
+            dns_cache_ttl=config.get("dns_cache_ttl", 300),
+            keepalive_timeout=config.get("keepalive_timeout", 30),
+            parser_backend=config.get("parser_backend", "bs4"),
+            parse_workers=config.get("parse_workers", 0),
+            parse_executor=config.get("parse_executor", "process"),
+            cache=ResponseCache.from_config(config),
+            transport=config.get("transport_mode", "browser"),
+            json_decoder=config.get("json_decoder", "json"),
+        )
+
+    async def __aenter__(self) -> 'ApiClient':
+        # Коннектор должен создаваться внутри работающего event loop
+        connector = aiohttp.TCPConnector(
+            ssl=False,
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+        )
+        if self.parse_workers > 0:
+            self.executor = self._create_executor()
+        return self
+
+    def _create_executor(self) -> Executor:
+        # Процессы дают настоящий параллелизм для CPU-парсинга; если их нельзя
+        # создать (ограниченная среда, нет sem_open), работаем на потоках.
+        if self.parse_executor == 'process':
+            try:
+                return ProcessPoolExecutor(max_workers=self.parse_workers)
+            except (OSError, NotImplementedError, ImportError) as e:
+                print(f"⚠️ Не вдалося створити пул процесів для парсингу ({e}). Використовую пул потоків.")
+        return ThreadPoolExecutor(max_workers=self.parse_workers, thread_name_prefix='parse')
 
-async def log_to_file(content: str):
-    async with log_lock:
+    @metrics.timed('parse')
+    async def parse(self, html_content: str) -> List[Application]:
+        """Разбирает страницу в пуле воркеров (или прямо в loop, если parse_workers == 0)."""
+        if self.executor is None:
+            return parse_applications(html_content, self.parser_backend)
+        loop = asyncio.get_running_loop()
         try:
-            async with aiofiles.open(LOG_FILE, mode='a', encoding='utf-8') as f:
-                await f.write(content)
-        except Exception as e:
-            print(f"!!! Критическая ошибка записи в лог-файл: {e}")
-
-# --- ИЗМЕНЕНИЕ 1: НАХУЙ ГЛОБАЛЬНУЮ СЕССИЮ! УНИЧТОЖАЕМ УЛИКИ! ---
-# AIOHTTP_SESSION = None  <--- УБРАНО НАХУЙ
-# async def get_session(): ... <--- УБРАНО НАХУЙ
-# async def close_session(): ... <--- УБРАНО НАХУЙ
-
-async def fetch_applications_html(search_query: str, semaphore: asyncio.Semaphore) -> Optional[str]:
-    api_url = "http://abit-poisk.org.ua/api/statements/"
-    headers = {
-        'Host': 'abit-poisk.org.ua',
-        'Sec-Ch-Ua-Platform': '"macOS"',
-        'X-Requested-With': 'XMLHttpRequest',
-        'Accept-Language': 'ru-RU,ru;q=0.9',
-        'Sec-Ch-Ua': '"Chromium";v="139", "Not;A=Brand";v="99"',
-        'Content-Type': 'application/x-www-form-urlencoded',
-        'Sec-Ch-Ua-Mobile': '?0',
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36',
-        'Accept': '*/*',
-        'Origin': 'http://abit-poisk.org.ua',
-        'Sec-Fetch-Site': 'same-origin',
-        'Sec-Fetch-Mode': 'cors',
-        'Sec-Fetch-Dest': 'empty',
-        'Referer': 'http://abit-poisk.org.ua/',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Priority': 'u=1, i',
-        'Connection': 'keep-alive'
-    }
-    payload = {'search': search_query, 'offset': 0}
-    all_html_parts = []
-    
-    # session = await get_session() # <--- ЭТОЙ ХУЙНИ БОЛЬШЕ НЕТ
-
-    RETRY_DELAY = 20
-    MAX_RETRIES = 5
-    previous_count = -1
+            return await loop.run_in_executor(self.executor, parse_applications, html_content, self.parser_backend)
+        except BrokenProcessPool:
+            # Воркер упал (OOM/kill) — пересоздаём пул на потоках и пробуем ещё раз
+            print("⚠️ Пул процесів парсингу зламався. Переключаюсь на пул потоків.")
+            broken, self.parse_executor = self.executor, 'thread'
+            self.executor = self._create_executor()
+            broken.shutdown(wait=False)
+            return await loop.run_in_executor(self.executor, parse_applications, html_content, self.parser_backend)
 
-    while True:
-        data = None
-        is_successful_request = False
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        if self.cache is not None:
+            self.cache.close()
+
+    def cache_summary(self) -> str:
+        """Строка для итоговой сводки: попадания в дисковый кэш, объединённые запросы, сэкономленные страницы."""
+        parts = [f"об'єднано однакових запитів: {self.merged_queries}",
+                 f"достроково зупинено пагінацію: {self.early_exits} разів, не запитано сторінок: {self.pages_avoided}"]
+        if self.cache is not None:
+            c = self.cache
+            parts.insert(0, f"кеш сторінок: {c.hits} влучань / {c.misses} промахів ({c.hit_rate():.0%}), "
+                            f"прострочено {c.expired}, витіснено {c.evictions}")
+        return "; ".join(parts)
+
+BROWSER_HEADERS = {
+    'Host': 'abit-poisk.org.ua',
+    'Sec-Ch-Ua-Platform': '"macOS"',
+    'X-Requested-With': 'XMLHttpRequest',
+    'Accept-Language': 'ru-RU,ru;q=0.9',
+    'Sec-Ch-Ua': '"Chromium";v="139", "Not;A=Brand";v="99"',
+    'Content-Type': 'application/x-www-form-urlencoded',
+    'Sec-Ch-Ua-Mobile': '?0',
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36',
+    'Accept': '*/*',
+    'Origin': 'http://abit-poisk.org.ua',
+    'Sec-Fetch-Site': 'same-origin',
+    'Sec-Fetch-Mode': 'cors',
+    'Sec-Fetch-Dest': 'empty',
+    'Referer': 'http://abit-poisk.org.ua/',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Priority': 'u=1, i',
+    'Connection': 'keep-alive'
+}
+
+# Режим 'tuned': только то, что нужно API. Accept-Encoding не задаём — aiohttp сам предлагает
+# ровно те кодировки, которые умеет распаковать (gzip, deflate и br, если установлен brotli);
+# браузерный набор обещает br всегда, и сжатый так ответ без brotli не прочитать.
+# Content-Type для формы и Host aiohttp тоже ставит сам.
+TUNED_HEADERS = {
+    'X-Requested-With': 'XMLHttpRequest',
+    'Accept': 'application/json',
+    'User-Agent': BROWSER_HEADERS['User-Agent'],
+}
+
+# Пустая выдача узнаётся по началу тела, без разбора JSON (кавычка не экранирована — не внутри строки)
+_SUCCESS_HEAD_RE = re.compile(rb'(?<!\\)"success"\s*:\s*true\b')
+_ZERO_COUNT_HEAD_RE = re.compile(rb'(?<!\\)"count"\s*:\s*0\s*[,}]')
+_HEAD_BYTES = 256
+
+RETRY_DELAY = 20  # потолок экспоненциальной задержки между повторами
+MAX_RETRIES = 5
+
+
+async def _fetch_page(search_query: str, offset: int, limiter: AdaptiveRateLimiter, client: ApiClient) -> Dict:
+    """Запрашивает одну страницу выдачи с повторами и возвращает разобранный JSON-ответ."""
+    if client.cache is not None:
+        cached = client.cache.get(search_query, offset)
+        if cached is not None:
+            metrics.inc('pages', source='cache')
+            return cached
+
+    api_url = client.api_url
+    tuned = client.transport == 'tuned'
+    headers = TUNED_HEADERS if tuned else BROWSER_HEADERS
+    payload = {'search': search_query, 'offset': offset}
+    last_exception = None
+
+    attempt = 0
+    while attempt < MAX_RETRIES:
         last_exception = None
-        
-        attempt = 0
-        while attempt < MAX_RETRIES:
-            last_exception = None
-            log_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')
-            log_parts = [f"\n{'='*120}\n", f"TRANSACTION AT: {log_timestamp} | Search: '{search_query}' | Offset: {payload.get('offset')} | Attempt: {attempt + 1}/{MAX_RETRIES}\n"]
-            
-            try:
-                text_response, status_code, reason, response_headers = "", 0, "", {}
-                async with semaphore:
-                    log_parts.extend([f"{'-'*55} REQUEST {'-'*56}\n", f"URL: {api_url}\n", f"Headers: {json.dumps(headers, indent=2, ensure_ascii=False)}\n", f"Payload Body: {json.dumps(payload, indent=2, ensure_ascii=False)}\n"])
-                    params = {'nocache': int(asyncio.get_event_loop().time() * 1000)}
-
-                    # --- ИЗМЕНЕНИЕ 2: СОЗДАЁМ, БЛЯДЬ, НОВУЮ СЕССИЮ ДЛЯ КАЖДОГО ЗАПРОСА! ---
-                    # Каждый запрос - это новый агент-смертник! 💥
-                    connector = aiohttp.TCPConnector(ssl=False)
-                    async with aiohttp.ClientSession(connector=connector) as session:
-                        async with session.post(api_url, headers=headers, params=params, data=payload, timeout=30) as response:
-                            text_response = await response.text()
-                            status_code = response.status
-                            reason = str(response.reason)
-                            response_headers = dict(response.headers)
-                            log_parts.extend([f"{'-'*54} RESPONSE {'-'*55}\n", f"Status: {status_code} {reason}\n", f"Headers: {json.dumps(response_headers, indent=2, ensure_ascii=False)}\n", f"Body:\n{text_response}\n"])
-                            response.raise_for_status()
-
-                # ... (вся остальная логика обработки ответа без изменений) ...
-                if 'max_user_connections' in text_response: raise APIRateLimitError("Обнаружена ошибка 'max_user_connections' в теле ответа.")
-                try: data = json.loads(text_response)
-                except json.JSONDecodeError: raise APIInvalidResponseError(f"Ожидался JSON, но получен невалидный ответ. Начало: {text_response[:150]}")
-                if not data.get('success', False):
-                    error_message = data.get('message', '') or data.get('error', '')
-                    if 'Частота запитів' in error_message: raise APIRateLimitError(f"API сообщил об ограничении: {error_message}")
-                    else: raise APIInvalidResponseError(f"API вернул success=false: {error_message}")
-                if data.get('count', 0) > 0 and not data.get('html'): raise APIInvalidResponseError("API сообщил о наличии результатов, но вернул пустой HTML.")
-                
-                is_successful_request = True
-                await log_to_file("".join(log_parts) + f"{'='*120}\n")
-                break
+        body, status_code = b"", 0
+        started = time.perf_counter()
+
+        try:
+            async with limiter:
+                # Время ожидания лимитера не входит в длительность запроса
+                waited, started = started, time.perf_counter()
+                metrics.observe('limiter_wait', started - waited)
+                # POST и так не кэшируется; уникальный nocache в 'tuned' не нужен
+                params = None if tuned else {'nocache': int(asyncio.get_event_loop().time() * 1000)}
+
+                # Соединение берётся из общего пула клиента (keep-alive)
+                async with client.session.post(api_url, headers=headers, params=params, data=payload) as response:
+                    body = await response.read()
+                    status_code = response.status
+                    encoding = response.get_encoding()
+                    # Полный дамп транзакции только на уровне DEBUG: сериализация заголовков дорогая
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            "transaction query=%r offset=%d attempt=%d url=%s request_headers=%s payload=%s "
+                            "status=%d %s response_headers=%s body=%s",
+                            search_query, offset, attempt + 1, api_url, json.dumps(headers, ensure_ascii=False),
+                            json.dumps(payload, ensure_ascii=False), status_code, response.reason,
+                            json.dumps(dict(response.headers), ensure_ascii=False), _body_text(body))
+                    response.raise_for_status()
+
+            with metrics.timer('decode'):
+                data = _decode_tuned(body, client.json_loads) if tuned else _decode_browser(body, encoding)
+            if not data.get('success', False):
+                error_message = data.get('message', '') or data.get('error', '')
+                if 'Частота запитів' in error_message: raise APIRateLimitError(f"API сообщил об ограничении: {error_message}")
+                else: raise APIInvalidResponseError(f"API вернул success=false: {error_message}")
+            if data.get('count', 0) > 0 and not data.get('html'): raise APIInvalidResponseError("API сообщил о наличии результатов, но вернул пустой HTML.")
             
-            except (aiohttp.ClientError, asyncio.TimeoutError, APIError) as e:
-                last_exception = e
-
-            # ... (вся остальная логика обработки ошибок без изменений) ...
-            if isinstance(last_exception, APIRateLimitError):
-                log_parts.extend([f"{'-'*54} EXCEPTION CAUGHT {'-'*48}\n", f"Error Details: {last_exception}\n"])
-                current_delay = RETRY_DELAY
-                parsed_delay = _parse_delay_from_message(last_exception.message)
-                if parsed_delay is not None: current_delay = parsed_delay + 1
-                log_parts.append(f"INFO: Ошибка лимита запросов. Ожидание {current_delay} сек. Попытка не засчитана.\n")
-                await log_to_file("".join(log_parts) + f"{'='*120}\n")
-                await asyncio.sleep(current_delay)
-            else:
-                attempt += 1
-                log_parts.extend([f"{'-'*54} EXCEPTION CAUGHT {'-'*48}\n", f"Error Details: {last_exception}\n"])
-                if attempt < MAX_RETRIES:
-                    log_parts.append(f"INFO: Произошла ошибка. Повтор через {RETRY_DELAY} сек.\n")
-                    await log_to_file("".join(log_parts) + f"{'='*120}\n")
-                    await asyncio.sleep(RETRY_DELAY)
-                else:
-                    await log_to_file("".join(log_parts) + f"{'='*120}\n")
+            limiter.on_success()
+            elapsed = time.perf_counter() - started
+            metrics.observe('http_request', elapsed)
+            metrics.inc('http_attempts', outcome='ok')
+            metrics.inc('pages', source='network')
+            logger.info("ok query=%r offset=%d attempt=%d status=%d bytes=%d count=%s ms=%.0f",
+                        search_query, offset, attempt + 1, status_code, len(body),
+                        data.get('count'), elapsed * 1000)
+            if client.cache is not None:
+                client.cache.put(search_query, offset, data)
+            return data
         
-        if not is_successful_request:
-            raise last_exception
+        except (aiohttp.ClientError, asyncio.TimeoutError, APIError) as e:
+            last_exception = e
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        metrics.observe('http_request', elapsed_ms / 1000)
+        if isinstance(last_exception, APIRateLimitError):
+            metrics.inc('http_attempts', outcome='rate_limited')
+            # Пауза общая для всех воркеров: лимитер сам придержит следующий acquire
+            parsed_delay = _parse_delay_from_message(last_exception.message)
+            limiter.on_rate_limited(parsed_delay + 1 if parsed_delay is not None else None)
+            logger.warning("rate_limited query=%r offset=%d attempt=%d status=%d ms=%.0f error=%r limiter=%r body=%s",
+                           search_query, offset, attempt + 1, status_code, elapsed_ms, str(last_exception),
+                           limiter.describe(), _body_text(body))
+        else:
+            attempt += 1
+            metrics.inc('http_attempts', outcome='error')
+            limiter.on_error()
+            retry_delay = limiter.backoff(attempt, cap=RETRY_DELAY) if attempt < MAX_RETRIES else None
+            logger.warning("error query=%r offset=%d attempt=%d/%d status=%d ms=%.0f error=%s: %s retry_in=%s body=%s",
+                           search_query, offset, attempt, MAX_RETRIES, status_code, elapsed_ms,
+                           type(last_exception).__name__, last_exception,
+                           f"{retry_delay:.1f}s" if retry_delay is not None else "none", _body_text(body))
+            if retry_delay is not None:
+                with metrics.timer('retry_backoff'):
+                    await asyncio.sleep(retry_delay)
+
+    raise last_exception
+
+
+def _decode_browser(body: bytes, encoding: str) -> Dict:
+    """Режим 'browser': всё тело в строку (как response.text()), затем json.loads."""
+    text_response = body.decode(encoding)
+    if 'max_user_connections' in text_response: raise APIRateLimitError("Обнаружена ошибка 'max_user_connections' в теле ответа.")
+    try: return json.loads(text_response)
+    except json.JSONDecodeError: raise APIInvalidResponseError(f"Ожидался JSON, но получен невалидный ответ. Начало: {text_response[:150]}")
+
 
+def _decode_tuned(body: bytes, loads: Callable[[bytes], object] = json.loads) -> Dict:
+    """
+    Режим 'tuned': тело не переводится в строку отдельным шагом. Сначала смотрится начало
+    ответа — пустая выдача (success и count == 0) возвращается без разбора JSON, — а остальное
+    разбирается прямо из байтов. Маркер 'max_user_connections' ищется только в неуспешных
+    ответах: в невалидном JSON (предупреждение PHP перед телом) и в JSON без success: true.
+    """
+    head = body[:_HEAD_BYTES]
+    if _ZERO_COUNT_HEAD_RE.search(head) and _SUCCESS_HEAD_RE.search(head):
+        return {'success': True, 'count': 0, 'html': ''}
+    try:
+        data = loads(body)
+    except ValueError:
+        if b'max_user_connections' in body: raise APIRateLimitError("Обнаружена ошибка 'max_user_connections' в теле ответа.")
+        raise APIInvalidResponseError(f"Ожидался JSON, но получен невалидный ответ. Начало: {_body_text(body[:150])}")
+    if not isinstance(data, dict) or data.get('success') is not True:
+        if b'max_user_connections' in body: raise APIRateLimitError("Обнаружена ошибка 'max_user_connections' в теле ответа.")
+    if not isinstance(data, dict):
+        raise APIInvalidResponseError(f"Ожидался JSON-объект, получен {type(data).__name__}")
+    return data
+
+
+def _json_loads(decoder: str) -> Callable[[bytes], object]:
+    if decoder == 'orjson':
+        try:
+            import orjson
+            return orjson.loads
+        except ImportError:
+            print("⚠️ json_decoder 'orjson' задано, але orjson не встановлено. Використовую json.")
+    return json.loads
+
+
+def _body_text(body: bytes) -> str:
+    """Тело ответа для логов."""
+    return body.decode('utf-8', errors='replace')
+
+
+async def fetch_first_page(search_query: str, limiter: AdaptiveRateLimiter, client: ApiClient) -> Dict:
+    """Только первая страница выдачи (JSON-ответ как есть): для повторной проверки без полной пагинации."""
+    return await _fetch_page(search_query, 0, limiter, client)
+
+
+def page_digest(html_content: str) -> str:
+    """Короткий отпечаток HTML страницы: меняется, если на ней поменялась хоть одна заявка."""
+    return hashlib.blake2b(html_content.encode('utf-8'), digest_size=8).hexdigest()
+
+
+async def _iter_pages(search_query: str, limiter: AdaptiveRateLimiter, client: ApiClient,
+                      first_page: Optional[Dict] = None) -> AsyncIterator[Tuple[str, List[Application], int]]:
+    """
+    Листает выдачу по offset и отдаёт (html страницы, заявки этой страницы, всего по API).
+
+    Разбирается только новый фрагмент: счётчик строк для следующего offset ведётся
+    нарастающим итогом, без повторного парсинга уже полученного HTML. Сам парсинг
+    уходит в пул воркеров клиента, так что loop продолжает обслуживать остальные запросы.
+    Уже полученная первая страница (`first_page`) повторно не запрашивается.
+    """
+    offset = 0
+    while True:
+        if offset == 0 and first_page is not None:
+            data = first_page
+        else:
+            data = await _fetch_page(search_query, offset, limiter, client)
         if not (data and data.get('success') and data.get('html')):
-            break
-        
-        all_html_parts.append(data['html'])
+            return
+
+        page_apps = await client.parse(data['html'])
         total_count = data.get('count', 0)
-        
-        current_count = len(parse_applications("".join(all_html_parts)))
-        if current_count >= total_count: break
-        
-        if current_count == previous_count and current_count > 0:
-            await log_to_file(f"WARNING: Пагинация застряла для '{search_query}' на смещении {current_count}. Прерываю цикл.\n")
-            break
+        yield data['html'], page_apps, total_count
 
-        previous_count = current_count
-        payload['offset'] = current_count
-        await asyncio.sleep(0.5)
-            
+        if not page_apps:
+            logger.warning("stuck query=%r offset=%d: страница без строк, прерываю пагинацию", search_query, offset)
+            return
+
+        offset += len(page_apps)
+        if offset >= total_count:
+            return
+
+
+async def fetch_applications(search_query: str, limiter: AdaptiveRateLimiter, client: ApiClient,
+                             stop_when: Optional[Callable[[ApplicationIndex], bool]] = None,
+                             first_page: Optional[Dict] = None) -> Optional[ApplicationIndex]:
+    """
+    Возвращает все разобранные заявки по запросу в виде ApplicationIndex (ведёт себя как список).
+
+    None — API не вернул ни одной страницы с HTML; пустой индекс — HTML был, но строк в нём не нашлось.
+    Одновременные одинаковые запросы объединяются: второй ждёт результат первого.
+
+    `stop_when` вызывается с индексом после каждой страницы; как только он вернёт True,
+    остальные страницы не запрашиваются, а у индекса `complete` = False. Такой неполный
+    результат не отдаётся другим запросам, а вот готовую полную выдачу такой запрос
+    переиспользует.
+
+    `first_page` — уже полученный ответ на offset=0 (см. fetch_first_page), чтобы не запрашивать его дважды.
+    """
+    inflight = client.inflight.get(search_query)
+    if inflight is not None:
+        client.merged_queries += 1
+        return await asyncio.shield(inflight)
+    if stop_when is not None:
+        return await _collect_applications(search_query, limiter, client, stop_when, first_page)
+
+    future = asyncio.get_running_loop().create_future()
+    # Ошибку лидера заберут ожидающие; если их нет — не шумим "exception was never retrieved"
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    client.inflight[search_query] = future
+    try:
+        applications = await _collect_applications(search_query, limiter, client, first_page=first_page)
+    except BaseException as e:
+        if isinstance(e, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(e)
+        raise
+    else:
+        future.set_result(applications)
+        return applications
+    finally:
+        del client.inflight[search_query]
+
+
+@metrics.timed('fetch_applications')
+async def _collect_applications(search_query: str, limiter: AdaptiveRateLimiter, client: ApiClient,
+                                stop_when: Optional[Callable[[ApplicationIndex], bool]] = None,
+                                first_page: Optional[Dict] = None) -> Optional[ApplicationIndex]:
+    # Индекс наращивается постранично и общий для всех студентов с этим search_name
+    index: Optional[ApplicationIndex] = None
+    async with aclosing(_iter_pages(search_query, limiter, client, first_page)) as pages:
+        async for html, page_apps, total_count in pages:
+            if index is None:
+                index = ApplicationIndex()
+                # Снимок первой страницы для следующей повторной проверки (main.py recheck)
+                index.total_count = total_count
+                index.first_page_digest = page_digest(html)
+            index.extend(page_apps)
+            if stop_when is not None and page_apps and len(index) < total_count and stop_when(index):
+                index.complete = False
+                client.early_exits += 1
+                metrics.inc('early_exits')
+                client.pages_avoided += math.ceil((total_count - len(index)) / len(page_apps))
+                break
+    return index
+
+
+async def fetch_applications_html(search_query: str, limiter: AdaptiveRateLimiter, client: ApiClient) -> Optional[str]:
+    """Возвращает склеенный HTML всех страниц выдачи (для отладки и внешних потребителей)."""
+    all_html_parts = [html async for html, _, _ in _iter_pages(search_query, limiter, client)]
     return "".join(all_html_parts) if all_html_parts else None
 
 
-def parse_applications(html_content: str) -> List[Dict]:
-    # ... (код парсинга без изменений, он охуенен как есть) ...
+def parse_applications(html_content: str, backend: str = 'bs4') -> List[Application]:
+    """Разбирает HTML выдачи выбранным движком: 'bs4' (BeautifulSoup) или 'lxml' (lxml_parser)."""
+    # Движки импортируются при первом разборе (в воркере пула — в нём самом), а не на старте
+    if backend == 'lxml':
+        from lxml_parser import parse_applications_lxml
+        return parse_applications_lxml(html_content)
+    if backend != 'bs4':
+        raise ValueError(f"Неизвестный парсер '{backend}'. Допустимые значения: {', '.join(PARSER_BACKENDS)}")
+    return _parse_applications_bs4(html_content)
+
+
+def _parse_applications_bs4(html_content: str) -> List[Application]:
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(html_content, 'lxml'); applications = []; base_url = "https://abit-poisk.org.ua"
     table_bodies = soup.find_all('tbody')
     if not table_bodies: return []
@@ -206,6 +521,6 @@ def parse_applications(html_content: str) -> List[Dict]:
                 rank_url_tag = cells[3].find('a'); rank_url = base_url + rank_url_tag.get('href', '') if rank_url_tag else ''
                 university_url_tag = cells[9].find('a'); university_url = base_url + university_url_tag.get('href', '') if university_url_tag else ''
                 application_data = {'degree_level_short': cells[0].find('div').get_text(strip=True), 'degree_level_full': cells[0].get('title', '').strip(),'applicant_name': cells[1].get_text(strip=True), 'status': cells[2].get_text(strip=True),'rank_position': rank_position, 'rank_url': rank_url,'priority': ' '.join(cells[4].get_text(strip=True).split()), 'places': places_info, 'total_score': total_score,'avg_document_score': cells[7].get_text(strip=True), 'score_components': scores, 'coefficients': coefficients,'university_name': cells[9].get_text(strip=True), 'university_url': university_url,'faculty_short': cells[10].get_text(strip=True), 'faculty_full': cells[10].get('title', '').strip(),'specialty_code': specialty_code, 'specialty_name': specialty_name, 'specialization': specialization,'quota': cells[12].get_text(strip=True), 'originals_submitted': cells[13].get_text(strip=True) == '+'}
-                applications.append(application_data)
+                applications.append(Application.from_dict(application_data))
             except Exception: continue
     return applications
\ No newline at end of file
@@ -0,0 +1,289 @@
+# application.py
+"""
+Компактне представлення заяви з API abit-poisk.
+
+Замість словника з 21 ключем і трьома вкладеними словниками — dataclass зі __slots__.
+Назви предметів, ЗВО, факультетів тощо інтернуються, тож тисячі заяв однофамільців
+посилаються на один і той самий рядок. Бали НМТ зберігаються у незмінному
+хешованому FrozenMap — його можна порівнювати, класти в set і використовувати як ключ.
+
+Для сумісності зі старим кодом заява поводиться як словник на читання:
+app['total_score'], app.get('specialty_code'), 'places' in app, dict(app).
+"""
+import heapq
+import math
+import sys
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+_intern = sys.intern
+
+# Однакові набори ключів (предмети НМТ, типи місць) спільні для всіх заяв
+_SHARED_KEYS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+_SHARED_KEYS_LIMIT = 10000
+
+
+def _shared_keys(keys: Tuple[str, ...]) -> Tuple[str, ...]:
+    shared = _SHARED_KEYS.get(keys)
+    if shared is None:
+        shared = tuple(_intern(key) for key in keys)
+        if len(_SHARED_KEYS) < _SHARED_KEYS_LIMIT:
+            _SHARED_KEYS[shared] = shared
+    return shared
+
+
+def _intern_value(value: Any) -> Any:
+    return _intern(value) if type(value) is str else value
+
+
+class FrozenMap(Mapping):
+    """Незмінний хешований словник для малих наборів (бали, коефіцієнти, місця)."""
+
+    __slots__ = ('_keys', '_values', '_hash')
+
+    def __init__(self, keys: Tuple[str, ...] = (), values: Tuple[Any, ...] = ()):
+        self._keys = _shared_keys(tuple(keys))
+        self._values = tuple(_intern_value(value) for value in values)
+        self._hash = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'FrozenMap':
+        return cls(tuple(data), tuple(data.values()))
+
+    def __getitem__(self, key):
+        for own_key, value in zip(self._keys, self._values):
+            if own_key == key:
+                return value
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, FrozenMap) and self._keys is other._keys:
+            return self._values == other._values
+        return Mapping.__eq__(self, other)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(frozenset(zip(self._keys, self._values)))
+        return self._hash
+
+    def __repr__(self) -> str:
+        return f"FrozenMap({dict(zip(self._keys, self._values))!r})"
+
+    def __reduce__(self):
+        # Після розпакування в іншому процесі ключі знову стають спільними
+        return FrozenMap, (self._keys, self._values)
+
+
+@dataclass(slots=True, eq=True)
+class Application:
+    """Одна заява абітурієнта (рядок таблиці з API)."""
+
+    degree_level_short: str
+    degree_level_full: str
+    applicant_name: str
+    status: str
+    rank_position: int
+    rank_url: str
+    priority: str
+    places: FrozenMap
+    total_score: float
+    avg_document_score: str
+    score_components: FrozenMap
+    coefficients: FrozenMap
+    university_name: str
+    university_url: str
+    faculty_short: str
+    faculty_full: str
+    specialty_code: str
+    specialty_name: str
+    specialization: str
+    quota: str
+    originals_submitted: bool
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Application':
+        """Будує заяву зі словника парсера: повторювані рядки інтернуються, вкладені словники заморожуються."""
+        return cls(
+            degree_level_short=_intern(data['degree_level_short']),
+            degree_level_full=_intern(data['degree_level_full']),
+            applicant_name=data['applicant_name'],
+            status=_intern(data['status']),
+            rank_position=data['rank_position'],
+            rank_url=data['rank_url'],
+            priority=_intern(data['priority']),
+            places=FrozenMap.from_dict(data['places']),
+            total_score=data['total_score'],
+            avg_document_score=_intern(data['avg_document_score']),
+            score_components=FrozenMap.from_dict(data['score_components']),
+            coefficients=FrozenMap.from_dict(data['coefficients']),
+            university_name=_intern(data['university_name']),
+            university_url=_intern(data['university_url']),
+            faculty_short=_intern(data['faculty_short']),
+            faculty_full=_intern(data['faculty_full']),
+            specialty_code=_intern(data['specialty_code']),
+            specialty_name=_intern(data['specialty_name']),
+            specialization=_intern(data['specialization']),
+            quota=_intern(data['quota']),
+            originals_submitted=data['originals_submitted'],
+        )
+
+    @property
+    def score_fingerprint(self) -> FrozenMap:
+        """Бали НМТ як незмінний ключ: однакові у всіх заявах одного абітурієнта."""
+        return self.score_components
+
+    def to_dict(self) -> Dict:
+        """Звичайний словник у старому форматі (вкладені словники — теж dict)."""
+        data = {name: getattr(self, name) for name in FIELD_NAMES}
+        for name in ('places', 'score_components', 'coefficients'):
+            data[name] = dict(data[name])
+        return data
+
+    # --- Сумісність зі словником на читання ---
+    def __getitem__(self, key: str):
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in _FIELD_SET else default
+
+    def __contains__(self, key) -> bool:
+        return key in _FIELD_SET
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELD_NAMES)
+
+    def keys(self) -> Tuple[str, ...]:
+        return FIELD_NAMES
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return ((name, getattr(self, name)) for name in FIELD_NAMES)
+
+    def __reduce__(self):
+        # Компактніше за стан зі слотами; рядки інтернуються вже в процесі-отримувачі
+        return _restore_application, (tuple(getattr(self, name) for name in FIELD_NAMES),)
+
+
+FIELD_NAMES: Tuple[str, ...] = tuple(field.name for field in fields(Application))
+_FIELD_SET = frozenset(FIELD_NAMES)
+_INTERNED_FIELDS = frozenset((
+    'degree_level_short', 'degree_level_full', 'status', 'priority', 'avg_document_score', 'university_name',
+    'university_url', 'faculty_short', 'faculty_full', 'specialty_code', 'specialty_name', 'specialization', 'quota',
+))
+
+
+def _restore_application(values: Tuple) -> Application:
+    return Application(*(
+        _intern(value) if name in _INTERNED_FIELDS else value
+        for name, value in zip(FIELD_NAMES, values)
+    ))
+
+
+SCORE_REL_TOL = 1e-5
+# Ширина кошика балів: у видачі бали з трьома знаками після коми, допуск isclose для них < 0.002
+_BUCKET_WIDTH = 0.01
+# Якщо допуск накриває більше кошиків (величезні бали), дешевше просто пройти список
+_MAX_BUCKETS = 64
+
+
+class ApplicationIndex(Sequence):
+    """
+    Заяви однієї видачі з індексами для зіставлення зі студентом.
+
+    Поводиться як список заяв на читання (len, ітерація, індексація), а також
+    знаходить першу заяву з потрібним балом і спеціальністю без перебору всієї видачі
+    і відповідає, чи подано оригінали хоча б в одній заяві з тими самими балами НМТ.
+    Один індекс обслуговує всіх студентів із тим самим search_name.
+
+    Індекс можна нарощувати посторінково (extend). `complete` — False, якщо пагінацію
+    зупинили достроково і в індексі лише початок видачі. `total_count` і
+    `first_page_digest` — кількість заяв за API і відбиток першої сторінки, з якими
+    повторна перевірка (main.py recheck) порівнює свіжу першу сторінку.
+    """
+
+    __slots__ = ('applications', 'complete', 'total_count', 'first_page_digest',
+                 '_by_score', '_by_score_specialty', '_irregular', '_originals')
+
+    def __init__(self, applications: Iterable[Application] = ()):
+        self.applications: List[Application] = []
+        self.complete = True
+        self.total_count = 0
+        self.first_page_digest: Optional[str] = None
+        self._by_score: Dict[int, List[int]] = {}
+        self._by_score_specialty: Dict[Tuple[int, str], List[int]] = {}
+        self._irregular: List[int] = []
+        self._originals: Dict[FrozenMap, bool] = {}
+        self.extend(applications)
+
+    def extend(self, applications: Iterable[Application]) -> None:
+        """Дописує заяви в кінець видачі (наступна сторінка)."""
+        for app in applications:
+            position = len(self.applications)
+            self.applications.append(app)
+            score = app.total_score
+            if isinstance(score, float) and math.isfinite(score):
+                bucket = math.floor(score / _BUCKET_WIDTH)
+                self._by_score.setdefault(bucket, []).append(position)
+                self._by_score_specialty.setdefault((bucket, app.specialty_code), []).append(position)
+            else:
+                self._irregular.append(position)
+            fingerprint = app.score_fingerprint
+            self._originals[fingerprint] = self._originals.get(fingerprint, False) or app.originals_submitted
+
+    def __getitem__(self, position):
+        return self.applications[position]
+
+    def __len__(self) -> int:
+        return len(self.applications)
+
+    def __repr__(self) -> str:
+        return f"ApplicationIndex({len(self.applications)} заяв)"
+
+    def find_reference(self, score, specialty_code: Optional[str] = None) -> Optional[Application]:
+        """
+        Перша за порядком видачі заява з балом, що збігається з `score` (math.isclose, rel_tol=1e-5),
+        і спеціальністю `specialty_code` (порожня — будь-яка). None, якщо такої немає
+        або бал студента не є числом.
+        """
+        try:
+            target = float(score)
+        except (ValueError, TypeError):
+            return None
+
+        if math.isfinite(target):
+            # isclose(a, b) вимагає |a - b| <= rel_tol * max(|a|, |b|), тож достатньо кошиків у межах цього допуску
+            tolerance = SCORE_REL_TOL * abs(target) / (1 - SCORE_REL_TOL)
+            # Плюс по кошику з кожного боку — запас на похибку округлення на межі кошика
+            low = math.floor((target - tolerance) / _BUCKET_WIDTH) - 1
+            high = math.floor((target + tolerance) / _BUCKET_WIDTH) + 1
+            if high - low <= _MAX_BUCKETS:
+                candidates = [
+                    self._by_score_specialty.get((bucket, specialty_code), ()) if specialty_code else self._by_score.get(bucket, ())
+                    for bucket in range(low, high + 1)
+                ]
+                candidates.append(self._irregular)
+                return self._first_match(heapq.merge(*candidates), target, specialty_code)
+        return self._first_match(range(len(self.applications)), target, specialty_code)
+
+    def _first_match(self, positions: Iterable[int], target: float, specialty_code: Optional[str]) -> Optional[Application]:
+        for position in positions:
+            app = self.applications[position]
+            try:
+                score_matches = math.isclose(float(app.total_score), target, rel_tol=SCORE_REL_TOL)
+            except (ValueError, TypeError):
+                score_matches = False
+            if score_matches and ((not specialty_code) or app.specialty_code == specialty_code):
+                return app
+        return None
+
+    def has_originals(self, fingerprint: FrozenMap) -> bool:
+        """Чи подано оригінали хоча б в одній заяві з такими самими балами НМТ."""
+        return self._originals.get(fingerprint, False)
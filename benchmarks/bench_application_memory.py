@@ -0,0 +1,83 @@
+# benchmarks/bench_application_memory.py
+"""
+Пам'ять на велику видачу: старі словники з 21 ключем проти application.Application.
+
+Видача — `--rows` заяв популярного прізвища, згенерованих заглушкою сторінками по 50,
+або записані відповіді API з --html-dir (*.html чи *.json з полем `html`).
+Міряється, скільки пам'яті (tracemalloc) займає розібраний результат і скільки
+байтів він займає в pickle (саме так заяви повертаються з пулу процесів).
+
+    python benchmarks/bench_application_memory.py --rows 20000
+"""
+import argparse
+import gc
+import glob
+import json
+import os
+import pickle
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import lxml_parser  # noqa: E402
+from stub_server import PAGE_SIZE, render_rows  # noqa: E402
+
+
+class _LegacyDicts:
+    """Підміна Application у парсері: повертає словник як є (старий формат)."""
+
+    @staticmethod
+    def from_dict(data):
+        return data
+
+
+def load_pages(rows: int, html_dir: str = None):
+    if html_dir:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(html_dir, '*.html')) + glob.glob(os.path.join(html_dir, '*.json'))):
+            with open(path, encoding='utf-8') as f:
+                content = f.read()
+            pages.append(json.loads(content).get('html', '') if path.endswith('.json') else content)
+        return pages
+    return [render_rows("Шевченко О. В.", start, PAGE_SIZE) for start in range(0, rows, PAGE_SIZE)]
+
+
+def measure(pages, legacy: bool):
+    application_type = lxml_parser.Application
+    if legacy:
+        lxml_parser.Application = _LegacyDicts
+    try:
+        gc.collect()
+        tracemalloc.start()
+        applications = []
+        for page in pages:
+            applications.extend(lxml_parser.parse_applications_lxml(page))
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        lxml_parser.Application = application_type
+    pickled = len(pickle.dumps(applications, protocol=pickle.HIGHEST_PROTOCOL))
+    return applications, retained, pickled
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--html-dir', help="каталог із записаними відповідями API")
+    args = parser.parse_args()
+
+    pages = load_pages(args.rows, args.html_dir)
+    dicts, dict_bytes, dict_pickle = measure(pages, legacy=True)
+    apps, app_bytes, app_pickle = measure(pages, legacy=False)
+    if [app.to_dict() for app in apps] != dicts:
+        sys.exit("❌ Application.to_dict() не збігається зі старими словниками")
+
+    count = len(apps)
+    print(f"заяв: {count}")
+    print(f"{'':<14} {'памʼять':>10} {'на заяву':>10} {'pickle':>10}")
+    print(f"{'до: dict':<14} {dict_bytes / 2**20:>8.1f} МБ {dict_bytes / count:>8.0f} Б {dict_pickle / 2**20:>7.1f} МБ")
+    print(f"{'після: slots':<14} {app_bytes / 2**20:>8.1f} МБ {app_bytes / count:>8.0f} Б {app_pickle / 2**20:>7.1f} МБ")
+    print(f"економія пам'яті: {dict_bytes / app_bytes:.1f}×")
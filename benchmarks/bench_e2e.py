@@ -0,0 +1,108 @@
+# benchmarks/bench_e2e.py
+"""
+Наскрізний прогін main_async_logic проти локальної заглушки API у кількох сценаріях.
+
+Для кожного сценарію генерується вхідний Excel (бали і спеціальності взяті з рядків,
+які віддасть заглушка), кеш відповідей вимкнено, заглушка працює в окремому процесі.
+Звітує пропускну здатність, p50/p99 тривалості запиту і кількість повторів після помилок
+і лімітів (з реєстру metrics), внесені заглушкою збої та, з --stages, підсумок усіх етапів.
+
+    python benchmarks/bench_e2e.py --students 1000 --scenarios clean latency faults --stages
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+
+from api_parser import parse_applications  # noqa: E402
+from checkpoint import ResultSink  # noqa: E402
+from main import main_async_logic  # noqa: E402
+from metrics import registry as metrics  # noqa: E402
+from stub_server import Faults, StubServerProcess, render_rows, total_for_query  # noqa: E402
+
+SCENARIOS = {
+    'clean': Faults(),
+    'latency': Faults(latency_ms=80, latency_jitter_ms=20),
+    'faults': Faults(latency_ms=30, latency_jitter_ms=10, error_rate=0.02, rate_limit_rate=0.005,
+                     rate_limit_delay=1, max_user_connections=20, max_connections_json_share=0.5),
+}
+
+
+def make_workbook(path: str, students: int, seed: int = 11) -> None:
+    rng = random.Random(seed)
+    rows = []
+    for number in range(students):
+        # Приблизно кожне п'яте прізвище повторюється — як брати/сестри й однофамільці
+        surname = f"Прізвище{rng.randrange(int(students * 0.8))}"
+        query = f"{surname} О. В."
+        score, specialty = 175.5, None
+        total = total_for_query(query)
+        if total and rng.random() < 0.85:
+            app = parse_applications(render_rows(query, rng.randrange(total), 1), 'lxml')[0]
+            score, specialty = app.total_score, app.specialty_code
+        rows.append({'Прізвище': surname, "Ім'я": 'Олена', 'По батькові': 'Вікторівна', 'Конк. бал': score,
+                     'Код спец': specialty, 'Телефон': '0500000000'})
+    pd.DataFrame(rows).to_excel(path, index=False)
+
+
+def run_scenario(name: str, faults: Faults, input_path: str, workers: int, parse_workers: int,
+                 stages: bool = False) -> None:
+    workdir = tempfile.mkdtemp(prefix=f'bench_e2e_{name}_')
+    metrics.reset()
+
+    stub = StubServerProcess(faults=faults, seed=1)
+    with stub:
+        config = {
+            'excel_file_path': input_path,
+            'api_base_url': stub.base_url,
+            'concurrent_requests': workers,
+            'workers': workers,
+            'parser_backend': 'lxml',
+            'parse_workers': parse_workers,
+            'cache_enabled': False,
+            'initial_requests_per_second': 200,
+            'max_requests_per_second': 1000,
+            'excel_save_every_rows': 10_000,
+        }
+        sink = ResultSink.from_config({**config, 'journal_path': os.path.join(workdir, 'journal.jsonl')},
+                                      os.path.join(workdir, 'students_with_results.xlsx'))
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            processed = asyncio.run(main_async_logic(config, sink))
+            elapsed = time.perf_counter() - started
+            sink.close()
+        stats = stub.stats()
+
+    http = metrics.histograms['http_request']
+    injected = ', '.join(f"{key} {value}" for key, value in stats['injected'].items() if value) or 'немає'
+    print(f"{name:<8} {processed:>6} студ. {processed / elapsed:>7.1f} студ/с   HTTP {stats['requests']:>6}   "
+          f"p50 {http.quantile(0.5) * 1000:>6.0f} мс  p99 {http.quantile(0.99) * 1000:>6.0f} мс   "
+          f"повторів: помилки {metrics.counter('http_attempts', outcome='error'):.0f}, "
+          f"ліміти {metrics.counter('http_attempts', outcome='rate_limited'):.0f}   збої заглушки: {injected}")
+    if stages:
+        print(f"         етапи: {metrics.summary()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=50)
+    parser.add_argument('--parse-workers', type=int, default=2)
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--stages', action='store_true', help="друкувати підсумок metrics за етапами")
+    args = parser.parse_args()
+
+    input_path = os.path.join(tempfile.mkdtemp(prefix='bench_e2e_'), 'students.xlsx')
+    make_workbook(input_path, args.students)
+    for scenario in args.scenarios:
+        run_scenario(scenario, SCENARIOS[scenario], input_path, args.workers, args.parse_workers, args.stages)
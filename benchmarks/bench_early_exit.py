@@ -0,0 +1,85 @@
+# benchmarks/bench_early_exit.py
+"""
+Дострокова зупинка пагінації: скільки сторінок не запитується і чи не змінюються відповіді.
+
+Студенти будуються з реальних рядків видачі заглушки (бал і спеціальність випадкової заяви),
+плюс частка студентів, яких у видачі немає. Той самий набір проганяється через run_pipeline
+з early_exit=False і early_exit=True; результати мають збігтися для кожного студента.
+
+    python benchmarks/bench_early_exit.py --queries 300
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from api_parser import ApiClient, parse_applications  # noqa: E402
+from main import run_pipeline  # noqa: E402
+from planner import plan_queries  # noqa: E402
+from rate_limiter import AdaptiveRateLimiter  # noqa: E402
+from stub_server import render_rows, start_stub_server, total_for_query  # noqa: E402
+
+
+class _NullSink:
+    def record(self, student):
+        pass
+
+
+def make_students(queries: int, seed: int = 3):
+    rng = random.Random(seed)
+    students = []
+    for number in range(queries):
+        query = f"Прізвище{number} О. В."
+        total = total_for_query(query)
+        for _ in range(rng.randint(1, 3)):
+            student = {'index': len(students), 'search_name': query, 'score': 175.5, 'specialty_code': None}
+            if total and rng.random() < 0.85:
+                position = rng.randrange(total)
+                app = parse_applications(render_rows(query, position, 1), 'lxml')[0]
+                student['score'] = app.total_score
+                student['specialty_code'] = app.specialty_code if rng.random() < 0.7 else None
+            students.append(student)
+    return students
+
+
+async def run(students, early_exit: bool, workers: int):
+    runner, url, state = await start_stub_server()
+    try:
+        limiter = AdaptiveRateLimiter(max_concurrency=workers, initial_rate=5000, max_rate=5000)
+        async with ApiClient(api_url=url, limit_per_host=workers, parser_backend='lxml') as client:
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                await run_pipeline(plan_queries(students).groups, limiter, client, _NullSink(), workers,
+                                   len(students), early_exit=early_exit)
+            elapsed = time.perf_counter() - started
+        return state.requests, elapsed, client
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--workers', type=int, default=50)
+    args = parser.parse_args()
+
+    base = make_students(args.queries)
+    results = {}
+    for label, early_exit in (("до: вся видача", False), ("після: early exit", True)):
+        students = [dict(s) for s in base]
+        requests, elapsed, client = asyncio.run(run(students, early_exit, args.workers))
+        results[early_exit] = [s['final_result'] for s in students]
+        print(f"{label:<20} HTTP-запитів {requests:>6}   {elapsed:>6.1f} с   "
+              f"зупинок {client.early_exits:>4}, не запитано сторінок {client.pages_avoided:>5}")
+
+    mismatches = sum(a != b for a, b in zip(results[False], results[True]))
+    if mismatches:
+        sys.exit(f"❌ Відповіді розійшлися для {mismatches} студентів з {len(base)}")
+    print(f"✅ Відповіді збігаються для всіх {len(base)} студентів")
@@ -0,0 +1,103 @@
+# benchmarks/bench_excel_reader.py
+"""
+Читання студентів з Excel: старий шлях (pd.read_excel + iterrows) проти потокового
+iter_students_from_excel з рушіями 'xml', 'openpyxl' і 'calamine' (якщо встановлено python-calamine).
+
+Результати всіх рушіїв звіряються зі старою реалізацією.
+
+Файл генерується у тимчасовому каталозі і видаляється після заміру. З --workdir він
+зберігається там і перевикористовується між запусками.
+
+    python benchmarks/bench_excel_reader.py --rows 100000
+"""
+import argparse
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+
+from excel_reader import iter_students_from_excel  # noqa: E402
+
+
+def generate_workbook(path: str, rows: int) -> None:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(['№', 'Прізвище', "Ім'я", 'По батькові', 'Конк. бал', 'Код спец', 'Освітня програма',
+                  'Форма навчання', 'Телефон', 'Email', 'Результат перевірки'])
+    for i in range(rows):
+        sheet.append([i + 1, f"Прізвище{i % 5000}", f"Ім'я{i % 97}", f"По-батькові{i % 89}", 120 + (i % 800) / 10,
+                      121 if i % 3 else 122.0, "Інженерія програмного забезпечення", "Денна",
+                      f"+38050{i:07d}", f"student{i}@example.com", None if i % 4 else "Вже визначився"])
+    workbook.save(path)
+
+
+def legacy_read(path: str):
+    """Стара реалізація read_students_from_excel (для порівняння)."""
+    df = pd.read_excel(path, engine='openpyxl')
+    students = []
+    for index, row in df.iterrows():
+        if pd.isna(row['Прізвище']):
+            continue
+        last_name = str(row['Прізвище']).strip()
+        first_name = str(row["Ім'я"]).strip()
+        patronymic = str(row['По батькові']).strip()
+        first_name_initial = f"{first_name[0]}." if first_name else ''
+        patronymic_initial = f" {patronymic[0]}." if patronymic else ''
+        raw_spec_code = row.get('Код спец')
+        raw_result = row.get('Результат перевірки')
+        students.append({
+            'index': index,
+            'search_name': f"{last_name} {first_name_initial}{patronymic_initial}".strip(),
+            'last_name': last_name, 'first_name': first_name, 'patronymic': patronymic,
+            'score': row['Конк. бал'],
+            'specialty_code': str(raw_spec_code).replace('.0', '').strip() if pd.notna(raw_spec_code) else None,
+            'Результат перевірки': str(raw_result).strip() if pd.notna(raw_result) else None,
+        })
+    yield from students
+
+
+def measure(label: str, iterator) -> list:
+    started = time.perf_counter()
+    first_at = None
+    students = []
+    for student in iterator:
+        if first_at is None:
+            first_at = time.perf_counter() - started
+        students.append(student)
+    total = time.perf_counter() - started
+    print(f"{label:<26} {total:>8.2f} с   перший студент через {first_at or 0:>6.2f} с   ({len(students)} студентів)")
+    return students
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--workdir', default=None, help="каталог, де згенерований файл зберігається між запусками")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='bench_excel_reader_')
+    os.makedirs(workdir, exist_ok=True)
+    path = os.path.join(workdir, f"bench_students_{args.rows}.xlsx")
+    try:
+        if not os.path.exists(path):
+            print(f"Генерую {args.rows} рядків у '{path}'...")
+            generate_workbook(path, args.rows)
+
+        expected = measure("до: read_excel+iterrows", legacy_read(path))
+        engines = ['xml', 'openpyxl'] + (['calamine'] if importlib.util.find_spec('python_calamine') else [])
+        for engine in engines:
+            students = measure(f"після: {engine}", iter_students_from_excel(path, engine=engine))
+            if students != expected:
+                sys.exit(f"❌ Рушій '{engine}' дав інший результат, ніж стара реалізація")
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir)
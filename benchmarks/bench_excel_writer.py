@@ -0,0 +1,117 @@
+# benchmarks/bench_excel_writer.py
+"""
+Збереження результатів в Excel: повне перезбереження через openpyxl проти 'xml_patch'.
+
+Книга на --rows рядків з форматуванням (жирний заголовок, заливка і формат чисел
+у частині стовпців). Міряються два випадки: чергова пачка з --batch результатів
+(як у ResultSink під час прогону) і всі рядки разом (як при виході після довгого прогону).
+Після кожного запису стовпець результатів обох файлів звіряється, а змінений
+файлом 'xml_patch' ще раз відкривається openpyxl зі збереженими стилями.
+
+    python benchmarks/bench_excel_writer.py --rows 100000 --batch 200
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from excel_writer import save_results_to_excel  # noqa: E402
+from xlsx_stream import iter_rows  # noqa: E402
+
+COL_NAME = 'Результат перевірки'
+RESULTS = ["Вже визначився", "Потрібно дзвонити", "Не знайдено. Треба дзвонити", "Знайдено, але не ідентифіковано"]
+
+
+def generate_styled_workbook(path: str, rows: int) -> None:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    bold, fill = Font(bold=True), PatternFill('solid', start_color='FFF2CC')
+
+    def styled(value, **style):
+        cell = WriteOnlyCell(sheet, value=value)
+        for name, attr in style.items():
+            setattr(cell, name, attr)
+        return cell
+
+    # Стовпець результатів — через один після «Телефон», поки без заголовка
+    sheet.append([styled(title, font=bold) for title in
+                  ['№', 'Прізвище', "Ім'я", 'По батькові', 'Конк. бал', 'Код спец', 'Телефон', 'Email']])
+    for i in range(rows):
+        sheet.append([i + 1, f"Прізвище{i % 5000}", f"Ім'я{i % 97}", f"По-батькові{i % 89}",
+                      styled(120 + (i % 800) / 10, number_format='0.00'), 121 if i % 3 else 122,
+                      styled(f"+38050{i:07d}", fill=fill), f"student{i}@example.com",
+                      styled(None, fill=fill) if i % 2 else None])
+    workbook.save(path)
+
+
+def timed_save(path: str, batch, mode: str) -> float:
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        saved = save_results_to_excel(path, batch, COL_NAME, mode)
+    if not saved:
+        sys.exit(f"❌ Режим '{mode}' не зміг зберегти файл")
+    return time.perf_counter() - started
+
+
+def result_column(path: str):
+    return [(row, values.get(9)) for row, values in iter_rows(path, {1: 'n', 9: 9})]
+
+
+def check_styles(path: str, rows) -> None:
+    from openpyxl import load_workbook
+
+    sheet = load_workbook(path).active
+    if sheet.cell(row=1, column=9).value != COL_NAME:
+        sys.exit("❌ Після 'xml_patch' немає заголовка стовпця результатів")
+    for row in rows:
+        # Непарні індекси студента (непарні рядки Excel) мають заливку в стовпці I
+        if row % 2 and sheet.cell(row=row, column=9).fill.start_color.rgb != '00FFF2CC':
+            sys.exit(f"❌ Після 'xml_patch' загубився стиль клітинки I{row}")
+        if sheet.cell(row=row, column=5).number_format != '0.00':
+            sys.exit(f"❌ Після 'xml_patch' загубився формат клітинки E{row}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--batch', type=int, default=200)
+    args = parser.parse_args()
+
+    # Усі файли — у тимчасовому каталозі, який прибирається і після невдалої звірки
+    workdir = tempfile.mkdtemp(prefix='bench_excel_writer_')
+    try:
+        source = os.path.join(workdir, 'source.xlsx')
+        print(f"Генерую {args.rows} рядків з форматуванням...")
+        generate_styled_workbook(source, args.rows)
+        print(f"Розмір файлу: {os.path.getsize(source) / 2**20:.1f} МБ")
+
+        rng = random.Random(5)
+        indexes = list(range(args.rows))
+        cases = [("пачка", rng.sample(indexes, min(args.batch, args.rows))), ("усі рядки", indexes)]
+        for label, chosen in cases:
+            batch = [{'index': index, 'final_result': rng.choice(RESULTS)} for index in chosen]
+            timings = {}
+            for mode in ('openpyxl', 'xml_patch'):
+                path = os.path.join(workdir, f'{mode}.xlsx')
+                shutil.copy(source, path)
+                timings[mode] = timed_save(path, batch, mode)
+            if result_column(os.path.join(workdir, 'openpyxl.xlsx')) != result_column(os.path.join(workdir, 'xml_patch.xlsx')):
+                sys.exit(f"❌ {label}: стовпець результатів відрізняється між режимами")
+            check_styles(os.path.join(workdir, 'xml_patch.xlsx'), [index + 2 for index in chosen[:500]])
+            print(f"{label:<10} {len(batch):>7} рез.   openpyxl {timings['openpyxl']:>7.2f} с   "
+                  f"xml_patch {timings['xml_patch']:>6.2f} с   (x{timings['openpyxl'] / timings['xml_patch']:.0f})")
+        print("✅ Результати однакові, стилі збережено")
+    finally:
+        shutil.rmtree(workdir)
@@ -0,0 +1,62 @@
+# benchmarks/bench_http_client.py
+"""
+Порівняння старої схеми (новий ClientSession на кожен POST) з ApiClient (пул keep-alive).
+
+Запуск з кореня репозиторію:
+    python benchmarks/bench_http_client.py --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_parser import ApiClient  # noqa: E402
+from stub_server import start_stub_server  # noqa: E402
+
+
+async def _run(label, post, total, concurrency, state):
+    state.reset()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await post({'search': f"Прізвище{i % 200} І. П.", 'offset': 0})
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {total / elapsed:>10.1f} req/s   з'єднань: {len(state.connections):>6}   ({elapsed:.2f} с)")
+
+
+async def main(total: int, concurrency: int):
+    runner, url, state = await start_stub_server()
+    try:
+        async def legacy_post(payload):
+            connector = aiohttp.TCPConnector(ssl=False)
+            async with aiohttp.ClientSession(connector=connector) as session:
+                async with session.post(url, data=payload, timeout=30) as response:
+                    await response.text()
+
+        await _run("до: сесія на кожен запит", legacy_post, total, concurrency, state)
+
+        async with ApiClient(api_url=url, limit_per_host=concurrency) as client:
+            async def pooled_post(payload):
+                async with client.session.post(client.api_url, data=payload) as response:
+                    await response.text()
+
+            await _run("після: ApiClient (пул)", pooled_post, total, concurrency, state)
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,102 @@
+# benchmarks/bench_logging.py
+"""
+Накладні витрати журналу налагодження: старий log_to_file (json.dumps(indent=2)
+усієї транзакції, глобальний asyncio.Lock, aiofiles.open на кожен запис) проти
+фонового логера з logging_setup на рівнях INFO і DEBUG.
+
+Імітується `--tasks` одночасних воркерів, кожен пише `--records` транзакцій
+з тілом відповіді розміром `--body-kb` КБ. Вимірюється час, який воркери
+проводять у логуванні, та розмір файлу.
+
+    python benchmarks/bench_logging.py --tasks 50 --records 200
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from api_parser import BROWSER_HEADERS  # noqa: E402
+from logging_setup import setup_logging  # noqa: E402
+
+RESPONSE_HEADERS = {'Content-Type': 'application/json', 'Server': 'nginx', 'Content-Encoding': 'gzip'}
+
+
+async def legacy_worker(worker_id: int, records: int, body: str, path: str, lock: asyncio.Lock) -> None:
+    """Повторює старий log_to_file з _fetch_page."""
+    import aiofiles
+
+    for i in range(records):
+        payload = {'search': f"Студент{worker_id} І. П.", 'offset': i}
+        log_parts = [f"\n{'='*120}\n", f"TRANSACTION AT: {datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')} | Search: '{payload['search']}' | Offset: {i} | Attempt: 1/5\n"]
+        log_parts.extend([f"{'-'*55} REQUEST {'-'*56}\n", "URL: http://stub\n", f"Headers: {json.dumps(BROWSER_HEADERS, indent=2, ensure_ascii=False)}\n", f"Payload Body: {json.dumps(payload, indent=2, ensure_ascii=False)}\n"])
+        log_parts.extend([f"{'-'*54} RESPONSE {'-'*55}\n", "Status: 200 OK\n", f"Headers: {json.dumps(RESPONSE_HEADERS, indent=2, ensure_ascii=False)}\n", f"Body:\n{body}\n"])
+        async with lock:
+            async with aiofiles.open(path, mode='a', encoding='utf-8') as f:
+                await f.write("".join(log_parts) + f"{'='*120}\n")
+
+
+async def new_worker(worker_id: int, records: int, body: str) -> None:
+    """Повторює записи нового _fetch_page для успішної відповіді."""
+    logger = logging.getLogger('pageparser.api')
+    for i in range(records):
+        payload = {'search': f"Студент{worker_id} І. П.", 'offset': i}
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "transaction query=%r offset=%d attempt=%d url=%s request_headers=%s payload=%s "
+                "status=%d %s response_headers=%s body=%s",
+                payload['search'], i, 1, "http://stub", json.dumps(BROWSER_HEADERS, ensure_ascii=False),
+                json.dumps(payload, ensure_ascii=False), 200, "OK", json.dumps(RESPONSE_HEADERS, ensure_ascii=False), body)
+        logger.info("ok query=%r offset=%d attempt=%d status=%d bytes=%d count=%s ms=%.0f",
+                    payload['search'], i, 1, 200, len(body), 50, 12.0)
+        # Як і справжній запит, воркер віддає керування loop між транзакціями
+        await asyncio.sleep(0)
+
+
+async def run_workers(factory, tasks: int) -> float:
+    started = time.perf_counter()
+    await asyncio.gather(*(factory(worker_id) for worker_id in range(tasks)))
+    return time.perf_counter() - started
+
+
+def report(label: str, elapsed: float, total: int, path: str) -> None:
+    size = sum(os.path.getsize(os.path.join(os.path.dirname(path), name))
+               for name in os.listdir(os.path.dirname(path)) if name.startswith(os.path.basename(path)))
+    print(f"{label:<24} {elapsed:>7.2f} с   {total / elapsed:>9.0f} записів/с   файл {size / 1024 / 1024:>8.1f} МБ")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=50)
+    parser.add_argument('--records', type=int, default=200)
+    parser.add_argument('--body-kb', type=int, default=20)
+    args = parser.parse_args()
+
+    body = json.dumps({'success': True, 'count': 50, 'html': '<tr><td>x</td></tr>' * (args.body_kb * 1024 // 20)})
+    total = args.tasks * args.records
+    workdir = tempfile.mkdtemp(prefix='bench_logging_')
+
+    if importlib.util.find_spec('aiofiles'):
+        path = os.path.join(workdir, 'legacy', 'debug_log.txt')
+        os.makedirs(os.path.dirname(path))
+        lock = asyncio.Lock()
+        elapsed = asyncio.run(run_workers(lambda w: legacy_worker(w, args.records, body, path, lock), args.tasks))
+        report("до: log_to_file", elapsed, total, path)
+    else:
+        print("до: aiofiles не встановлено, старий логер пропущено")
+
+    for level in ('INFO', 'DEBUG'):
+        path = os.path.join(workdir, level.lower(), 'debug_log.txt')
+        os.makedirs(os.path.dirname(path))
+        stop = setup_logging(path, level=level, max_bytes=0)
+        elapsed = asyncio.run(run_workers(lambda w: new_worker(w, args.records, body), args.tasks))
+        stop()  # дописування буфера не входить у час воркерів — воно в окремому потоці
+        report(f"після: logging {level}", elapsed, total, path)
@@ -0,0 +1,170 @@
+# benchmarks/bench_matching.py
+"""
+Зіставлення студента з видачею: старий лінійний перебір проти main._match_student
+на ApplicationIndex.
+
+Семантику крайових випадків перевіряють тести (tests/test_matching.py). Тут спершу звіряється
+стара логіка з main._match_student на випадкових видачах і на крайових випадках
+(допуск math.isclose rel_tol=1e-5 з обох боків межі, порожня/None спеціальність,
+нечислові та NaN бали, бал 0, однакові бали в різних спеціальностях, порожні бали НМТ),
+потім міряє студентів/с на великій видачі, де кількох студентів шукають в одному результаті.
+
+    python benchmarks/bench_matching.py --rows 5000 --students 500
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from application import Application, ApplicationIndex  # noqa: E402
+from main import _match_student  # noqa: E402
+
+SUBJECTS = ('Українська мова', 'Математика', 'Історія України', 'Англійська мова')
+SPECIALTIES = ('F2', 'F3', 'D1', '121', '')
+
+
+def legacy_resolve(apps, score_to_find, specialty_to_find) -> str:
+    """Стара логіка зіставлення (лінійний перебір до ApplicationIndex)."""
+    if not apps:
+        return "Не знайдено. Треба дзвонити"
+    reference_app = None
+    for app in apps:
+        try:
+            student_score = float(score_to_find)
+            app_score = float(app.get('total_score', 0))
+            score_matches = math.isclose(app_score, student_score, rel_tol=1e-5)
+        except (ValueError, TypeError):
+            score_matches = False
+        specialty_matches = (not specialty_to_find) or (app.get('specialty_code') == specialty_to_find)
+        if score_matches and specialty_matches:
+            reference_app = app
+            break
+    if not reference_app:
+        return "Знайдено, але не ідентифіковано"
+    score_fingerprint = reference_app.get('score_components')
+    if not score_fingerprint:
+        return "Не вдалось отримати бали НМТ"
+    identified_student_apps = [app for app in apps if app.get('score_components') == score_fingerprint]
+    has_originals = any(app['originals_submitted'] for app in identified_student_apps)
+    return "Вже визначився" if has_originals else "Потрібно дзвонити"
+
+
+def indexed_resolve(index: ApplicationIndex, score_to_find, specialty_to_find) -> str:
+    """Робоча логіка: main._match_student."""
+    return _match_student({'score': score_to_find, 'specialty_code': specialty_to_find}, index)
+
+
+def make_app(rng: random.Random, score: float, specialty: str, scores: dict) -> Application:
+    return Application.from_dict({
+        'degree_level_short': 'Б', 'degree_level_full': 'Бакалавр', 'applicant_name': 'Шевченко О. В.',
+        'status': 'Допущено', 'rank_position': rng.randint(1, 300), 'rank_url': '', 'priority': str(rng.randint(1, 5)),
+        'places': {'total': 30}, 'total_score': score, 'avg_document_score': '9,5', 'score_components': scores,
+        'coefficients': {'РК': '1.0'}, 'university_name': 'КНУ', 'university_url': '', 'faculty_short': 'ФІТ',
+        'faculty_full': 'Факультет', 'specialty_code': specialty, 'specialty_name': '', 'specialization': '',
+        'quota': '', 'originals_submitted': rng.random() < 0.2,
+    })
+
+
+def make_result(rng: random.Random, applicants: int):
+    """Видача однофамільців: у кожного кілька заяв з тими самими балами НМТ."""
+    apps = []
+    for _ in range(applicants):
+        scores = {} if rng.random() < 0.03 else {subject: rng.randint(100, 200) for subject in rng.sample(SUBJECTS, 3)}
+        base = round(rng.uniform(100, 200), 3)
+        for _ in range(rng.randint(1, 5)):
+            score = base if rng.random() < 0.7 else round(base + rng.choice([-1, 1]) * rng.uniform(0, 0.01), 3)
+            apps.append(make_app(rng, score, rng.choice(SPECIALTIES), scores))
+    rng.shuffle(apps)
+    return apps
+
+
+def make_queries(rng: random.Random, apps, count: int):
+    queries = []
+    for _ in range(count):
+        app = rng.choice(apps) if apps else None
+        kind = rng.random()
+        if app is None or kind < 0.1:
+            score = rng.choice([None, 'abc', '190,5', float('nan'), 0, 0.0, float('inf'), '175.5', 175])
+        elif kind < 0.5:
+            score = app.total_score
+        else:
+            # Біля межі допуску: трохи всередині та трохи зовні rel_tol=1e-5
+            factor = 1 + rng.choice([-1, 1]) * rng.choice([0.99e-5, 1.01e-5, 0.5e-5, 2e-5])
+            score = app.total_score * factor
+            if rng.random() < 0.3:
+                score = str(score)
+        specialty = rng.choice([None, '', app.specialty_code if app else 'F2', 'F3', 'X9'])
+        queries.append((score, specialty))
+    return queries
+
+
+def check(seed_count: int) -> int:
+    mismatches = 0
+    cases = 0
+    for seed in range(seed_count):
+        rng = random.Random(seed)
+        apps = make_result(rng, rng.randint(0, 40))
+        # Крайові бали: 0, нескінченність, два однакові бали з різними спеціальностями
+        if seed % 5 == 0:
+            apps.insert(0, make_app(rng, 0.0, 'F2', {'Математика': 150}))
+            apps.append(make_app(rng, float('inf'), '', {'Математика': 151}))
+        index = ApplicationIndex(apps)
+        for score, specialty in make_queries(rng, apps, 50):
+            cases += 1
+            expected = legacy_resolve(apps, score, specialty)
+            actual = indexed_resolve(index, score, specialty)
+            reference_old = next((app for app in apps if _legacy_match(app, score, specialty)), None)
+            reference_new = index.find_reference(score, specialty)
+            if expected != actual or reference_old is not reference_new:
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"❌ seed={seed} score={score!r} spec={specialty!r}: {expected!r} != {actual!r}")
+    print(f"{'✅' if not mismatches else '❌'} Звірено {cases} випадків, розбіжностей: {mismatches}")
+    return mismatches
+
+
+def _legacy_match(app, score, specialty) -> bool:
+    try:
+        score_matches = math.isclose(float(app.total_score), float(score), rel_tol=1e-5)
+    except (ValueError, TypeError):
+        score_matches = False
+    return score_matches and ((not specialty) or app.specialty_code == specialty)
+
+
+def bench(rows: int, students: int) -> None:
+    rng = random.Random(42)
+    apps = make_result(rng, rows // 3)
+    queries = make_queries(rng, apps, students)
+
+    started = time.perf_counter()
+    for score, specialty in queries:
+        legacy_resolve(apps, score, specialty)
+    legacy = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index = ApplicationIndex(apps)
+    built = time.perf_counter() - started
+    for score, specialty in queries:
+        indexed_resolve(index, score, specialty)
+    indexed = time.perf_counter() - started
+
+    print(f"видача: {len(apps)} заяв, студентів з цим прізвищем: {len(queries)}")
+    print(f"до: перебір       {legacy:>8.3f} с   {len(queries) / legacy:>10.0f} студентів/с")
+    print(f"після: індекс     {indexed:>8.3f} с   {len(queries) / indexed:>10.0f} студентів/с   (побудова {built * 1000:.1f} мс)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--students', type=int, default=500)
+    parser.add_argument('--seeds', type=int, default=300)
+    args = parser.parse_args()
+
+    if check(args.seeds):
+        sys.exit(1)
+    bench(args.rows, args.students)
@@ -0,0 +1,60 @@
+# benchmarks/bench_parse_workers.py
+"""
+Пропускна здатність (студентів/хв) залежно від кількості воркерів парсингу.
+
+Заглушка API працює в окремому процесі; для кожного значення --workers
+прогоняються ті самі студенти через process_student_async.
+
+    python benchmarks/bench_parse_workers.py --students 300 --workers 0 1 2 4 8
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from api_parser import ApiClient  # noqa: E402
+from main import process_student_async  # noqa: E402
+from rate_limiter import AdaptiveRateLimiter  # noqa: E402
+from stub_server import StubServerProcess, total_for_query  # noqa: E402
+
+
+def make_students(count: int):
+    # Беремо лише «поширені» прізвища, щоб парсинг був відчутним навантаженням
+    students, i = [], 0
+    while len(students) < count:
+        name = f"Прізвище{i} І. П."
+        i += 1
+        if total_for_query(name) >= 120:
+            students.append({'index': len(students), 'search_name': name, 'score': 175.5, 'specialty_code': None})
+    return students
+
+
+async def run(url: str, students, workers: int, executor: str, backend: str, concurrency: int) -> float:
+    # Високий стартовий темп: міряємо парсинг, а не розгін лімітера
+    limiter = AdaptiveRateLimiter(max_concurrency=concurrency, initial_rate=1000, max_rate=1000)
+    client = ApiClient(api_url=url, limit_per_host=concurrency, parser_backend=backend,
+                       parse_workers=workers, parse_executor=executor)
+    async with client:
+        started = time.perf_counter()
+        await asyncio.gather(*(process_student_async(dict(s), limiter, client) for s in students))
+        return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=300)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4, 8], help="0 — парсинг прямо в event loop")
+    parser.add_argument('--executor', choices=['process', 'thread'], default='process')
+    parser.add_argument('--backend', choices=['bs4', 'lxml'], default='bs4')
+    parser.add_argument('--concurrency', type=int, default=50)
+    args = parser.parse_args()
+
+    students = make_students(args.students)
+    with StubServerProcess() as url:
+        for workers in args.workers:
+            elapsed = asyncio.run(run(url, students, workers, args.executor, args.backend, args.concurrency))
+            print(f"воркерів: {workers:>2}   {len(students) / elapsed * 60:>8.0f} студентів/хв   ({elapsed:.1f} с)")
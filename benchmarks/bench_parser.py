@@ -0,0 +1,76 @@
+# benchmarks/bench_parser.py
+"""
+Звірка та мікробенчмарк движків parse_applications ('bs4' і 'lxml').
+
+Спершу перевіряє, що обидва движки дають ідентичні словники на всіх сторінках
+(згенерованих заглушкою, з benchmarks/fixtures і з --html-dir, якщо вказано:
+*.html або *.json з полем `html`), потім міряє рядків/с для кожного. Звірка з еталонним
+виводом (benchmarks/fixtures/*.expected.json) — у tests/test_parser.py.
+
+    python benchmarks/bench_parser.py --pages 200 --html-dir ./captured
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from api_parser import PARSER_BACKENDS, parse_applications  # noqa: E402
+from stub_server import PAGE_SIZE, render_rows  # noqa: E402
+
+
+def load_pages(pages: int, html_dir: str = None):
+    html_pages = [render_rows(f"Прізвище{i} І. П.", i * PAGE_SIZE, PAGE_SIZE) for i in range(pages)]
+    paths = glob.glob(os.path.join(os.path.dirname(__file__), 'fixtures', '*.html'))
+    if html_dir:
+        paths += glob.glob(os.path.join(html_dir, '*.html')) + glob.glob(os.path.join(html_dir, '*.json'))
+    for path in sorted(paths):
+        with open(path, encoding='utf-8') as f:
+            content = f.read()
+        html_pages.append(json.loads(content).get('html', '') if path.endswith('.json') else content)
+    return html_pages
+
+
+def check_identical(html_pages) -> bool:
+    ok = True
+    for number, page in enumerate(html_pages):
+        expected = parse_applications(page, 'bs4')
+        actual = parse_applications(page, 'lxml')
+        if expected != actual:
+            ok = False
+            print(f"❌ Розбіжність на сторінці #{number}: bs4={len(expected)} рядків, lxml={len(actual)} рядків")
+            for left, right in zip(expected, actual):
+                diff = {key: (left[key], right.get(key)) for key in left if left[key] != right.get(key)}
+                if diff:
+                    print(f"   перше розходження: {diff}")
+                    break
+    return ok
+
+
+def bench(html_pages, repeat: int):
+    for backend in PARSER_BACKENDS:
+        rows = 0
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for page in html_pages:
+                rows += len(parse_applications(page, backend))
+        elapsed = time.perf_counter() - started
+        print(f"{backend:<6} {rows / elapsed:>12.0f} рядків/с   ({rows} рядків за {elapsed:.2f} с)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=200, help="скільки згенерованих сторінок по 50 рядків")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--html-dir', help="каталог із записаними відповідями API")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages, args.html_dir)
+    if not check_identical(pages):
+        sys.exit(1)
+    print(f"✅ Обидва движки дали ідентичні результати на {len(pages)} сторінках.")
+    bench(pages, args.repeat)
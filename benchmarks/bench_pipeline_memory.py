@@ -0,0 +1,145 @@
+# benchmarks/bench_pipeline_memory.py
+"""
+Пам'ять і час до першого результату залежно від розміру вхідного Excel.
+
+Порівнюються два шляхи з тим самим ResultSink і тією самою заглушкою:
+  main    — справжній main_async_logic: QueryPlanner групує студентів вікнами
+            (plan_window_students, по прогону на кожне --windows), запити йдуть
+            одразу після першого вікна;
+  upfront — plan_queries по всьому файлу, а потім run_pipeline (спершу весь файл
+            і всі студенти в пам'яті, лише потім перший запит).
+
+Звітуються RSS у момент першого результату (скільки тримає план до старту запитів),
+пік RSS за прогін (VmHWM: на відміну від ru_maxrss, не успадковує пік батьківського
+процесу, який щойно генерував Excel через pandas) і кількість HTTP-запитів до заглушки і час. Excel зберігається
+лише наприкінці, поза заміром піку: інакше пік визначав би розмір аркуша при збереженні
+пачки, однаковий для обох режимів. Кожен замір — в окремому процесі, заглушка — ще в одному.
+Однофамільці з різних вікон, чия група вже стартувала, запитуються повторно — це видно
+в стовпці HTTP; з --cache повтори обслуговує дисковий кеш відповідей (як за замовчуванням).
+Вхідний файл генерується один раз на розмір у тимчасовому каталозі.
+
+    python benchmarks/bench_pipeline_memory.py --sizes 20000 100000 --windows 5000 20000
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _config(input_path: str, url: str, workers: int, window: int, cache: bool):
+    return {'excel_file_path': input_path, 'api_base_url': url.split('/api/')[0], 'parser_backend': 'lxml',
+            'parse_workers': 0, 'cache_enabled': cache, 'concurrent_requests': workers, 'workers': workers,
+            'initial_requests_per_second': 5000, 'max_requests_per_second': 5000,
+            'excel_save_every_rows': 10 ** 9, 'excel_save_interval_sec': 10 ** 9,
+            'plan_window_students': window, 'dashboard_interval_sec': 60}
+
+
+async def _child(config, mode: str, sink, first_result) -> None:
+    from api_parser import ApiClient
+    from excel_reader import iter_students_from_excel
+    from main import _pending_students, main_async_logic, prepare_output_file, run_pipeline
+    from planner import plan_queries
+    from rate_limiter import AdaptiveRateLimiter
+
+    record = sink.record
+
+    def timed_record(student):
+        if not first_result:
+            first_result.extend((time.perf_counter(), _rss_kb()))
+        record(student)
+
+    sink.record = timed_record
+    if mode == 'main':
+        await main_async_logic(config, sink)
+        return
+    # Як у [user-013] до виправлення: весь файл згрупований ще до першого запиту
+    prepare_output_file(config['excel_file_path'], sink.excel_path)
+    plan = plan_queries(_pending_students(iter_students_from_excel(sink.excel_path), sink))
+    limiter = AdaptiveRateLimiter.from_config(config)
+    async with ApiClient.from_config(config) as client:
+        await run_pipeline(plan.groups, limiter, client, sink, config['workers'], plan.students,
+                           dashboard_interval=60)
+    await sink.drain()
+
+
+def _status_kb(field: str) -> int:
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    return 0
+
+
+def _rss_kb() -> int:
+    return _status_kb('VmRSS')
+
+
+def run_child(mode: str, input_path: str, url: str, workers: int, window: int, cache: bool) -> None:
+    from checkpoint import ResultSink
+
+    os.chdir(tempfile.mkdtemp(prefix='bench_mem_'))
+    config = _config(input_path, url, workers, window, cache)
+    sink = ResultSink.from_config({**config, 'journal_path': 'journal.jsonl'}, 'students_with_results.xlsx')
+    first_result = []
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(_child(config, mode, sink, first_result))
+        peak_kb = _status_kb('VmHWM')
+        sink.close()
+    elapsed = time.perf_counter() - started
+    shutil.rmtree(os.getcwd())
+    first, first_kb = first_result if first_result else (float('nan'), 0)
+    print(f"{first_kb} {peak_kb} {first - started} {elapsed}")
+
+
+def main(sizes, workers: int, windows, cache: bool) -> None:
+    from bench_e2e import make_workbook
+    from stub_server import StubServerProcess
+
+    workdir = tempfile.mkdtemp(prefix='bench_mem_in_')
+    stub = StubServerProcess()
+    with stub as url:
+        print(f"{'рядків':>8} {'режим':>17} {'RSS при 1-му рез., МБ':>22} {'пік RSS, МБ':>12} "
+              f"{'1-й результат, с':>17} {'HTTP':>7} {'час, с':>8}")
+        for size in sizes:
+            input_path = os.path.join(workdir, f'students_{size}.xlsx')
+            make_workbook(input_path, size)
+            for mode, window in [('upfront', 0)] + [('main', window) for window in windows]:
+                stub.reset()
+                output = subprocess.run(
+                    [sys.executable, __file__, '--child', mode, '--input', input_path, '--url', url,
+                     '--workers', str(workers), '--window', str(window)] + (['--cache'] if cache else []),
+                    check=True, capture_output=True, text=True, cwd=ROOT,
+                ).stdout
+                first_kb, peak_kb, first, elapsed = output.strip().splitlines()[-1].split()
+                label = f"main, вікно {window}" if window else mode
+                print(f"{size:>8} {label:>17} {int(first_kb) / 1024:>22.1f} {int(peak_kb) / 1024:>12.1f} "
+                      f"{float(first):>17.2f} {stub.stats()['requests']:>7} {float(elapsed):>8.1f}")
+    shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 20000])
+    parser.add_argument('--workers', type=int, default=50)
+    parser.add_argument('--windows', type=int, nargs='+', default=[5000, 20000], help="plan_window_students")
+    parser.add_argument('--cache', action='store_true', help="увімкнути дисковий кеш відповідей")
+    parser.add_argument('--window', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--child', choices=['main', 'upfront'], help=argparse.SUPPRESS)
+    parser.add_argument('--input', help=argparse.SUPPRESS)
+    parser.add_argument('--url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.input, args.url, args.workers, args.window, args.cache)
+    else:
+        main(args.sizes, args.workers, args.windows, args.cache)
@@ -0,0 +1,84 @@
+# benchmarks/bench_planner.py
+"""
+HTTP-трафік з планувальником запитів і без нього.
+
+Студенти генеруються з реалістичним розподілом прізвищ (закон Ципфа) і малим набором
+ініціалів, тож частина search_name повторюється. Обидва прогони йдуть через run_pipeline
+проти локальної заглушки без кешу відповідей: «до» — кожен студент окремою групою
+(як раніше, одночасні однакові запити все одно об'єднуються), «після» — QueryPlanner
+вікнами по --window студентів, як у main_async_logic. Для порівняння друкується і план
+plan_queries по всьому входу: різниця — однофамільці з різних вікон, чия група вже стартувала.
+
+    python benchmarks/bench_planner.py --students 1500 --window 500
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from api_parser import ApiClient  # noqa: E402
+from main import run_pipeline  # noqa: E402
+from planner import QueryGroup, QueryPlanner, plan_queries  # noqa: E402
+from rate_limiter import AdaptiveRateLimiter  # noqa: E402
+from stub_server import start_stub_server  # noqa: E402
+
+INITIALS = 'ОІВМАЮСНТД'
+
+
+class _NullSink:
+    def record(self, student):
+        pass
+
+
+def make_students(count: int, surnames: int, seed: int = 7):
+    rng = random.Random(seed)
+    pool = [f"Прізвище{i}" for i in range(surnames)]
+    weights = [1 / (rank + 1) for rank in range(surnames)]
+    students = []
+    for index, surname in enumerate(rng.choices(pool, weights=weights, k=count)):
+        search_name = f"{surname} {rng.choice(INITIALS)}. {rng.choice(INITIALS)}."
+        students.append({'index': index, 'search_name': search_name, 'score': 175.5, 'specialty_code': None})
+    return students
+
+
+async def run(students, planned: bool, workers: int, window: int):
+    runner, url, state = await start_stub_server()
+    try:
+        limiter = AdaptiveRateLimiter(max_concurrency=workers, initial_rate=5000, max_rate=5000)
+        async with ApiClient(api_url=url, limit_per_host=workers, parser_backend='lxml') as client:
+            started = time.perf_counter()
+            if planned:
+                groups = QueryPlanner(students, window)
+            else:
+                groups = [QueryGroup(student['search_name'], [student]) for student in students]
+            # Рядок прогресу воркерів тут лише заважає
+            with contextlib.redirect_stdout(io.StringIO()):
+                await run_pipeline(groups, limiter, client, _NullSink(), workers, len(students))
+            elapsed = time.perf_counter() - started
+        return state.requests, elapsed, client.merged_queries, groups
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=1500)
+    parser.add_argument('--surnames', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=50)
+    parser.add_argument('--window', type=int, default=500, help="plan_window_students")
+    args = parser.parse_args()
+
+    students = make_students(args.students, args.surnames)
+    print(f"Весь вхід одразу: {plan_queries(students).summary()}")
+    for label, planned in (("до: по студенту", False), ("після: план", True)):
+        requests, elapsed, merged, groups = asyncio.run(run([dict(s) for s in students], planned, args.workers,
+                                                            args.window))
+        print(f"{label:<18} HTTP-запитів {requests:>6}   об'єднано в польоті {merged:>5}   {elapsed:>6.1f} с")
+    print(f"Вікнами по {args.window}: {groups.summary()}")
@@ -0,0 +1,109 @@
+# benchmarks/bench_recheck.py
+"""
+Щоденна повторна перевірка (`python main.py recheck`) проти локальної заглушки.
+
+День 1 — звичайний `python main.py` по всьому файлу. До дня 2 у частки (--changed) запитів
+видача змінюється: у половини з'являються нові заяви (інший count), у другої половини
+змінюється рядок на першій сторінці. День 2 проганяється з копії результатів дня 1 двічі:
+з recheck_full_after_hours = 0 (кожна неостаточна відповідь — повна пагінація, як без
+знімків) і зі звичайним recheck, що звіряє лише першу сторінку. Звітує кількість запитів
+до заглушки, час і перевіряє, що обидва прогони дня 2 дали однакові відповіді.
+
+    python benchmarks/bench_recheck.py --students 1000 --changed 0.1
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_e2e import make_workbook  # noqa: E402
+from main import RECHECK_RESULTS  # noqa: E402
+from stub_server import PAGE_SIZE, StubServerProcess, render_rows, total_for_query  # noqa: E402
+from xlsx_stream import iter_rows  # noqa: E402
+
+
+def run_main(workdir: str, base_url: str, command: str, **overrides) -> float:
+    with open(os.path.join(workdir, 'config.json'), 'w', encoding='utf-8') as f:
+        json.dump({'excel_file_path': 'in.xlsx', 'api_base_url': base_url, 'parser_backend': 'lxml',
+                   'parse_workers': 0, 'cache_enabled': False, 'concurrent_requests': 20,
+                   'initial_requests_per_second': 200, 'max_requests_per_second': 400,
+                   'metrics_report_path': None, **overrides}, f)
+    started = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(ROOT, 'main.py'), command], cwd=workdir,
+                   stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - started
+
+
+def results(workdir: str):
+    return {row: values.get(8) for row, values in iter_rows(os.path.join(workdir, 'students_with_results.xlsx'),
+                                                            {1: 'n', 8: 8})}
+
+
+def day2_recordings(path: str, queries, share: float, seed: int = 3) -> int:
+    """Пише JSONL із зміненими видачами для заглушки; повертає кількість змінених запитів."""
+    rng = random.Random(seed)
+    changed = [query for query in sorted(queries) if total_for_query(query) and rng.random() < share]
+    with open(path, 'w', encoding='utf-8') as f:
+        for number, query in enumerate(changed):
+            total = total_for_query(query)
+            new_total = total + 5 if number % 2 == 0 else total
+            for offset in range(0, new_total, PAGE_SIZE):
+                html = render_rows(query, offset, min(PAGE_SIZE, new_total - offset))
+                if offset == 0 and new_total == total:
+                    html = html.replace('+</td></tr>', '</td></tr>', 1) if '+</td></tr>' in html else \
+                        html.replace('<td></td></tr>', '<td>+</td></tr>', 1)
+                response = {'success': True, 'count': new_total, 'html': html}
+                f.write(json.dumps({'search': query, 'offset': offset, 'response': response}, ensure_ascii=False) + '\n')
+    return len(changed)
+
+
+def day2(label: str, day1_dir: str, base_url: str, stub: StubServerProcess, **overrides):
+    workdir = tempfile.mkdtemp(prefix='bench_recheck_day2_')
+    shutil.copytree(day1_dir, workdir, dirs_exist_ok=True)
+    stub.reset()
+    elapsed = run_main(workdir, base_url, 'recheck', **overrides)
+    requests = stub.stats()['requests']
+    answers = results(workdir)
+    shutil.rmtree(workdir)
+    print(f"{label:<34} {requests:>6} запитів   {elapsed:>6.1f} с")
+    return answers
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--changed', type=float, default=0.1, help="частка запитів, чия видача змінилась")
+    args = parser.parse_args()
+
+    day1_dir = tempfile.mkdtemp(prefix='bench_recheck_day1_')
+    make_workbook(os.path.join(day1_dir, 'in.xlsx'), args.students)
+    with StubServerProcess() as api_url:
+        elapsed = run_main(day1_dir, api_url.split('/api/')[0], 'run')
+    day1 = results(day1_dir)
+    queries = {f"{values['surname']} О. В." for row, values in iter_rows(os.path.join(day1_dir, 'in.xlsx'), {1: 'surname'})
+               if row > 1}
+    recheck = sum(1 for row, value in day1.items() if row > 1 and value in RECHECK_RESULTS)
+    print(f"День 1: {len(day1) - 1} студентів за {elapsed:.1f} с, неостаточних відповідей: {recheck}")
+
+    recordings = os.path.join(day1_dir, 'day2.jsonl')
+    changed = day2_recordings(recordings, queries, args.changed)
+    print(f"До дня 2 змінено видачу {changed} запитів із {len(queries)}")
+    stub = StubServerProcess(recordings=recordings)
+    with stub as api_url:
+        stub_base = api_url.split('/api/')[0]
+        full = day2("recheck, повна пагінація", day1_dir, stub_base, stub, recheck_full_after_hours=0)
+        incremental = day2("recheck, звірка першої сторінки", day1_dir, stub_base, stub)
+    shutil.rmtree(day1_dir)
+
+    if full != incremental:
+        differing = sum(1 for row in full if full[row] != incremental.get(row))
+        sys.exit(f"❌ Відповіді дня 2 відрізняються у {differing} рядках")
+    print("✅ Відповіді обох прогонів дня 2 збігаються")
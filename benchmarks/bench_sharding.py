@@ -0,0 +1,86 @@
+# benchmarks/bench_sharding.py
+"""
+Шардований запуск проти локальної заглушки: 1 шард проти --shards шардів з однаковим
+бюджетом запитів на шард (--rate), плюс прогін, у якому один шард вбивається посеред роботи.
+
+Кожен прогін — справжні `python main.py shard init/work/merge` у тимчасовому каталозі.
+Після merge стовпець результатів порівнюється з однопроцесним прогоном: відповіді
+мають збігтися, а завдання вбитого шарда — дістатися іншим після закінчення оренди.
+
+    python benchmarks/bench_sharding.py --students 600 --shards 4 --rate 15
+"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_e2e import make_workbook  # noqa: E402
+from stub_server import Faults, StubServerProcess  # noqa: E402
+from xlsx_stream import iter_rows  # noqa: E402
+
+
+def shard(workdir: str, *args: str, wait: bool = True):
+    command = [sys.executable, os.path.join(ROOT, 'main.py'), 'shard', *args]
+    if not wait:
+        return subprocess.Popen(command, cwd=workdir, stdout=subprocess.DEVNULL, start_new_session=True)
+    subprocess.run(command, cwd=workdir, stdout=subprocess.DEVNULL, check=True)
+
+
+def results(workdir: str):
+    return {row: values.get(8) for row, values in iter_rows(os.path.join(workdir, 'students_with_results.xlsx'),
+                                                            {1: 'n', 8: 8})}
+
+
+def run(label: str, input_path: str, base_url: str, shards: int, rate: float, kill_after: float = 0.0):
+    workdir = tempfile.mkdtemp(prefix='bench_sharding_')
+    shutil.copy(input_path, os.path.join(workdir, 'in.xlsx'))
+    with open(os.path.join(workdir, 'config.json'), 'w', encoding='utf-8') as f:
+        json.dump({'excel_file_path': 'in.xlsx', 'api_base_url': base_url, 'parser_backend': 'lxml',
+                   'parse_workers': 0, 'cache_enabled': False, 'concurrent_requests': 10,
+                   'initial_requests_per_second': rate, 'shard_lease_sec': 5}, f)
+
+    shard(workdir, 'init')
+    started = time.perf_counter()
+    if kill_after:
+        victim = shard(workdir, 'work', '--name', 'victim', '--rate', str(rate), wait=False)
+        others = shard(workdir, 'work', '--processes', str(shards - 1), '--rate', str(rate), wait=False)
+        time.sleep(kill_after)
+        victim.send_signal(signal.SIGKILL)
+        others.wait()
+    else:
+        shard(workdir, 'work', '--processes', str(shards), '--rate', str(rate))
+    elapsed = time.perf_counter() - started
+    shard(workdir, 'merge')
+    answers = results(workdir)
+    shutil.rmtree(workdir)
+    print(f"{label:<28} {elapsed:>6.1f} с   {len(answers) - 1:>5} студентів")
+    return answers
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=600)
+    parser.add_argument('--shards', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=15, help="запитів/с на шард")
+    args = parser.parse_args()
+
+    input_path = os.path.join(tempfile.mkdtemp(prefix='bench_sharding_in_'), 'students.xlsx')
+    make_workbook(input_path, args.students)
+    with StubServerProcess(faults=Faults(latency_ms=50, latency_jitter_ms=10)) as api_url:
+        base_url = api_url.split('/api/')[0]
+        baseline = run("1 шард", input_path, base_url, 1, args.rate)
+        sharded = run(f"{args.shards} шарди", input_path, base_url, args.shards, args.rate)
+        killed = run(f"{args.shards} шарди, один вбито", input_path, base_url, args.shards, args.rate, kill_after=3)
+
+    for label, answers in (("шарди", sharded), ("з вбитим шардом", killed)):
+        if answers != baseline:
+            sys.exit(f"❌ Відповіді ({label}) відрізняються від однопроцесного прогону")
+    print("✅ Відповіді всіх прогонів збігаються")
@@ -0,0 +1,105 @@
+# benchmarks/bench_startup.py
+"""
+Час старту CLI за `python -X importtime` з бюджетом, який перевіряється.
+
+Сценарії — короткі запуски, яким мережа і Excel-стек не потрібні: `main.py status`,
+`main.py run`, коли всі студенти вже оброблені, і запуск з конфігом без excel_file_path.
+Для кожного береться медіана з --repeat запусків: сума часу імпортів (верхній рівень
+звіту importtime) і повний час процесу. Скрипт завершується з помилкою, якщо імпорти
+сценарію перевищили --budget-ms або якщо завантажився хоч один важкий модуль
+(pandas, numpy, openpyxl, aiohttp, bs4, lxml). Для порівняння показано, скільки коштує
+імпорт самого важкого стеку.
+
+    python benchmarks/bench_startup.py --budget-ms 200 --repeat 5
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_e2e import make_workbook  # noqa: E402
+from excel_writer import save_results_to_excel  # noqa: E402
+
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'aiohttp', 'bs4', 'lxml')
+_IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+
+
+def importtime(command, cwd: str):
+    """(сума імпортів верхнього рівня в мс, повний час процесу в мс, множина імпортованих модулів)."""
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-X', 'importtime', *command], cwd=cwd,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    total_us, modules = 0, set()
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match is None:
+            continue
+        modules.add(match.group(4))
+        if not match.group(3):
+            total_us += int(match.group(2))
+    return total_us / 1000, wall_ms, modules
+
+
+def prepare(workdir: str, students: int) -> None:
+    make_workbook(os.path.join(workdir, 'in.xlsx'), students)
+    # Файл результатів, у якому вже всі відповіді: `run` має вийти одразу
+    shutil.copy(os.path.join(workdir, 'in.xlsx'), os.path.join(workdir, 'students_with_results.xlsx'))
+    done = [{'index': index, 'final_result': "Вже визначився"} for index in range(students)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        save_results_to_excel(os.path.join(workdir, 'students_with_results.xlsx'), done, "Результат перевірки",
+                              'xml_patch')
+    with open(os.path.join(workdir, 'config.json'), 'w', encoding='utf-8') as f:
+        json.dump({'excel_file_path': 'in.xlsx', 'metrics_report_path': None}, f)
+    os.makedirs(os.path.join(workdir, 'no_config'))
+    with open(os.path.join(workdir, 'no_config', 'config.json'), 'w', encoding='utf-8') as f:
+        json.dump({}, f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=200, help="бюджет на імпорти одного сценарію")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--students', type=int, default=500)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_startup_')
+    prepare(workdir, args.students)
+    main_py = os.path.join(ROOT, 'main.py')
+    scenarios = [
+        ("status", [main_py, 'status'], workdir),
+        ("run, усе оброблено", [main_py, 'run'], workdir),
+        ("помилка конфігу", [main_py], os.path.join(workdir, 'no_config')),
+    ]
+
+    heavy_ms, _, _ = importtime(['-c', 'import pandas, openpyxl, aiohttp, bs4, lxml.html'], workdir)
+    print(f"Для порівняння: імпорт pandas+openpyxl+aiohttp+bs4+lxml — {heavy_ms:.0f} мс\n")
+
+    failures = []
+    for label, command, cwd in scenarios:
+        runs = [importtime(command, cwd) for _ in range(args.repeat)]
+        imports_ms = statistics.median(run[0] for run in runs)
+        wall_ms = statistics.median(run[1] for run in runs)
+        heavy = sorted(name for name in set.union(*(run[2] for run in runs)) if name.split('.')[0] in HEAVY_MODULES)
+        print(f"{label:<22} імпорти {imports_ms:>6.0f} мс   процес {wall_ms:>6.0f} мс"
+              + (f"   ❗ {', '.join(heavy[:5])}" if heavy else ""))
+        if imports_ms > args.budget_ms:
+            failures.append(f"{label}: імпорти {imports_ms:.0f} мс > бюджету {args.budget_ms:.0f} мс")
+        if heavy:
+            failures.append(f"{label}: завантажено важкі модулі {', '.join(heavy)}")
+    shutil.rmtree(workdir)
+
+    if failures:
+        sys.exit("❌ " + "\n❌ ".join(failures))
+    print(f"\n✅ Усі сценарії вклались у бюджет {args.budget_ms:.0f} мс без важких модулів")
@@ -0,0 +1,107 @@
+# benchmarks/bench_transport.py
+"""
+Транспорт 'browser' (як досі) проти 'tuned' проти локальної заглушки зі стисненням gzip.
+
+Обидва режими запитують ті самі сторінки (--queries прізвищ з усіма їхніми сторінками,
+частина видач порожня). Звітуються байти запиту і тіла відповіді на сторінку (рахує заглушка)
+і час етапу 'decode' з реєстру metrics. Окремо мікробенчмарк декодування збережених тіл:
+повна сторінка і порожня видача, для 'tuned' — з orjson (якщо встановлено) і без нього.
+Розібрані відповіді обох режимів звіряються.
+
+    python benchmarks/bench_transport.py --queries 300 --concurrency 20
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from api_parser import ApiClient, _decode_browser, _decode_tuned, _fetch_page, _json_loads  # noqa: E402
+from metrics import registry as metrics  # noqa: E402
+from rate_limiter import AdaptiveRateLimiter  # noqa: E402
+from stub_server import PAGE_SIZE, StubServerProcess, render_rows, total_for_query  # noqa: E402
+
+
+def pages_for(queries: int):
+    pages = []
+    for i in range(queries):
+        query = f"Прізвище{i} О. В."
+        pages += [(query, offset) for offset in range(0, max(total_for_query(query), 1), PAGE_SIZE)]
+    return pages
+
+
+async def fetch_all(api_url: str, transport: str, json_decoder: str, pages, concurrency: int):
+    limiter = AdaptiveRateLimiter(max_concurrency=concurrency, initial_rate=5000, max_rate=10000)
+    results = {}
+    async with ApiClient(api_url=api_url, limit_per_host=concurrency, transport=transport,
+                         json_decoder=json_decoder) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(query: str, offset: int) -> None:
+            async with semaphore:
+                results[(query, offset)] = await _fetch_page(query, offset, limiter, client)
+
+        await asyncio.gather(*(one(query, offset) for query, offset in pages))
+    return results
+
+
+def run_mode(stub: StubServerProcess, api_url: str, transport: str, pages, concurrency: int, json_decoder: str = 'json'):
+    stub.reset()
+    metrics.reset()
+    results = asyncio.run(fetch_all(api_url, transport, json_decoder, pages, concurrency))
+    stats = stub.stats()
+    decode = metrics.to_dict()['stages']['decode']
+    count = len(pages)
+    label = transport if json_decoder == 'json' else f"{transport}, {json_decoder}"
+    print(f"{label:<15} запит {stats['request_bytes'] / count:>6.0f} Б/стор   "
+          f"відповідь {stats['response_bytes'] / count:>7.0f} Б/стор   "
+          f"decode {decode['sum'] / decode['count'] * 1e6:>6.0f} мкс/стор")
+    return results
+
+
+def decode_microbench(repeat: int) -> None:
+    query = "Прізвище7 О. В."
+    bodies = {
+        "повна сторінка": json.dumps({'success': True, 'count': 400, 'html': render_rows(query, 0, PAGE_SIZE)},
+                                     ensure_ascii=False).encode('utf-8'),
+        "порожня видача": json.dumps({'success': True, 'count': 0, 'html': ''}).encode('utf-8'),
+    }
+    decoders = [("browser", lambda body: _decode_browser(body, 'utf-8')),
+                ("tuned, json", lambda body: _decode_tuned(body, json.loads))]
+    if importlib.util.find_spec('orjson'):
+        orjson_loads = _json_loads('orjson')
+        decoders.append(("tuned, orjson", lambda body: _decode_tuned(body, orjson_loads)))
+    for label, body in bodies.items():
+        timings = []
+        for name, decode in decoders:
+            if decode(body) != _decode_browser(body, 'utf-8'):
+                sys.exit(f"❌ {name}: інший результат декодування ({label})")
+            seconds = min(timeit.repeat(lambda: decode(body), number=repeat, repeat=5)) / repeat
+            timings.append(f"{name} {seconds * 1e6:>6.1f} мкс")
+        print(f"{label} ({len(body)} Б): " + "   ".join(timings))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=2000, help="повторів у мікробенчмарку")
+    args = parser.parse_args()
+
+    pages = pages_for(args.queries)
+    print(f"{len(pages)} сторінок, orjson: {'є' if importlib.util.find_spec('orjson') else 'немає'}")
+    stub = StubServerProcess(compress=True)
+    with stub as api_url:
+        browser = run_mode(stub, api_url, 'browser', pages, args.concurrency)
+        modes = [run_mode(stub, api_url, 'tuned', pages, args.concurrency)]
+        if importlib.util.find_spec('orjson'):
+            modes.append(run_mode(stub, api_url, 'tuned', pages, args.concurrency, 'orjson'))
+    if any(results != browser for results in modes):
+        sys.exit("❌ Режими розібрали відповіді по-різному")
+    print("✅ Відповіді обох режимів однакові\n")
+    decode_microbench(args.repeat)
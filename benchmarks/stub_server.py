@@ -0,0 +1,369 @@
+# benchmarks/stub_server.py
+"""
+Локальна заглушка API abit-poisk для бенчмарків і офлайн-прогонів.
+
+Віддає JSON тієї ж форми, що й справжній /api/statements/ (`success`, `count`, `html`),
+з пагінацією через `offset`. Сторінки беруться із записів (кеш відповідей
+response_cache.sqlite або JSONL), а для незаписаних запитів генеруються детерміновано.
+
+На вимогу вносить збої: затримку, тіло з 'max_user_connections' (випадково або при
+перевищенні ліміту одночасних запитів; HTML-попередження PHP або валідний JSON з success: false), «Частота запитів ... через N секунд» і 5xx.
+Лічильники — GET /__stats, збої змінюються на льоту — POST /__faults (JSON), POST /__reset.
+З --compress відповіді стискаються gzip, якщо клієнт його пропонує; /__stats рахує
+байти запитів (рядок запиту, заголовки, тіло) і тіл відповідей так, як вони йдуть мережею.
+
+    python benchmarks/stub_server.py --port 8080 --recordings response_cache.sqlite --latency-ms 80 --error-rate 0.02
+
+Краулер спрямовується на заглушку ключем конфігурації "api_base_url": "http://127.0.0.1:8080".
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+import urllib.request
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, Optional, Tuple
+
+from aiohttp import web
+
+PAGE_SIZE = 50
+
+ROW_TEMPLATE = (
+    '<tr>'
+    '<td title="Бакалавр"><div>Б</div></td>'
+    '<td>{name}</td>'
+    '<td>{status}</td>'
+    '<td><a href="/rating/{rank_id}">{rank}</a></td>'
+    '<td>{priority}</td>'
+    '<td><span data-stooltip="Загальна кількість місць">ВМ: 30</span>'
+    '<span data-stooltip="Максимальна кількість бюджетних місць">БМ: 10</span>'
+    '<span data-stooltip="Кількість місць на контракт">К: 20</span></td>'
+    '<td>{score}</td>'
+    '<td>9,5</td>'
+    '<td><dl><dt>Українська мова</dt><dd>{ukr}</dd><dt>Математика</dt><dd>{math}</dd>'
+    '<dt>Історія України</dt><dd>{hist}</dd></dl>'
+    '<ul class="list-unstyled"><li>РК: 1.0</li><li>ГК: 1.02</li></ul></td>'
+    '<td><a href="/univer/{univ_id}">Київський національний університет імені Тараса Шевченка</a></td>'
+    '<td title="Факультет інформаційних технологій">ФІТ</td>'
+    '<td><div>F{spec} Інженерія програмного забезпечення</div><div>Освітня програма {spec}</div></td>'
+    '<td></td>'
+    '<td>{originals}</td>'
+    '</tr>'
+)
+
+
+def render_rows(query: str, start: int, count: int) -> str:
+    """Детерміновано генерує `count` рядків таблиці заяв для запиту, починаючи з `start`."""
+    rows = []
+    for position in range(start, start + count):
+        rng = random.Random(f"{query}:{position}")
+        applicant = position // 5
+        rows.append(ROW_TEMPLATE.format(
+            name=query,
+            status=rng.choice(['Допущено', 'Зареєстровано', 'Рекомендовано']),
+            rank_id=rng.randint(1000, 99999),
+            rank=rng.randint(1, 300),
+            priority=rng.randint(1, 5),
+            score=f"{150 + applicant % 50},{rng.randint(0, 999):03d}",
+            ukr=150 + applicant % 50,
+            math=140 + applicant % 60,
+            hist=160 + applicant % 40,
+            univ_id=rng.randint(1, 300),
+            spec=rng.randint(1, 12),
+            originals='+' if rng.random() < 0.2 else '',
+        ))
+    return f"<table><tbody>{''.join(rows)}</tbody></table>"
+
+
+def total_for_query(query: str) -> int:
+    """Кількість заяв на запит: більшість прізвищ мають кілька заяв, поширені — сотні."""
+    rng = random.Random(query)
+    return rng.choice([0, 3, 5, 12, 40, 120, 400])
+
+
+MAX_USER_CONNECTIONS_BODY = (
+    "<br />\n<b>Warning</b>: mysqli::__construct(): (42000/1203): "
+    "User abit_poisk already has more than 'max_user_connections' active connections"
+)
+
+
+@dataclass
+class Faults:
+    """Налаштування збоїв; частки — ймовірність на кожен запит."""
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    max_user_connections: int = 0  # >0: запити понад цю кількість одночасних отримують 'max_user_connections'
+    max_connections_rate: float = 0.0
+    max_connections_json_share: float = 0.0  # частка таких відповідей у вигляді JSON {"success": false, "error": ...}
+    rate_limit_rate: float = 0.0
+    rate_limit_delay: int = 1  # N у «Частота запитів ... через N секунд»
+    error_rate: float = 0.0
+
+    def update(self, values: Dict) -> None:
+        for field in fields(self):
+            if field.name in values:
+                setattr(self, field.name, type(getattr(self, field.name))(values[field.name]))
+
+
+class Recordings:
+    """Записані відповіді API, ключ — (search, offset)."""
+
+    def __init__(self, pages: Optional[Dict[Tuple[str, int], str]] = None):
+        self.pages = pages or {}
+
+    @classmethod
+    def load(cls, path: str) -> 'Recordings':
+        """
+        Читає кеш відповідей краулера (*.sqlite, таблиця pages) або JSONL
+        з рядками {"search": ..., "offset": ..., "response": {...}}.
+        """
+        pages = {}
+        if path.endswith(('.sqlite', '.db')):
+            with sqlite3.connect(path) as conn:
+                for query, offset, body in conn.execute("SELECT query, offset, body FROM pages"):
+                    pages[(query, int(offset))] = body
+        else:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        pages[(record['search'], int(record.get('offset', 0)))] = json.dumps(record['response'], ensure_ascii=False)
+        return cls(pages)
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+
+class StubState:
+    def __init__(self):
+        self.requests = 0
+        self.connections = set()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.recorded = 0
+        self.generated = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.injected = {'max_user_connections': 0, 'rate_limit': 0, 'server_error': 0}
+
+    def reset(self) -> None:
+        self.__init__()
+
+    def to_dict(self) -> Dict:
+        return {
+            'requests': self.requests, 'connections': len(self.connections), 'peak_in_flight': self.peak_in_flight,
+            'recorded': self.recorded, 'generated': self.generated, 'injected': dict(self.injected),
+            'request_bytes': self.request_bytes, 'response_bytes': self.response_bytes,
+        }
+
+
+async def _statements(request: web.Request) -> web.Response:
+    state: StubState = request.app['state']
+    faults: Faults = request.app['faults']
+    rng: random.Random = request.app['rng']
+    state.requests += 1
+    state.request_bytes += _request_size(request)
+    state.connections.add(request.transport.get_extra_info('peername'))
+    state.in_flight += 1
+    state.peak_in_flight = max(state.peak_in_flight, state.in_flight)
+    try:
+        form = await request.post()
+        query = form.get('search', '')
+        offset = int(form.get('offset', 0) or 0)
+
+        if faults.latency_ms or faults.latency_jitter_ms:
+            await asyncio.sleep(max(0.0, rng.gauss(faults.latency_ms, faults.latency_jitter_ms)) / 1000)
+        over_limit = faults.max_user_connections and state.in_flight > faults.max_user_connections
+        if over_limit or rng.random() < faults.max_connections_rate:
+            state.injected['max_user_connections'] += 1
+            if rng.random() < faults.max_connections_json_share:
+                body = {'success': False, 'error': MAX_USER_CONNECTIONS_BODY}
+                return _respond(request, json.dumps(body, ensure_ascii=False))
+            return _respond(request, MAX_USER_CONNECTIONS_BODY, content_type='text/html')
+        if rng.random() < faults.rate_limit_rate:
+            state.injected['rate_limit'] += 1
+            body = {'success': False, 'message': f"Частота запитів перевищена. Спробуйте через {faults.rate_limit_delay} секунд"}
+            return _respond(request, json.dumps(body, ensure_ascii=False))
+        if rng.random() < faults.error_rate:
+            state.injected['server_error'] += 1
+            status = rng.choice([500, 502, 503])
+            return _respond(request, f"<html><body><h1>{status}</h1></body></html>", status, 'text/html')
+
+        recordings: Recordings = request.app['recordings']
+        recorded = recordings.pages.get((query, offset))
+        if recorded is not None:
+            state.recorded += 1
+            return _respond(request, recorded)
+        if request.app['recorded_only']:
+            total = 0
+        else:
+            total = total_for_query(query)
+            state.generated += 1
+        count = max(0, min(PAGE_SIZE, total - offset))
+        html = render_rows(query, offset, count) if count else ''
+        body = {'success': True, 'count': total, 'html': html}
+        return _respond(request, json.dumps(body, ensure_ascii=False))
+    finally:
+        state.in_flight -= 1
+
+
+def _respond(request: web.Request, text: str, status: int = 200, content_type: str = 'application/json') -> web.Response:
+    body = text.encode('utf-8')
+    headers = {}
+    if request.app['compress'] and 'gzip' in request.headers.get('Accept-Encoding', ''):
+        body = gzip.compress(body, compresslevel=6)
+        headers['Content-Encoding'] = 'gzip'
+    request.app['state'].response_bytes += len(body)
+    return web.Response(body=body, status=status, content_type=content_type, charset='utf-8', headers=headers)
+
+
+def _request_size(request: web.Request) -> int:
+    """Приблизний розмір запиту в мережі: рядок запиту, заголовки і тіло."""
+    request_line = len(request.method) + len(request.raw_path) + len(' HTTP/1.1\r\n') + 1
+    headers = sum(len(name) + len(value) + 4 for name, value in request.raw_headers) + 2
+    return request_line + headers + (request.content_length or 0)
+
+
+async def _stats(request: web.Request) -> web.Response:
+    return web.json_response({**request.app['state'].to_dict(), 'faults': asdict(request.app['faults'])})
+
+
+async def _set_faults(request: web.Request) -> web.Response:
+    request.app['faults'].update(await request.json())
+    return web.json_response(asdict(request.app['faults']))
+
+
+async def _reset(request: web.Request) -> web.Response:
+    request.app['state'].reset()
+    return web.json_response({'ok': True})
+
+
+def make_app(faults: Optional[Faults] = None, recordings: Optional[Recordings] = None,
+             recorded_only: bool = False, seed: Optional[int] = None, compress: bool = False) -> web.Application:
+    app = web.Application()
+    app['state'] = StubState()
+    app['faults'] = faults or Faults()
+    app['recordings'] = recordings or Recordings()
+    app['recorded_only'] = recorded_only
+    app['rng'] = random.Random(seed)
+    app['compress'] = compress
+    app.router.add_post('/api/statements/', _statements)
+    app.router.add_get('/__stats', _stats)
+    app.router.add_post('/__faults', _set_faults)
+    app.router.add_post('/__reset', _reset)
+    return app
+
+
+async def start_stub_server(host: str = '127.0.0.1', port: int = 0, **options) -> Tuple[web.AppRunner, str, StubState]:
+    """Запускає заглушку і повертає (runner, url ендпоінта, лічильники). `options` — як у make_app."""
+    app = make_app(**options)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}/api/statements/", app['state']
+
+
+class StubServerProcess:
+    """
+    Заглушка в окремому процесі, щоб її CPU не змагався з клієнтом у бенчмарку.
+
+        with StubServerProcess(faults=Faults(latency_ms=50)) as url:
+            ...
+
+    `base_url` — значення для ключа конфігурації api_base_url.
+    """
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, faults: Optional[Faults] = None,
+                 recordings: Optional[str] = None, recorded_only: bool = False, seed: Optional[int] = None,
+                 compress: bool = False):
+        self.host = host
+        self.port = port or _free_port(host)
+        self.faults = faults or Faults()
+        self.recordings = recordings
+        self.recorded_only = recorded_only
+        self.seed = seed
+        self.compress = compress
+        self.process = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def __enter__(self) -> str:
+        args = [sys.executable, os.path.abspath(__file__), '--host', self.host, '--port', str(self.port)]
+        for name, value in asdict(self.faults).items():
+            args += [f"--{name.replace('_', '-')}", str(value)]
+        if self.recordings:
+            args += ['--recordings', self.recordings]
+        if self.recorded_only:
+            args.append('--recorded-only')
+        if self.seed is not None:
+            args += ['--seed', str(self.seed)]
+        if self.compress:
+            args.append('--compress')
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL)
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection((self.host, self.port), timeout=0.2):
+                    break
+            except OSError:
+                time.sleep(0.05)
+        else:
+            self.__exit__(None, None, None)
+            raise RuntimeError("Заглушка не запустилась за 10 секунд")
+        return f"{self.base_url}/api/statements/"
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait(timeout=5)
+            self.process = None
+
+    def _call(self, method: str, path: str, payload: Optional[Dict] = None) -> Dict:
+        data = json.dumps(payload).encode() if payload is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return json.loads(response.read())
+
+    def stats(self) -> Dict:
+        return self._call('GET', '/__stats')
+
+    def set_faults(self, **values) -> Dict:
+        return self._call('POST', '/__faults', values)
+
+    def reset(self) -> Dict:
+        return self._call('POST', '/__reset', {})
+
+
+def _free_port(host: str) -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--recordings', help="response_cache.sqlite або JSONL із записаними відповідями")
+    parser.add_argument('--recorded-only', action='store_true', help="незаписані запити — порожня видача")
+    parser.add_argument('--seed', type=int, help="зерно генератора збоїв")
+    parser.add_argument('--compress', action='store_true', help="стискати відповіді gzip, якщо клієнт його пропонує")
+    for field in fields(Faults):
+        parser.add_argument(f"--{field.name.replace('_', '-')}", type=type(field.default), default=field.default)
+    args = parser.parse_args()
+
+    recordings = Recordings.load(args.recordings) if args.recordings else Recordings()
+    faults = Faults(**{field.name: getattr(args, field.name) for field in fields(Faults)})
+    app = make_app(faults, recordings, args.recorded_only, args.seed, args.compress)
+    web.run_app(app, host=args.host, port=args.port, access_log=None, print=None)
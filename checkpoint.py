@@ -0,0 +1,167 @@
+# checkpoint.py
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from excel_writer import WRITER_MODES, save_results_to_excel
+
+
+class ResultJournal:
+    """
+    Журнал результатів (append-only JSONL): один рядок на кожного обробленого студента.
+
+    Запис іде одразу після обробки, тому навіть жорстке завершення процесу
+    (OOM, SIGKILL, вимкнення живлення) втрачає щонайбільше останній недописаний рядок.
+    Кожен запис має час `ts`; якщо у студента є `snapshot` (кількість заяв за API,
+    відбиток першої сторінки, час останньої повної пагінації), він теж пишеться в запис —
+    з ним повторна перевірка наступного дня (main.py recheck) пропускає незмінні видачі.
+    """
+
+    def __init__(self, path: str, fsync_every: int = 50):
+        self.path = path
+        self.fsync_every = fsync_every
+        self._since_fsync = 0
+        self._file = None
+
+    def replay(self) -> Dict[int, Dict]:
+        """Повертає останній запис для кожного індексу. Пошкоджений хвіст файлу ігнорується."""
+        records: Dict[int, Dict] = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    records[int(record['index'])] = record
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return records
+
+    def append(self, student: Dict) -> Dict:
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        record = {
+            'index': student['index'],
+            'search_name': student.get('search_name'),
+            'final_result': student['final_result'],
+            'ts': datetime.now().isoformat(timespec='seconds'),
+        }
+        record.update(student.get('snapshot') or {})
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        self._since_fsync += 1
+        if self._since_fsync >= self.fsync_every:
+            os.fsync(self._file.fileno())
+            self._since_fsync = 0
+        return record
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+
+class ResultSink:
+    """
+    Приймає результати студентів: пише їх у журнал і пачками переносить в Excel.
+
+    Excel оновлюється кожні `save_every_rows` результатів або раз на `save_interval`
+    секунд (що настане раніше) у фоновому потоці, а не лише один раз при виході.
+    `writer_mode` — режим save_results_to_excel ('xml_patch' або 'openpyxl').
+    """
+
+    def __init__(self, excel_path: str, col_name: str, journal_path: Optional[str] = None,
+                 save_every_rows: int = 200, save_interval: float = 300, writer_mode: str = 'xml_patch'):
+        if writer_mode not in WRITER_MODES:
+            raise ValueError(f"Невідомий режим запису Excel '{writer_mode}'. Доступні: {', '.join(WRITER_MODES)}")
+        self.excel_path = excel_path
+        self.col_name = col_name
+        self.writer_mode = writer_mode
+        self.journal = ResultJournal(journal_path or os.path.splitext(excel_path)[0] + '.journal.jsonl')
+        self.save_every_rows = save_every_rows
+        self.save_interval = save_interval
+        self.pending: List[Dict] = []
+        self.recorded = 0
+        self.restored = 0
+        self._replayed: Optional[Dict[int, Dict]] = None
+        self._last_save = time.monotonic()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(cls, config: Dict, excel_path: str) -> 'ResultSink':
+        return cls(
+            excel_path=excel_path,
+            col_name=config.get("output_column_name", "Результат перевірки"),
+            journal_path=config.get("journal_path"),
+            save_every_rows=config.get("excel_save_every_rows", 200),
+            save_interval=config.get("excel_save_interval_sec", 300),
+            writer_mode=config.get("excel_writer_mode", "xml_patch"),
+        )
+
+    def restore(self, student: Dict) -> bool:
+        """
+        Відновлює результат студента з журналу попереднього запуску, якщо він там є.
+
+        Запис приймається, лише якщо search_name збігається (захист від іншого файлу).
+        Відновлений результат стає в чергу на запис в Excel.
+        """
+        record = self.previous_record(student)
+        if record is None:
+            return False
+        student['final_result'] = record['final_result']
+        student[self.col_name] = record['final_result']
+        self.pending.append({'index': student['index'], 'final_result': record['final_result']})
+        self.restored += 1
+        return True
+
+    def previous_record(self, student: Dict) -> Optional[Dict]:
+        """Останній запис журналу для студента (None, якщо його немає або search_name інший)."""
+        if self._replayed is None:
+            self._replayed = self.journal.replay()
+        record = self._replayed.get(student['index'])
+        if record is None or record.get('search_name') != student.get('search_name'):
+            return None
+        return record
+
+    def record(self, student: Dict) -> None:
+        """
+        Фіксує результат студента в журналі та, за потреби, запускає фонове збереження Excel.
+        Результат, який уже стоїть у файлі (повторна перевірка без змін), в Excel не переписується.
+        """
+        self.journal.append(student)
+        if student['final_result'] != student.get(self.col_name):
+            self.pending.append({'index': student['index'], 'final_result': student['final_result']})
+        self.recorded += 1
+        due = (len(self.pending) >= self.save_every_rows
+               or time.monotonic() - self._last_save >= self.save_interval)
+        if due and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_async())
+
+    async def _flush_async(self) -> None:
+        batch, self.pending = self.pending, []
+        self._last_save = time.monotonic()
+        saved = await asyncio.to_thread(save_results_to_excel, self.excel_path, batch, self.col_name,
+                                        self.writer_mode)
+        if not saved:
+            # Файл міг бути відкритий в Excel — спробуємо з наступною пачкою
+            self.pending = batch + self.pending
+
+    async def drain(self) -> None:
+        """Дочікується фонового збереження, якщо воно ще триває."""
+        if self._flush_task is not None:
+            await self._flush_task
+
+    def close(self) -> None:
+        """Синхронно зберігає все, що лишилось, і закриває журнал."""
+        self.journal.close()
+        if self.pending:
+            batch, self.pending = self.pending, []
+            if not save_results_to_excel(self.excel_path, batch, self.col_name, self.writer_mode):
+                self.pending = batch
+        else:
+            print("Немає нових результатів для збереження.")
@@ -1,8 +1,18 @@
-    
 # excel_reader.py
-import pandas as pd
+import io
 import os
-from typing import List, Dict, Optional
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+
+import xlsx_stream
+
+# pandas потрібен лише рушіям 'openpyxl' і 'calamine'; його імпорт коштує ~0.5 с на старті
+if TYPE_CHECKING:
+    import pandas as pd
+
+REQUIRED_COLUMNS = ['Прізвище', "Ім'я", 'По батькові', 'Конк. бал']
+OPTIONAL_COLUMNS = ['Код спец', 'Результат перевірки']
+
 
 def read_students_from_excel(file_path: str) -> Optional[List[Dict]]:
     """
@@ -15,62 +25,179 @@ def read_students_from_excel(file_path: str) -> Optional[List[Dict]]:
 
     try:
         print(f"📖 Читаю дані з файлу '{os.path.basename(file_path)}'...")
-        df = pd.read_excel(file_path, engine='openpyxl')
-
-        # Перевіряємо наявність обов'язкових стовпців
-        required_columns = ['Прізвище', "Ім'я", 'По батькові', 'Конк. бал']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            print(f"❌ Помилка: У файлі Excel відсутні обов'язкові стовпці: {missing_columns}")
-            return None
-
-        students_list = []
-        for index, row in df.iterrows():
-            # Пропускаємо порожні рядки, орієнтуючись на прізвище
-            if pd.isna(row['Прізвище']):
-                continue
-
-            last_name = str(row['Прізвище']).strip()
-            first_name = str(row["Ім'я"]).strip()
-            patronymic = str(row['По батькові']).strip()
-            
-            # Формуємо ім'я для пошуку у форматі "Прізвище І. П."
-            first_name_initial = f"{first_name[0]}." if first_name else ''
-            patronymic_initial = f" {patronymic[0]}." if patronymic else ''
-            search_name = f"{last_name} {first_name_initial}{patronymic_initial}".strip()
-            
-            # --- ВИПРАВЛЕННЯ ТУТ ---
-            # Безпечна обробка коду спеціальності
-            raw_spec_code = row.get('Код спец')
-            if pd.notna(raw_spec_code):
-                # Просто перетворюємо на рядок і прибираємо '.0' в кінці, якщо це було число
-                specialty_code = str(raw_spec_code).replace('.0', '').strip()
-            else:
-                specialty_code = None
-            # --- КІНЕЦЬ ВИПРАВЛЕННЯ ---
-
-            # Обробка вже існуючих результатів
-            raw_result = row.get('Результат перевірки')
-            current_result = str(raw_result).strip() if pd.notna(raw_result) else None
-
-            student_data = {
-                'index': index,
-                'search_name': search_name,
-                'last_name': last_name,
-                'first_name': first_name,
-                'patronymic': patronymic,
-                'score': row['Конк. бал'],
-                'specialty_code': specialty_code,
-                'Результат перевірки': current_result
-            }
-            students_list.append(student_data)
-        
+        students_list = list(iter_students_from_excel(file_path))
         print(f"✅ Успішно оброблено {len(students_list)} записів з файлу.")
         return students_list
-        
+
+    except ValueError as e:
+        print(f"❌ Помилка: {e}")
+        return None
     except Exception as e:
         # Додаємо виведення типу помилки для кращої діагностики
         print(f"❌ Виникла неочікувана помилка під час читання файлу Excel: {type(e).__name__}: {e}")
         return None
 
-  
\ No newline at end of file
+
+def iter_students_from_excel(file_path: str, chunk_size: int = 5000, engine: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Ліниво віддає студентів з Excel-файлу пачками по `chunk_size` рядків.
+
+    Читаються лише потрібні стовпці. Рушії:
+      - 'xml' (за замовчуванням) — потоковий розбір XML аркуша (xlsx_stream), найшвидший;
+        рядки будуються без pandas, тож ні pandas, ні openpyxl не імпортуються;
+      - 'openpyxl' — потоково через openpyxl read_only;
+      - 'calamine' — pd.read_excel з python-calamine (якщо встановлено), аркуш читається цілком.
+    Для 'openpyxl' і 'calamine' `search_name` і `specialty_code` будуються
+    векторизованими рядковими операціями pandas.
+
+    Raises:
+        ValueError: Якщо у файлі відсутні обов'язкові стовпці.
+    """
+    engine = engine or 'xml'
+    if engine not in READER_ENGINES:
+        raise ValueError(f"Невідомий рушій читання Excel '{engine}'. Допустимі значення: {', '.join(READER_ENGINES)}")
+    if engine == 'xml':
+        yield from _iter_students_xml(file_path)
+        return
+    frames = FRAME_ENGINES[engine](file_path, chunk_size)
+    for frame in frames:
+        yield from _students_from_frame(frame)
+
+
+def _iter_students_xml(file_path: str) -> Iterator[Dict]:
+    """Те саме, що _students_from_frame, але по рядку і без pandas (порожня клітинка — None)."""
+    # Читаємо з копії в пам'яті: під час довгого прогону той самий файл
+    # періодично перезаписується пачками результатів.
+    with open(file_path, 'rb') as f:
+        data = io.BytesIO(f.read())
+    positions = _column_positions(xlsx_stream.read_header(data))
+    columns = {pos + 1: name for name, pos in positions.items()}
+
+    for row_number, values in xlsx_stream.iter_rows(data, columns):
+        last_name = values.get('Прізвище')
+        if row_number == 1 or last_name is None:
+            continue
+        last_name = str(last_name).strip()
+        # 'nan' для порожніх клітинок — як str(NaN) у версії на pandas
+        first_name = _text(values.get("Ім'я"), 'nan')
+        patronymic = _text(values.get('По батькові'), 'nan')
+        first_name_initial = f"{first_name[0]}." if first_name else ''
+        patronymic_initial = f" {patronymic[0]}." if patronymic else ''
+        raw_spec_code = values.get('Код спец')
+        score = values.get('Конк. бал')
+        yield {
+            'index': row_number - 2,
+            'search_name': f"{last_name} {first_name_initial}{patronymic_initial}".strip(),
+            'last_name': last_name,
+            'first_name': first_name,
+            'patronymic': patronymic,
+            'score': float('nan') if score is None else score,
+            'specialty_code': str(raw_spec_code).replace('.0', '').strip() if raw_spec_code is not None else None,
+            'Результат перевірки': _text(values.get('Результат перевірки'), None),
+        }
+
+
+def _text(value, empty: Optional[str]) -> Optional[str]:
+    return empty if value is None else str(value).strip()
+
+
+def _iter_frames_openpyxl(file_path: str, chunk_size: int) -> Iterator['pd.DataFrame']:
+    import numpy as np
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    # Читаємо з копії в пам'яті: під час довгого прогону той самий файл
+    # періодично перезаписується пачками результатів.
+    with open(file_path, 'rb') as f:
+        workbook = load_workbook(filename=io.BytesIO(f.read()), read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        header = next(sheet.iter_rows(max_row=1, values_only=True), None) or ()
+        names = [str(value).strip() if value is not None else '' for value in header]
+        positions = _column_positions(names)
+        # Клітинки правіше за останній потрібний стовпець не розбираємо
+        rows = sheet.iter_rows(min_row=2, max_col=max(positions.values()) + 1, values_only=True)
+
+        start = 0
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            data = {name: [row[pos] if pos < len(row) else None for row in chunk] for name, pos in positions.items()}
+            frame = pd.DataFrame(data, index=pd.RangeIndex(start, start + len(chunk)))
+            # Порожні клітинки — NaN, як у pd.read_excel
+            yield frame.where(frame.notna(), np.nan)
+            start += len(chunk)
+    finally:
+        workbook.close()
+
+
+def _iter_frames_calamine(file_path: str, chunk_size: int) -> Iterator['pd.DataFrame']:
+    import pandas as pd
+
+    header = pd.read_excel(file_path, engine='calamine', nrows=0)
+    positions = _column_positions([str(name).strip() for name in header.columns])
+    df = pd.read_excel(file_path, engine='calamine', usecols=sorted(positions.values()))
+    df.columns = [name for name, _ in sorted(positions.items(), key=lambda item: item[1])]
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+FRAME_ENGINES = {
+    'openpyxl': _iter_frames_openpyxl,
+    'calamine': _iter_frames_calamine,
+}
+READER_ENGINES = ('xml', *FRAME_ENGINES)
+
+
+def _column_positions(names: List[str]) -> Dict[str, int]:
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in names]
+    if missing_columns:
+        raise ValueError(f"У файлі Excel відсутні обов'язкові стовпці: {missing_columns}")
+    return {col: names.index(col) for col in REQUIRED_COLUMNS + OPTIONAL_COLUMNS if col in names}
+
+
+def _students_from_frame(df: 'pd.DataFrame') -> Iterator[Dict]:
+    # Пропускаємо порожні рядки, орієнтуючись на прізвище
+    df = df[df['Прізвище'].notna()]
+    if df.empty:
+        return
+
+    # fillna('nan') повторює str(NaN) попередньої построчної версії для порожніх клітинок
+    last_name = df['Прізвище'].astype(str).str.strip()
+    first_name = df["Ім'я"].fillna('nan').astype(str).str.strip()
+    patronymic = df['По батькові'].fillna('nan').astype(str).str.strip()
+
+    # Формуємо ім'я для пошуку у форматі "Прізвище І. П."
+    first_name_initial = (first_name.str[0] + '.').where(first_name != '', '')
+    patronymic_initial = (' ' + patronymic.str[0] + '.').where(patronymic != '', '')
+    search_name = (last_name + ' ' + first_name_initial + patronymic_initial).str.strip()
+
+    # Код спеціальності: рядок без '.0' в кінці, якщо це було число
+    if 'Код спец' in df:
+        raw_spec_code = df['Код спец']
+        specialty_code = raw_spec_code.astype(str).str.replace('.0', '', regex=False).str.strip()
+        specialty_code = specialty_code.astype(object).where(raw_spec_code.notna(), None).tolist()
+    else:
+        specialty_code = [None] * len(df)
+
+    # Обробка вже існуючих результатів
+    if 'Результат перевірки' in df:
+        raw_result = df['Результат перевірки']
+        current_result = raw_result.astype(str).str.strip().astype(object).where(raw_result.notna(), None).tolist()
+    else:
+        current_result = [None] * len(df)
+
+    for index, search, last, first, patr, score, spec, result in zip(
+            df.index.tolist(), search_name.tolist(), last_name.tolist(), first_name.tolist(),
+            patronymic.tolist(), df['Конк. бал'].tolist(), specialty_code, current_result):
+        yield {
+            'index': index,
+            'search_name': search,
+            'last_name': last,
+            'first_name': first,
+            'patronymic': patr,
+            'score': score,
+            'specialty_code': spec,
+            'Результат перевірки': result
+        }
@@ -1,55 +1,111 @@
 import os
-from openpyxl import load_workbook
-from openpyxl.utils.exceptions import InvalidFileException
-from typing import List, Dict
+import zipfile
+from typing import List, Dict, Optional, Tuple
 
-def save_results_to_excel(file_path: str, students_data: List[Dict], col_name: str):
+from metrics import registry as metrics
+from xlsx_patch import UnsupportedSheetError, patch_column, read_layout
+
+# 'xml_patch' — правка лише стовпця результатів у XML аркуша, 'openpyxl' — повне перезбереження книги
+WRITER_MODES = ('xml_patch', 'openpyxl')
+
+
+def find_result_column(header: List[Optional[object]], col_name: str, max_column: int) -> Tuple[int, bool]:
     """
-    Відкриває Excel-файл і записує результати, орієнтуючись на позицію стовпця "Телефон".
+    Номер стовпця результатів (з 1) і чи треба записати в нього заголовок `col_name`.
+
+    `header` — значення першого рядка (None для порожніх клітинок), `max_column` — останній стовпець аркуша.
     """
-    print(f"\n💾 Зберігаю всі результати у файл '{os.path.basename(file_path)}'...")
+    normalized = [str(value).strip().lower() if value is not None else "" for value in header]
+
+    # --- НОВА, БІЛЬШ НАДІЙНА ЛОГІКА ПОШУКУ СТОВПЦЯ ---
     try:
-        workbook = load_workbook(filename=file_path)
-        sheet = workbook.active
+        # 1. Шукаємо стовпець "Телефон" як надійний орієнтир
+        phone_col_index = normalized.index("телефон") + 1
+        # Наш цільовий стовпець знаходиться через один після "Телефону"
+        col_index = phone_col_index + 2
 
-        header = [str(cell.value).strip().lower() if cell.value is not None else "" for cell in sheet[1]]
-        col_index = None
+        # Перевіримо, чи є у цього стовпця заголовок. Якщо ні, додамо.
+        return col_index, col_index > len(header) or header[col_index - 1] is None
 
-        # --- НОВА, БІЛЬШ НАДІЙНА ЛОГІКА ПОШУКУ СТОВПЦЯ ---
+    except ValueError:
+        # 2. Якщо "Телефон" не знайдено, повертаємося до старої логіки
+        print("⚠️ Стовпець 'Телефон' не знайдено. Спробую знайти за назвою '{col_name}'.")
         try:
-            # 1. Шукаємо стовпець "Телефон" як надійний орієнтир
-            phone_col_index = header.index("телефон") + 1
-            # Наш цільовий стовпець знаходиться через один після "Телефону"
-            col_index = phone_col_index + 2
-            
-            # Перевіримо, чи є у цього стовпця заголовок. Якщо ні, додамо.
-            if sheet.cell(row=1, column=col_index).value is None:
-                sheet.cell(row=1, column=col_index, value=col_name)
-
+            return normalized.index(col_name.strip().lower()) + 1, False
         except ValueError:
-            # 2. Якщо "Телефон" не знайдено, повертаємося до старої логіки
-            print("⚠️ Стовпець 'Телефон' не знайдено. Спробую знайти за назвою '{col_name}'.")
+            print(f"⚠️ Стовпець '{col_name}' також не знайдено. Створюю новий в кінці таблиці.")
+            return max_column + 1, True
+    # --- КІНЕЦЬ НОВОЇ ЛОГІКИ ---
+
+
+@metrics.timed('excel_save')
+def save_results_to_excel(file_path: str, students_data: List[Dict], col_name: str, mode: str = 'openpyxl') -> bool:
+    """
+    Відкриває Excel-файл і записує результати, орієнтуючись на позицію стовпця "Телефон".
+
+    У режимі 'xml_patch' книга не завантажується цілком: змінюються лише клітинки
+    стовпця результатів у XML аркуша (див. xlsx_patch). Якщо аркуш має незвичну
+    будову, збереження переходить на openpyxl.
+
+    Returns:
+        True, якщо файл успішно збережено.
+    """
+    if mode not in WRITER_MODES:
+        raise ValueError(f"Невідомий режим запису Excel '{mode}'. Доступні: {', '.join(WRITER_MODES)}")
+    print(f"\n💾 Зберігаю всі результати у файл '{os.path.basename(file_path)}'...")
+    try:
+        if mode == 'xml_patch':
             try:
-                col_index = header.index(col_name.strip().lower()) + 1
-            except ValueError:
-                print(f"⚠️ Стовпець '{col_name}' також не знайдено. Створюю новий в кінці таблиці.")
-                col_index = sheet.max_column + 1
-                sheet.cell(row=1, column=col_index, value=col_name)
-        # --- КІНЕЦЬ НОВОЇ ЛОГІКИ ---
-
-        # Оновлюємо комірки для кожного студента з результатом
-        for student in students_data:
-            if 'final_result' in student:
-                excel_row = student['index'] + 2
-                sheet.cell(row=excel_row, column=col_index, value=student['final_result'])
-        
-        workbook.save(filename=file_path)
+                _save_xml_patch(file_path, students_data, col_name)
+                print("✅ Файл успішно збережено!")
+                return True
+            except UnsupportedSheetError as e:
+                print(f"⚠️ Не вдалося оновити аркуш напряму ({e}). Зберігаю через openpyxl.")
+
+        _save_openpyxl(file_path, students_data, col_name)
         print("✅ Файл успішно збережено!")
+        return True
 
     except (PermissionError, IOError):
         print(f"❌ ПОМИЛКА ЗАПИСУ: Не вдалося зберегти файл. "
               f"Переконайтесь, що він не відкритий в іншій програмі.")
-    except (InvalidFileException, FileNotFoundError):
+    except (FileNotFoundError, zipfile.BadZipFile):
         print(f"❌ ПОМИЛКА: Не вдалося відкрити файл. Можливо, він пошкоджений.")
     except Exception as e:
-        print(f"❌ НЕОЧІКУВАНА ПОМИЛКА під час запису в Excel: {e}")
\ No newline at end of file
+        print(f"❌ НЕОЧІКУВАНА ПОМИЛКА під час запису в Excel: {e}")
+    return False
+
+
+def _save_openpyxl(file_path: str, students_data: List[Dict], col_name: str) -> None:
+    # openpyxl імпортується лише тут: у режимі 'xml_patch' він зазвичай не потрібен зовсім
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        workbook = load_workbook(filename=file_path)
+    except InvalidFileException as e:
+        # Для викликача це той самий випадок, що й пошкоджений архів
+        raise zipfile.BadZipFile(str(e)) from e
+    sheet = workbook.active
+
+    header = [cell.value for cell in sheet[1]]
+    col_index, write_header = find_result_column(header, col_name, sheet.max_column)
+    if write_header:
+        sheet.cell(row=1, column=col_index, value=col_name)
+
+    # Оновлюємо комірки для кожного студента з результатом
+    for student in students_data:
+        if 'final_result' in student:
+            excel_row = student['index'] + 2
+            sheet.cell(row=excel_row, column=col_index, value=student['final_result'])
+
+    workbook.save(filename=file_path)
+
+
+def _save_xml_patch(file_path: str, students_data: List[Dict], col_name: str) -> None:
+    header, max_column = read_layout(file_path)
+    col_index, write_header = find_result_column(header, col_name, max_column)
+    values = {student['index'] + 2: student['final_result'] for student in students_data if 'final_result' in student}
+    if write_header:
+        values[1] = col_name
+    patch_column(file_path, col_index, values)
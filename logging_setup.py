@@ -0,0 +1,75 @@
+# logging_setup.py
+"""
+Неблокуючий журнал налагодження (debug_log.txt) на стандартному logging.
+
+Воркери лише кладуть записи в чергу (QueueHandler), а окремий потік (QueueListener)
+пише їх пачками в один відкритий файл з ротацією. Ні глобального asyncio.Lock,
+ні відкриття файлу на кожен запис.
+"""
+import gzip
+import logging
+import os
+import queue
+import shutil
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
+from typing import Callable, Dict
+
+LOGGER_NAME = 'pageparser'
+LOG_FORMAT = '%(asctime)s %(levelname)-7s %(name)s | %(message)s'
+
+
+def _gzip_namer(name: str) -> str:
+    return name + '.gz'
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def setup_logging(path: str = 'debug_log.txt', level: str = 'INFO', max_bytes: int = 50 * 1024 * 1024,
+                  backup_count: int = 5, compress: bool = False, batch_size: int = 256) -> Callable[[], None]:
+    """
+    Підключає фоновий запис логера 'pageparser' у файл `path`.
+
+    Записи буферизуються по `batch_size` штук; WARNING і вище скидаються на диск одразу.
+    При досягненні `max_bytes` файл ротується (до `backup_count` архівів, з gzip,
+    якщо `compress`). max_bytes=0 вимикає ротацію.
+
+    Повертає функцію зупинки, яка дописує буфер і закриває файл.
+    """
+    file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    if compress:
+        file_handler.namer = _gzip_namer
+        file_handler.rotator = _gzip_rotator
+    batching_handler = MemoryHandler(batch_size, flushLevel=logging.WARNING, target=file_handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, batching_handler)
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    queue_handler = QueueHandler(log_queue)
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+    listener.start()
+
+    def stop() -> None:
+        logger.removeHandler(queue_handler)
+        listener.stop()
+        batching_handler.close()
+        file_handler.close()
+
+    return stop
+
+
+def setup_logging_from_config(config: Dict) -> Callable[[], None]:
+    return setup_logging(
+        path=config.get("log_file", "debug_log.txt"),
+        level=config.get("log_level", "INFO"),
+        max_bytes=config.get("log_max_bytes", 50 * 1024 * 1024),
+        backup_count=config.get("log_backup_count", 5),
+        compress=config.get("log_compress", False),
+    )
@@ -0,0 +1,101 @@
+# lxml_parser.py
+"""
+Швидкий розбір HTML-таблиці заяв напряму через lxml.html.
+
+Дає ті самі заяви (application.Application), що й parse_applications на BeautifulSoup,
+але без побудови дерева bs4: усі XPath-вирази та регулярки скомпільовані один раз.
+"""
+import re
+from typing import List
+
+from lxml import etree, html
+
+from application import Application
+
+BASE_URL = "https://abit-poisk.org.ua"
+
+_TBODIES = etree.XPath('//tbody')
+_ROWS = etree.XPath('.//tr')
+_CELLS = etree.XPath('.//td')
+_DIVS = etree.XPath('.//div')
+_DTS = etree.XPath('.//dt')
+_DDS = etree.XPath('.//dd')
+_SPANS = etree.XPath('.//span')
+_LINKS = etree.XPath('.//a')
+_COEFF_LISTS = etree.XPath(".//ul[contains(concat(' ', normalize-space(@class), ' '), ' list-unstyled ')]")
+_LIST_ITEMS = etree.XPath('.//li')
+
+_NUMBER_RE = re.compile(r'\d+')
+_SPECIALTY_RE = re.compile(r'^([A-Z0-9]+)(.*)')
+
+
+def _text(element) -> str:
+    """Аналог bs4 get_text(strip=True): кожен текстовий вузол обрізається і склеюється без роздільника."""
+    return ''.join(part.strip() for part in element.itertext())
+
+
+def _first_href(cell) -> str:
+    links = _LINKS(cell)
+    return BASE_URL + links[0].get('href', '') if links else ''
+
+
+def parse_applications_lxml(html_content: str) -> List[Application]:
+    """Розбирає HTML з API abit-poisk у список заяв (той самий формат, що й parse_applications)."""
+    if not html_content or not html_content.strip():
+        return []
+    try:
+        root = html.fromstring(html_content)
+    except (etree.ParserError, ValueError):
+        return []
+
+    applications = []
+    for table_body in _TBODIES(root):
+        for row in _ROWS(table_body):
+            cells = _CELLS(row)
+            if len(cells) < 14: continue
+            try:
+                rank_position_text = _text(cells[3]); rank_position = int(rank_position_text) if rank_position_text.isdigit() else 0
+                total_score_text = _text(cells[6]).replace(',', '.'); total_score = float(total_score_text) if total_score_text else 0.0
+
+                scores = {}; score_components_cell = cells[8]
+                for subject, point in zip(_DTS(score_components_cell), _DDS(score_components_cell)):
+                    score_value = _text(point)
+                    scores[_text(subject)] = int(score_value) if score_value.isdigit() else score_value
+                coefficients = {}; coeffs_lists = _COEFF_LISTS(score_components_cell)
+                if coeffs_lists:
+                    for li in _LIST_ITEMS(coeffs_lists[0]):
+                        coeff_text = _text(li)
+                        if ':' in coeff_text: key, value = coeff_text.split(':', 1); coefficients[key.strip()] = value.strip()
+
+                places_info = {}
+                for span in _SPANS(cells[5]):
+                    text = _text(span); tooltip = span.get('data-stooltip', '').lower()
+                    numbers = _NUMBER_RE.findall(text)
+                    if not numbers: continue
+                    number = int(numbers[0]); text_lower = text.lower()
+                    if 'вм' in text_lower or 'загальна кількість' in tooltip: places_info['total'] = number
+                    elif 'бм' in text_lower or 'бюджетних' in tooltip: places_info['budget_max'] = number
+                    elif 'к' in text_lower or 'контракт' in tooltip: places_info['contract'] = number
+
+                specialty_divs = _DIVS(cells[11]); specialty_full = _text(specialty_divs[0]) if specialty_divs else ''
+                specialty_code = ''; specialty_name = ''
+                if specialty_full:
+                    match = _SPECIALTY_RE.match(specialty_full)
+                    if match: specialty_code = match.group(1); specialty_name = match.group(2).strip()
+                    else: specialty_name = specialty_full
+                specialization = _text(specialty_divs[1]) if len(specialty_divs) > 1 else ''
+
+                application_data = {
+                    'degree_level_short': _text(_DIVS(cells[0])[0]), 'degree_level_full': cells[0].get('title', '').strip(),
+                    'applicant_name': _text(cells[1]), 'status': _text(cells[2]),
+                    'rank_position': rank_position, 'rank_url': _first_href(cells[3]),
+                    'priority': ' '.join(_text(cells[4]).split()), 'places': places_info, 'total_score': total_score,
+                    'avg_document_score': _text(cells[7]), 'score_components': scores, 'coefficients': coefficients,
+                    'university_name': _text(cells[9]), 'university_url': _first_href(cells[9]),
+                    'faculty_short': _text(cells[10]), 'faculty_full': cells[10].get('title', '').strip(),
+                    'specialty_code': specialty_code, 'specialty_name': specialty_name, 'specialization': specialization,
+                    'quota': _text(cells[12]), 'originals_submitted': _text(cells[13]) == '+',
+                }
+                applications.append(Application.from_dict(application_data))
+            except Exception: continue
+    return applications
@@ -1,131 +1,504 @@
 # main.py (ВЕРСИЯ, СОВМЕСТИМАЯ С ТВОИМ EXCEL_WRITER)
 import os
 import shutil
-import math
+import argparse
 import asyncio
-from typing import Dict, List
+import cProfile
+import itertools
+import pstats
+import signal
+import time
+from datetime import datetime, timedelta
+from collections import Counter
+from typing import TYPE_CHECKING, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator, Optional, Union
 import sys
 
 # Предполагается, что эти модули существуют в проекте
 from config_loader import load_config
-from excel_reader import read_students_from_excel
-from excel_writer import save_results_to_excel
-
-# Импортируем все необходимое из нашего модуля api_parser
-from api_parser import (
-    fetch_applications_html, 
-    parse_applications, 
-    APIError
-)
-
-# --- 1. Логика обработки одного студента (без изменений) ---
-async def process_student_async(student: Dict, semaphore: asyncio.Semaphore) -> None:
-    search_query = student['search_name']
+from excel_reader import iter_students_from_excel
+from checkpoint import ResultSink
+from logging_setup import setup_logging_from_config
+from metrics import ProgressDashboard, registry as metrics
+from planner import PLAN_WINDOW, QueryGroup, QueryPlanner, plan_queries
+from rate_limiter import AdaptiveRateLimiter
+from sharding import add_shard_arguments, run_shard_command
+from application import ApplicationIndex
+
+# api_parser тянет aiohttp (и парсеры): он нужен, только когда есть что запрашивать.
+# Короткие запуски (status, "всё уже обработано", ошибка конфига) обходятся без него.
+if TYPE_CHECKING:
+    from api_parser import ApiClient
+
+OUTPUT_FILENAME = "students_with_results.xlsx"
+
+# --- 1. Логика обработки студентов ---
+async def process_student_async(student: Dict, limiter: AdaptiveRateLimiter, client: 'ApiClient',
+                                sink: Optional[ResultSink] = None) -> None:
+    """Определяет результат для студента и сразу фиксирует его в журнале (если передан sink)."""
+    await process_group_async(QueryGroup(student['search_name'], [student]), limiter, client, sink)
+
+
+async def process_group_async(group: QueryGroup, limiter: AdaptiveRateLimiter, client: 'ApiClient',
+                              sink: Optional[ResultSink] = None, early_exit: bool = True,
+                              recheck_after: Optional[float] = None) -> int:
+    """
+    Один запрос к API на всю группу студентов с одинаковым search_name:
+    выдача разбирается один раз и сопоставляется с каждым студентом группы.
+    С `early_exit` пагинация прекращается, как только ответ известен для всех студентов группы.
+
+    `recheck_after` (часы) включает повторную проверку: если у всех студентов группы есть
+    снимок прошлого прогона (`previous`), сначала запрашивается только первая страница, и
+    при тех же количестве заявок и отпечатке страницы прежний ответ остаётся без пагинации.
+    Снимок старше `recheck_after` часов от последней полной пагинации не доверяется.
+    Возвращает количество обработанных студентов.
+    """
+    from api_parser import APIError, fetch_applications, fetch_first_page
+
+    # Планировщик больше не доклеивает сюда студентов из следующих окон
+    group.started = True
+    error = None
+    all_apps_by_name = None
+    unchanged = None
+    started = time.perf_counter()
+    stop_when = (lambda index: all(_is_settled(student, index) for student in group.students)) if early_exit else None
+    try:
+        first_page = None
+        if recheck_after is not None and all(student.get('previous') for student in group.students):
+            first_page = await fetch_first_page(group.query, limiter, client)
+            unchanged = _unchanged_snapshot(group.students, first_page, recheck_after)
+        if unchanged is None:
+            # Фетчер уже возвращает индекс разобранных заявок: None — ни одной страницы с HTML
+            all_apps_by_name = await fetch_applications(group.query, limiter, client, stop_when, first_page)
+    except APIError as e:
+        error = f"Помилка API: {e}"
+    except asyncio.TimeoutError:
+        error = "Помилка: Час очікування запиту вичерпано"
+    except Exception as e:
+        error = f"Критична помилка: {type(e).__name__}: {e}"
+
+    if recheck_after is not None:
+        metrics.inc('rechecks', outcome='error' if error is not None else 'unchanged' if unchanged else 'fetched')
+    snapshot = unchanged or _snapshot(all_apps_by_name)
+    for student in group.students:
+        if error is not None and student.get('previous'):
+            # Сбой при повторной проверке не затирает последний известный ответ
+            continue
+        if error is not None:
+            student['final_result'] = error
+        elif unchanged is not None:
+            student['final_result'] = student['previous']['final_result']
+        else:
+            student['final_result'] = _match_student(student, all_apps_by_name)
+        if error is None and snapshot is not None:
+            student['snapshot'] = snapshot
+        metrics.inc('students', result=student['final_result'] if student['final_result'] in KNOWN_RESULTS else 'error')
+        if sink is not None:
+            sink.record(student)
+    metrics.observe('process_group', time.perf_counter() - started)
+    return len(group.students)
+
+
+def _snapshot(all_apps_by_name: Optional[ApplicationIndex]) -> Optional[Dict]:
+    """Снимок выдачи после полной (или досрочно остановленной) пагинации для журнала."""
+    if all_apps_by_name is None:
+        return None
+    return {'count': all_apps_by_name.total_count, 'digest': all_apps_by_name.first_page_digest,
+            'full_ts': datetime.now().isoformat(timespec='seconds')}
+
+
+def _unchanged_snapshot(students: Iterable[Dict], first_page: Dict, max_age_hours: float) -> Optional[Dict]:
+    """
+    Снимок, если первая страница совпала со снимками всех студентов группы, иначе None.
+
+    Новая заявка меняет `count`, а смена статуса или оригиналов на первой странице — её отпечаток.
+    Изменения только на дальних страницах так не видны, поэтому полная пагинация всё равно
+    повторяется не реже раза в `max_age_hours` часов.
+    """
+    from api_parser import page_digest
+
+    count = first_page.get('count', 0)
+    digest = page_digest(first_page.get('html') or '')
+    oldest = datetime.now() - timedelta(hours=max_age_hours)
+    full_ts = None
+    for student in students:
+        previous = student['previous']
+        if previous.get('count') != count or previous.get('digest') != digest or not previous.get('full_ts'):
+            return None
+        try:
+            if datetime.fromisoformat(previous['full_ts']) < oldest:
+                return None
+        except (TypeError, ValueError):
+            return None
+        full_ts = min(full_ts or previous['full_ts'], previous['full_ts'])
+    return {'count': count, 'digest': digest, 'full_ts': full_ts}
+
+
+# Ответы, которые со временем могут поменяться: их перепроверяет `python main.py recheck`
+RECHECK_RESULTS = ("Потрібно дзвонити", "Знайдено, але не ідентифіковано")
+
+# Итоговые ответы; всё остальное в final_result — тексты ошибок, в метриках они идут как 'error'
+KNOWN_RESULTS = frozenset({
+    "Не знайдено жодної заяви", "Не знайдено. Треба дзвонити", "Знайдено, але не ідентифіковано",
+    "Не вдалось отримати бали НМТ", "Вже визначився", "Потрібно дзвонити",
+})
+
+
+def _is_settled(student: Dict, partial_apps: ApplicationIndex) -> bool:
+    """
+    Изменят ли ответ для студента ещё не полученные страницы выдачи.
+
+    Эталонная заявка — первая подходящая по порядку выдачи, поэтому найденная на ранних
+    страницах уже окончательна. Дальше ответ может поменяться только с "Потрібно дзвонити"
+    на "Вже визначився", так что он известен, если оригиналы уже нашлись или баллов НМТ нет.
+    """
+    reference_app = partial_apps.find_reference(student['score'], student['specialty_code'])
+    if reference_app is None:
+        return False
+    score_fingerprint = reference_app.score_fingerprint
+    return not score_fingerprint or partial_apps.has_originals(score_fingerprint)
+
+
+def _match_student(student: Dict, all_apps_by_name: Optional[ApplicationIndex]) -> str:
     score_to_find = student['score']
     specialty_to_find = student['specialty_code']
 
     try:
-        html_content = await fetch_applications_html(search_query, semaphore)
-        if not html_content:
-            student['final_result'] = "Не знайдено жодної заяви"
-            return
+        if all_apps_by_name is None:
+            return "Не знайдено жодної заяви"
 
-        all_apps_by_name = parse_applications(html_content)
         if not all_apps_by_name:
-            student['final_result'] = "Не знайдено. Треба дзвонити"
-            return
+            return "Не знайдено. Треба дзвонити"
         
-        reference_app = None
-        for app in all_apps_by_name:
-            try:
-                student_score = float(score_to_find)
-                app_score = float(app.get('total_score', 0))
-                score_matches = math.isclose(app_score, student_score, rel_tol=1e-5)
-            except (ValueError, TypeError):
-                score_matches = False
-
-            specialty_matches = (not specialty_to_find) or (app.get('specialty_code') == specialty_to_find)
-            
-            if score_matches and specialty_matches:
-                reference_app = app
-                break
+        # Поиск по индексу выдачи вместо перебора всех заявок
+        reference_app = all_apps_by_name.find_reference(score_to_find, specialty_to_find)
+        if reference_app is None:
+            return "Знайдено, але не ідентифіковано"
         
-        if not reference_app:
-            student['final_result'] = "Знайдено, але не ідентифіковано"
-            return
-        
-        score_fingerprint = reference_app.get('score_components')
+        score_fingerprint = reference_app.score_fingerprint
         if not score_fingerprint:
-            student['final_result'] = "Не вдалось отримати бали НМТ"
-            return
+            return "Не вдалось отримати бали НМТ"
             
-        identified_student_apps = [
-            app for app in all_apps_by_name if app.get('score_components') == score_fingerprint
-        ]
-        
-        has_originals = any(app['originals_submitted'] for app in identified_student_apps)
-        student['final_result'] = "Вже визначився" if has_originals else "Потрібно дзвонити"
+        has_originals = all_apps_by_name.has_originals(score_fingerprint)
+        return "Вже визначився" if has_originals else "Потрібно дзвонити"
     
-    except APIError as e:
-        student['final_result'] = f"Помилка API: {e}"
-    except asyncio.TimeoutError:
-        student['final_result'] = "Помилка: Час очікування запиту вичерпано"
     except Exception as e:
-        student['final_result'] = f"Критична помилка: {type(e).__name__}: {e}"
+        return f"Критична помилка: {type(e).__name__}: {e}"
 
 
 # --- 2. Основная асинхронная логика ---
-async def main_async_logic(config: Dict) -> List[Dict]:
-    original_excel_path = config['excel_file_path']
-    output_excel_filename = "students_with_results.xlsx"
-    
+async def main_async_logic(config: Dict, sink: ResultSink, recheck: bool = False) -> int:
+    """
+    С `recheck` кроме необработанных строк берутся и строки с неокончательным ответом
+    (`recheck_results` и ошибки): для них сначала сверяется первая страница выдачи со снимком
+    из журнала прошлого прогона. Дисковый кэш ответов при этом не читается — он мог застать
+    ту же выдачу, которую и нужно перепроверить.
+    """
+    output_excel_filename = sink.excel_path
+    if not prepare_output_file(config['excel_file_path'], output_excel_filename):
+        return 0
+
+    # Студенты читаются потоково и группируются по поисковому запросу окнами по plan_window_students:
+    # первые запросы уходят после первого окна, а не после чтения всего файла
+    print(f"📖 Читаю дані з файлу '{os.path.basename(output_excel_filename)}'...")
+    try:
+        students = iter_students_from_excel(output_excel_filename, engine=config.get("excel_reader_engine"))
+        if recheck:
+            recheck_results = frozenset(config.get("recheck_results", RECHECK_RESULTS))
+            students = _recheck_students(students, sink, recheck_results)
+        else:
+            students = _pending_students(students, sink)
+        planner = QueryPlanner(students, config.get("plan_window_students", PLAN_WINDOW))
+        first_window = planner.next_window()
+    except ValueError as e:
+        print(f"❌ Помилка: {e}")
+        return 0
+
+    if not planner.students:
+        if sink.restored:
+            print(f"♻️ Відновлено з журналу {sink.restored} результатів попереднього запуску.")
+        print("\n✅ Всі студенти вже оброблені.")
+        return 0
+
+    CONCURRENT_LIMIT = config.get("concurrent_requests", 5)
+    WORKERS = config.get("workers", CONCURRENT_LIMIT)
+    # Общий адаптивный лимитер вместо фиксированного семафора и фиксированных пауз
+    limiter = AdaptiveRateLimiter.from_config(config)
+
+    if planner.exhausted:
+        print(f"\nВсього студентів для обробки: {planner.students}")
+    else:
+        print(f"\nСтудентів для обробки: щонайменше {planner.students} (решту файлу дочитую по ходу)")
+    print(f"Запускаю {WORKERS} воркерів, до {CONCURRENT_LIMIT} одночасних запитів...")
+    print("Натисніть Ctrl+C для безпечної зупинки та збереження прогресу.")
+
+    from api_parser import ApiClient
+
+    stop = asyncio.Event()
+    remove_stop_handler = _install_stop_handler(stop)
+    try:
+        # Один клиент с пулом соединений на весь прогон
+        async with ApiClient.from_config({**config, "cache_enabled": False} if recheck else config) as client:
+            processed_count = await run_pipeline(
+                itertools.chain(first_window, planner), limiter, client, sink, WORKERS, lambda: planner.total, stop,
+                early_exit=config.get("early_exit_pagination", True),
+                dashboard_interval=config.get("dashboard_interval_sec", 1.0),
+                recheck_after=config.get("recheck_full_after_hours", 72) if recheck else None
+            )
+            print(f"\n🧮 {planner.summary()}")
+            print(f"📊 {client.cache_summary()}")
+            if recheck:
+                print(f"🔁 {_recheck_summary()}")
+            print(f"⏱️ Етапи: {metrics.summary()}")
+    finally:
+        remove_stop_handler()
+
+    await sink.drain()
+
+    if sink.restored:
+        print(f"♻️ Відновлено з журналу {sink.restored} результатів попереднього запуску.")
+    if stop.is_set():
+        print(f"\n⏸️ Зупинено за запитом: оброблено {processed_count} студентів.")
+    else:
+        print(f"\n🎉 Всі {processed_count} студентів успішно оброблені.")
+    return processed_count
+
+
+def prepare_output_file(original_excel_path: str, output_excel_filename: str) -> bool:
+    """Результаты пишутся в копию входного файла; копия создаётся при первом запуске."""
     if not os.path.exists(original_excel_path):
         print(f"❌ Помилка: Вхідний файл Excel не знайдено за шляхом: {original_excel_path}")
-        return []
-    
+        return False
+
     if not os.path.exists(output_excel_filename):
         print(f"📄 Створюю копію файлу для результатів: '{output_excel_filename}'")
         shutil.copy(original_excel_path, output_excel_filename)
     else:
         print(f"📂 Використовую існуючий файл з результатами: '{output_excel_filename}'")
-    
-    all_students = read_students_from_excel(output_excel_filename)
-    if not all_students:
-        print("Не вдалося прочитати дані з Excel або файл порожній.")
-        return []
-    
-    output_col_name = config.get("output_column_name", "Результат перевірки")
-    students_to_process = [s for s in all_students if not s.get(output_col_name)]
-    
-    if not students_to_process:
-        print("\n✅ Всі студенти вже оброблені.")
-        return all_students
+    return True
 
-    CONCURRENT_LIMIT = config.get("concurrent_requests", 5)
-    semaphore = asyncio.Semaphore(CONCURRENT_LIMIT)
 
-    print(f"\nВсього студентів у файлі: {len(all_students)}")
-    print(f"Потребують перевірки: {len(students_to_process)}. Запускаю до {CONCURRENT_LIMIT} одночасних запитів...")
-    print("Натисніть Ctrl+C для безпечної зупинки та збереження прогресу.")
+def _pending_students(students: Iterable[Dict], sink: ResultSink) -> Iterator[Dict]:
+    """Студенты без результата в файле и без результата в журнале прошлого прогона."""
+    for student in students:
+        if student.get(sink.col_name):
+            continue
+        # Результат из журнала, который мог не успеть попасть в Excel
+        if sink.restore(student):
+            continue
+        yield student
 
-    tasks = [asyncio.create_task(process_student_async(student, semaphore)) for student in students_to_process]
-    
+
+def _recheck_students(students: Iterable[Dict], sink: ResultSink, recheck_results: frozenset) -> Iterator[Dict]:
+    """
+    Студенты без результата и студенты с неокончательным ответом: из `recheck_results`
+    или с текстом ошибки. Последний ответ берётся из журнала (он новее файла), иначе из Excel;
+    запись журнала со снимком выдачи кладётся в student['previous'].
+    """
+    for student in students:
+        previous = sink.previous_record(student)
+        current = previous['final_result'] if previous else student.get(sink.col_name)
+        if current and current in KNOWN_RESULTS and current not in recheck_results:
+            # Окончательный ответ из журнала, который мог не успеть попасть в Excel
+            if not student.get(sink.col_name):
+                sink.restore(student)
+            continue
+        student['previous'] = previous
+        yield student
+
+
+def _recheck_summary() -> str:
+    unchanged = metrics.counter('rechecks', outcome='unchanged')
+    fetched = metrics.counter('rechecks', outcome='fetched')
+    errors = metrics.counter('rechecks', outcome='error')
+    return (f"Повторна перевірка: без змін {unchanged:.0f} запитів (лише перша сторінка), "
+            f"заново перевірено {fetched:.0f}, помилок {errors:.0f} (попередній результат збережено)")
+
+
+async def run_pipeline(groups: Union[Iterable[QueryGroup], AsyncIterable[QueryGroup]], limiter: AdaptiveRateLimiter, client: 'ApiClient', sink: ResultSink,
+                       workers: int, total: Union[int, Callable[[], Optional[int]], None] = None, stop: Optional[asyncio.Event] = None,
+                       early_exit: bool = True, dashboard_interval: float = 1.0,
+                       recheck_after: Optional[float] = None) -> int:
+    """
+    Обрабатывает группы студентов (см. planner) через ограниченную очередь и пул из `workers` воркеров.
+    Группы можно отдавать и асинхронным итератором (шардованный режим берёт их из общей очереди).
+    Прогресс (скорость, ETA, медианы этапов) печатает ProgressDashboard раз в `dashboard_interval` секунд;
+    `total` может быть функцией, если число студентов становится известно по ходу чтения.
+
+    Продюсер кладёт группы в очередь размером 2 * workers, поэтому в памяти одновременно
+    находится лишь несколько десятков выдач, сколько бы строк ни было во входе
+    (плюс окно QueryPlanner, если группы приходят из него).
+    Когда выставлен `stop`, новые группы не берутся, а начатые дорабатываются до конца.
+    `recheck_after` передаётся в process_group_async (режим повторной проверки).
+    Возвращает количество обработанных студентов.
+    """
+    stop = stop or asyncio.Event()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
     processed_count = 0
-    total_to_process = len(students_to_process)
-    for task in asyncio.as_completed(tasks):
-        await task
-        processed_count += 1
-        print(f"[{processed_count}/{total_to_process}] Оброблено...", end='\r')
 
-    print(f"\n🎉 Всі {total_to_process} студентів успішно оброблені.")
-    return all_students
+    async def producer() -> None:
+        try:
+            async for group in _as_async_iterator(groups):
+                if stop.is_set():
+                    break
+                await queue.put(group)
+        except Exception:
+            # Например, ошибка чтения Excel посреди файла: доделываем начатое и выходим.
+            # Очередь при этом не полна для ждущих на get воркеров, поэтому хватит put_nowait.
+            stop.set()
+            for _ in range(workers):
+                try:
+                    queue.put_nowait(None)
+                except asyncio.QueueFull:
+                    break
+            raise
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def worker() -> None:
+        nonlocal processed_count
+        while True:
+            group = await queue.get()
+            if group is None or stop.is_set():
+                return
+            # Сначала дожидаемся группы, потом прибавляем: `x += await ...` читает x до await
+            handled = await process_group_async(group, limiter, client, sink, early_exit, recheck_after)
+            processed_count += handled
+
+    dashboard = ProgressDashboard(total, lambda: processed_count, limiter.describe, dashboard_interval)
+    dashboard.start()
+    producer_task = asyncio.create_task(producer())
+    try:
+        await asyncio.gather(*(worker() for _ in range(workers)))
+    finally:
+        # После остановки продюсер может висеть на полной очереди
+        producer_task.cancel()
+        await dashboard.stop()
+    if producer_task.done() and not producer_task.cancelled() and producer_task.exception():
+        raise producer_task.exception()
+    return processed_count
+
+
+async def _as_async_iterator(groups) -> AsyncIterator[QueryGroup]:
+    if hasattr(groups, '__aiter__'):
+        async for group in groups:
+            yield group
+    else:
+        for group in groups:
+            yield group
+
+
+def _install_stop_handler(stop: asyncio.Event):
+    """
+    Первый Ctrl+C — мягкая остановка (доработать начатое), второй — немедленная отмена.
+    Возвращает функцию, снимающую обработчик. Там, где сигналы в loop не поддерживаются
+    (Windows), остаётся стандартное поведение KeyboardInterrupt.
+    """
+    loop = asyncio.get_running_loop()
+    main_task = asyncio.current_task()
+
+    def on_sigint() -> None:
+        if stop.is_set():
+            main_task.cancel()
+            return
+        print("\n🛑 Ctrl+C: завершую вже розпочаті запити і зупиняюсь. Натисніть ще раз для негайної зупинки.")
+        stop.set()
+
+    try:
+        loop.add_signal_handler(signal.SIGINT, on_sigint)
+    except (NotImplementedError, RuntimeError):
+        return lambda: None
+    return lambda: loop.remove_signal_handler(signal.SIGINT)
 
 # --- 3. Точка входа в программу ---
-def main():
-    """Точка входа, которая запускает асинхронный цикл и обрабатывает исключения."""
-    all_students: List[Dict] = []
-    output_filename = "students_with_results.xlsx"
-    config = {}
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Перевірка абітурієнтів за даними abit-poisk.org.ua.")
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('run', help="звичайний прогін в одному процесі (за замовчуванням)")
+    commands.add_parser('recheck', help="повторна перевірка неостаточних відповідей (щоденний інкрементальний прогін)")
+    commands.add_parser('status', help="скільки рядків чекає на обробку, без запитів до API (dry run)")
+    add_shard_arguments(commands.add_parser('shard', help="шардований прогін зі спільною чергою завдань"))
+    return parser.parse_args(argv)
+
+
+def shard_main(args: argparse.Namespace) -> int:
+    """Команды `python main.py shard ...` (см. sharding.py)."""
+    try:
+        return run_shard_command(args, load_config(), OUTPUT_FILENAME)
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\n\n🛑 Переривання роботи за командою користувача (Ctrl+C).")
+    except Exception as e:
+        print(f"\n❌ Сталася неочікувана помилка на верхньому рівні: {type(e).__name__}: {e}")
+    return 1
+
+
+def status_main() -> int:
+    """
+    `python main.py status`: сводка по файлу результатов без запуска прогона.
+
+    Файл читается рушием 'xml', а журнал — как при обычном запуске, поэтому ни aiohttp,
+    ни pandas, ни openpyxl не загружаются. Ничего не пишется; код выхода 1 — только при ошибке.
+    """
+    try:
+        config = load_config()
+        if 'excel_file_path' not in config:
+            print("❌ СТОП! У файлі config.yaml відсутній параметр 'excel_file_path'!")
+            return 1
+        # До первого запуска файла результатов ещё нет — считаем по входному
+        path = OUTPUT_FILENAME if os.path.exists(OUTPUT_FILENAME) else config['excel_file_path']
+        if not os.path.exists(path):
+            print(f"❌ Помилка: Вхідний файл Excel не знайдено за шляхом: {path}")
+            return 1
+        sink = ResultSink.from_config(config, OUTPUT_FILENAME)
+        recheck_results = frozenset(config.get("recheck_results", RECHECK_RESULTS))
+
+        results: Counter = Counter()
+        pending, journal_only, rows = [], 0, 0
+        for student in iter_students_from_excel(path, engine='xml'):
+            rows += 1
+            result = student.get(sink.col_name)
+            if not result:
+                previous = sink.previous_record(student)
+                result = previous['final_result'] if previous else None
+                journal_only += result is not None
+            if result is None:
+                pending.append(student)
+            else:
+                results[result if result in KNOWN_RESULTS else "помилки"] += 1
+    except (ValueError, OSError) as e:
+        print(f"❌ Помилка: {e}")
+        return 1
+
+    plan = plan_queries(pending)
+    recheck = sum(count for result, count in results.items() if result in recheck_results or result == "помилки")
+    print(f"📄 Файл: '{path}', рядків зі студентами: {rows}")
+    print(f"✅ З результатом: {rows - len(pending)} (з них лише в журналі, ще не в Excel: {journal_only})")
+    for result, count in results.most_common():
+        print(f"   {result}: {count}")
+    print(f"⏳ Чекають на обробку: {len(pending)}" + (f" — {plan.summary()}" if pending else ""))
+    print(f"🔁 Для повторної перевірки (recheck): {recheck}")
+    return 0
+
+
+def main(argv=None):
+    """
+    Точка входа, которая запускает асинхронный цикл и обрабатывает исключения.
+
+    В конце (и при Ctrl+C) метрики этапов пишутся в `metrics_report_path`: JSON или,
+    для *.prom, текстовый формат Prometheus. С ключом `profile_path` (или переменной
+    окружения PAGEPARSER_PROFILE) прогон идёт под cProfile; парсинг в пуле процессов
+    в такой профиль не попадает — для него `py-spy record --subprocesses -- python main.py`.
+    """
+    args = parse_args(argv)
+    if args.command == 'shard':
+        sys.exit(shard_main(args))
+    if args.command == 'status':
+        sys.exit(status_main())
+
+    output_filename = OUTPUT_FILENAME
+    sink: Optional[ResultSink] = None
+    stop_logging = None
+    config: Dict = {}
+    profiler: Optional[cProfile.Profile] = None
 
     try:
         config = load_config()
@@ -133,8 +506,16 @@ def main():
         if 'excel_file_path' not in config:
             print("❌ СТОП! У файлі config.yaml відсутній параметр 'excel_file_path'!")
             sys.exit(1)
-            
-        all_students = asyncio.run(main_async_logic(config))
+
+        # debug_log.txt пишется фоновым потоком, воркеры не ждут диск
+        stop_logging = setup_logging_from_config(config)
+
+        # Журнал и пакетная запись в Excel живут вне event loop, чтобы пережить Ctrl+C
+        sink = ResultSink.from_config(config, output_filename)
+        if _profile_path(config):
+            profiler = cProfile.Profile()
+            profiler.enable()
+        asyncio.run(main_async_logic(config, sink, recheck=args.command == 'recheck'))
             
     except (KeyboardInterrupt, asyncio.CancelledError):
         print("\n\n🛑 Переривання роботи за командою користувача (Ctrl+C).")
@@ -143,28 +524,43 @@ def main():
     finally:
         print("\nЗавершую роботу...")
         
-        # --- ИЗМЕНЕНИЕ! ВОЗВРАЩАЕМСЯ К ПРОСТОЙ И НАДЕЖНОЙ СИСТЕМЕ! ---
-        if all_students and config:
-            # Просто, блядь, фильтруем тех, кого обработали
-            students_with_new_results = [s for s in all_students if 'final_result' in s]
-
-            if students_with_new_results:
-                print("Зберігаю поточний прогрес...")
-                # Имя колонки для вывода
-                output_col = config.get("output_column_name", "Результат перевірки")
-                
-                # Вызываем твой охуенный writer, который сам разберется по 'index'
-                save_results_to_excel(
-                    file_path=output_filename, 
-                    students_data=students_with_new_results, 
-                    col_name=output_col
-                )
-            else:
-                 print("Немає нових результатів для збереження.")
+        # Всё уже в журнале; дописываем в Excel последнюю пачку результатов
+        if sink is not None:
+            sink.close()
         else:
             print("Немає даних для збереження (можливо, сталася помилка на старті).")
+        if profiler is not None:
+            profiler.disable()
+            _dump_profile(profiler, _profile_path(config))
+        _write_metrics_report(config.get("metrics_report_path", "metrics_report.json"))
+        if stop_logging is not None:
+            stop_logging()
         
         print("Роботу безпечно зупинено.")
 
+
+def _profile_path(config: Dict) -> Optional[str]:
+    return os.environ.get("PAGEPARSER_PROFILE") or config.get("profile_path")
+
+
+def _dump_profile(profiler: cProfile.Profile, path: str) -> None:
+    """Сохраняет профиль (смотреть через snakeviz / pstats) и печатает самые тяжёлые функции."""
+    try:
+        profiler.dump_stats(path)
+        print(f"🔬 Профіль збережено у '{path}'. Найважчі функції (cumulative):")
+        pstats.Stats(profiler).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(15)
+    except OSError as e:
+        print(f"⚠️ Не вдалося зберегти профіль: {e}")
+
+
+def _write_metrics_report(path: Optional[str]) -> None:
+    if not path or not metrics.histograms:
+        return
+    try:
+        metrics.write_report(path)
+        print(f"📈 Метрики етапів збережено у '{path}'.")
+    except OSError as e:
+        print(f"⚠️ Не вдалося зберегти метрики: {e}")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
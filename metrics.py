@@ -0,0 +1,273 @@
+# metrics.py
+"""
+Метрики прогону: гістограми тривалостей за етапами і лічильники.
+
+Етапи: очікування лімітера, HTTP-запит, пауза після ліміту API, затримка перед повтором,
+розбір HTML, вибірка всієї видачі, обробка групи студентів, збереження Excel.
+Під час прогону ProgressDashboard раз на секунду друкує рядок зі швидкістю, ETA
+і медіанами етапів, а в кінці звіт зберігається у JSON або у текстовому форматі Prometheus.
+
+Реєстр один на процес (`registry`), як і логер: записувати можна з будь-якого модуля
+і з фонових потоків (збереження Excel).
+"""
+import asyncio
+import bisect
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple, Union
+
+# Межі кошиків у секундах (як у клієнтах Prometheus, з довшим хвостом для пауз і збережень)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+STAGE_DESCRIPTIONS = {
+    'limiter_wait': "очікування слоту/токена лімітера (включно з глобальною паузою)",
+    'http_request': "HTTP-запит сторінки (мережа + сервер)",
+    'decode': "декодування тіла відповіді в JSON (без мережі)",
+    'rate_limit_pause': "сон запиту через глобальну паузу після ліміту API",
+    'retry_backoff': "затримка перед повтором після помилки",
+    'parse': "розбір HTML сторінки (включно з чергою пулу)",
+    'fetch_applications': "вся видача на один запит (усі сторінки)",
+    'process_group': "обробка групи студентів з одним запитом",
+    'excel_save': "збереження пачки результатів в Excel",
+}
+
+
+class Histogram:
+    """Гістограма з фіксованими кошиками: count, sum, min, max і оцінка квантилів."""
+
+    __slots__ = ('bounds', 'counts', 'count', 'sum', 'min', 'max')
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Лінійна інтерполяція всередині кошика (як histogram_quantile у Prometheus)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(max(estimate, self.min), self.max)
+            seen += bucket_count
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'min': round(self.min, 6) if self.count else 0.0,
+            'max': round(self.max, 6),
+            'p50': round(self.quantile(0.5), 6),
+            'p90': round(self.quantile(0.9), 6),
+            'p99': round(self.quantile(0.99), 6),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self.started_at = time.time()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def counter(self, name: str, **labels: str) -> float:
+        return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Міряє тривалість блоку `with` (у корутині — разом з усіма await усередині)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def timed(self, stage: str) -> Callable:
+        """Декоратор для звичайних функцій і корутин: кожен виклик потрапляє в гістограму `stage`."""
+        def decorator(func: Callable) -> Callable:
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.timer(stage):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.started_at = time.time()
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            counters: Dict[str, object] = {}
+            for (name, labels), value in sorted(self.counters.items()):
+                if labels:
+                    counters.setdefault(name, {})[','.join(f"{k}={v}" for k, v in labels)] = value
+                else:
+                    counters[name] = value
+            return {
+                'started_at': self.started_at,
+                'elapsed_sec': round(time.time() - self.started_at, 3),
+                'stages': {stage: histogram.to_dict() for stage, histogram in sorted(self.histograms.items())},
+                'counters': counters,
+            }
+
+    def summary(self) -> str:
+        """Рядок для підсумку прогону: сумарний час і p50/p99 кожного етапу."""
+        with self._lock:
+            parts = [f"{stage} {h.sum:.1f} с (n={h.count}, p50 {h.quantile(0.5) * 1000:.0f} мс, "
+                     f"p99 {h.quantile(0.99) * 1000:.0f} мс)"
+                     for stage, h in sorted(self.histograms.items(), key=lambda item: -item[1].sum)]
+        return "; ".join(parts)
+
+    def to_prometheus(self, prefix: str = 'pageparser') -> str:
+        lines = []
+        with self._lock:
+            for stage, histogram in sorted(self.histograms.items()):
+                name = f"{prefix}_{stage}_seconds"
+                lines.append(f"# HELP {name} {STAGE_DESCRIPTIONS.get(stage, stage)}")
+                lines.append(f"# TYPE {name} histogram")
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.bounds, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f"{name}_sum {histogram.sum}")
+                lines.append(f"{name}_count {histogram.count}")
+            typed = set()
+            for (counter, labels), value in sorted(self.counters.items()):
+                name = f"{prefix}_{counter}_total"
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+                    typed.add(name)
+                label_text = ','.join(f'{k}="{_escape_label(v)}"' for k, v in labels)
+                lines.append(f"{name}{{{label_text}}} {value}" if labels else f"{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+    def write_report(self, path: str) -> None:
+        """JSON, або текстовий формат Prometheus для файлів *.prom / *.txt."""
+        text = (self.to_prometheus() if path.endswith(('.prom', '.txt'))
+                else json.dumps(self.to_dict(), ensure_ascii=False, indent=2))
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry()
+
+
+class ProgressDashboard:
+    """
+    Живий рядок прогресу: оброблено/всього, швидкість за останню хвилину, ETA,
+    медіани основних етапів і стан лімітера. Оновлюється раз на `interval` секунд
+    фоновою задачею, а не на кожного студента. `total` — число або функція, що повертає
+    None, поки загальна кількість ще невідома (тоді без ETA).
+    """
+
+    def __init__(self, total: Union[int, Callable[[], Optional[int]], None], processed: Callable[[], int],
+                 status: Optional[Callable[[], str]] = None, interval: float = 1.0,
+                 metrics: MetricsRegistry = registry):
+        self.total = total
+        self.processed = processed
+        self.status = status
+        self.interval = interval
+        self.metrics = metrics
+        self._samples: deque = deque(maxlen=max(2, int(60 / interval)))
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        print(self.render(), end='\r')
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            print(self.render(), end='\r')
+
+    def render(self) -> str:
+        now = time.monotonic()
+        done = self.processed()
+        self._samples.append((now, done))
+        first_time, first_done = self._samples[0]
+        rate = (done - first_done) / (now - first_time) if now > first_time else 0.0
+
+        total = self.total() if callable(self.total) else self.total
+        progress = f"[{done}/{total}]" if total else f"[{done}]"
+        if total and rate > 0:
+            eta = f"ETA {_format_duration((total - done) / rate)}"
+        else:
+            eta = "ETA --"
+        stages = []
+        for stage, label in (('limiter_wait', 'черга'), ('http_request', 'HTTP'), ('parse', 'розбір')):
+            histogram = self.metrics.histograms.get(stage)
+            if histogram is not None and histogram.count:
+                stages.append(f"{label} {histogram.quantile(0.5) * 1000:.0f} мс")
+        parts = [f"{progress} {rate:.1f} студ/с, {eta}"]
+        if stages:
+            parts.append("p50: " + ", ".join(stages))
+        if self.status is not None:
+            parts.append(self.status())
+        return " | ".join(parts) + "    "
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
@@ -0,0 +1,138 @@
+# planner.py
+"""
+Планування запитів: студенти з однаковим пошуковим запитом обслуговуються одним запитом до API.
+
+Однакові search_name трапляються часто: брати й сестри, поширені прізвища з тими самими
+ініціалами, один абітурієнт у кількох спеціальностях. Планувальник групує студентів
+за нормалізованим запитом, і кожна група отримує одну видачу на всіх.
+
+plan_queries групує весь вхід одразу (status, шардована черга). Звичайний прогін бере
+групи з QueryPlanner: той читає студентів вікнами, тож запити йдуть ще до кінця файлу,
+а в пам'яті лежить лише поточне вікно і групи, що чекають у черзі воркерів.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+# Скільки студентів групується разом, перш ніж групи віддаються воркерам (~0.8 КБ на студента)
+PLAN_WINDOW = 20000
+
+_SPACES_RE = re.compile(r'\s+')
+
+
+def normalize_query(search_name: str) -> str:
+    """Ключ групування: без зайвих пробілів і без урахування регістру."""
+    return _SPACES_RE.sub(' ', str(search_name)).strip().casefold()
+
+
+@dataclass
+class QueryGroup:
+    """Один запит до API і всі студенти, яким потрібна його видача."""
+    query: str
+    students: List[Dict] = field(default_factory=list)
+    # process_group_async виставляє на старті: до такої групи студентів уже не доклеюють
+    started: bool = False
+
+
+@dataclass
+class QueryPlan:
+    groups: List[QueryGroup]
+    students: int
+
+    @property
+    def requests_saved(self) -> int:
+        return self.students - len(self.groups)
+
+    def summary(self) -> str:
+        share = self.requests_saved / self.students * 100 if self.students else 0.0
+        return (f"План запитів: {self.students} студентів → {len(self.groups)} унікальних запитів "
+                f"(заощаджено {self.requests_saved}, {share:.1f}%)")
+
+
+def _query(search_name) -> str:
+    return _SPACES_RE.sub(' ', str(search_name)).strip()
+
+
+def plan_queries(students: Iterable[Dict]) -> QueryPlan:
+    """
+    Групує студентів за нормалізованим search_name у порядку першої появи.
+
+    До API йде search_name першого студента групи з нормалізованими пробілами.
+    """
+    groups: Dict[str, QueryGroup] = {}
+    count = 0
+    for student in students:
+        count += 1
+        key = normalize_query(student['search_name'])
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = QueryGroup(query=_query(student['search_name']))
+        group.students.append(student)
+    return QueryPlan(groups=list(groups.values()), students=count)
+
+
+class QueryPlanner:
+    """
+    Потокове планування: студенти групуються вікнами по `window` штук.
+
+    Група з попереднього вікна, яку ще не взяв воркер, залишається у мапі очікування
+    за нормалізованим запитом, і однофамільці з наступних вікон доклеюються до неї.
+    Якщо група вже стартувала, для пізнього однофамільця створюється нова: це повторний
+    запит (його може обслужити кеш відповідей), і він рахується в `refetched`. Для цього
+    планувальник пам'ятає хеші всіх запитів прогону — кілька МБ на 100 тис. студентів
+    замість самих студентів. Ітерація віддає лише нові групи.
+    """
+
+    def __init__(self, students: Iterable[Dict], window: int = PLAN_WINDOW):
+        self._students = iter(students)
+        self.window = max(1, window)
+        self.students = 0
+        self.groups = 0
+        self.refetched = 0
+        self.exhausted = False
+        self._waiting: Dict[str, QueryGroup] = {}
+        self._seen: Set[int] = set()
+
+    @property
+    def total(self) -> Optional[int]:
+        """Кількість студентів для обробки; None, поки файл не дочитано."""
+        return self.students if self.exhausted else None
+
+    @property
+    def requests_saved(self) -> int:
+        return self.students - self.groups
+
+    def summary(self) -> str:
+        share = self.requests_saved / self.students * 100 if self.students else 0.0
+        return (f"План запитів: {self.students} студентів → {self.groups} запитів "
+                f"(заощаджено {self.requests_saved}, {share:.1f}%; повторних між вікнами {self.refetched})")
+
+    def next_window(self) -> List[QueryGroup]:
+        """Читає наступне вікно студентів і повертає нові групи (див. `exhausted`)."""
+        # Стартовані групи більше не приймають студентів: відпускаємо їх разом зі студентами
+        self._waiting = {key: group for key, group in self._waiting.items() if not group.started}
+        new_groups: List[QueryGroup] = []
+        read = 0
+        while read < self.window:
+            student = next(self._students, None)
+            if student is None:
+                self.exhausted = True
+                break
+            read += 1
+            key = normalize_query(student['search_name'])
+            group = self._waiting.get(key)
+            if group is None or group.started:
+                group = self._waiting[key] = QueryGroup(query=_query(student['search_name']))
+                new_groups.append(group)
+                seen = hash(key)
+                if seen in self._seen:
+                    self.refetched += 1
+                self._seen.add(seen)
+            group.students.append(student)
+        self.students += read
+        self.groups += len(new_groups)
+        return new_groups
+
+    def __iter__(self) -> Iterator[QueryGroup]:
+        while not self.exhausted:
+            yield from self.next_window()
@@ -0,0 +1,159 @@
+# rate_limiter.py
+import asyncio
+import random
+import time
+from typing import Dict, Optional
+
+from metrics import registry as metrics
+
+
+class AdaptiveRateLimiter:
+    """
+    Спільний для всіх воркерів обмежувач запитів: token bucket + AIMD.
+
+    Кожен запит займає слот паралельності і токен зі «відра», що поповнюється
+    зі швидкістю `rate` запитів/с. Успішні відповіді поступово (адитивно) піднімають
+    швидкість і паралельність, а сигнал ліміту від API ('max_user_connections',
+    «Частота запитів») одразу (мультиплікативно) зменшує обидва і ставить на паузу
+    всіх воркерів — замість того, щоб кожен із 50 спав окремо, продовжуючи «довбати» API.
+
+    Використання:
+        async with limiter:
+            ...  # один HTTP-запит
+    """
+
+    def __init__(self, max_concurrency: int = 50, min_concurrency: int = 1,
+                 initial_rate: float = 10.0, min_rate: float = 0.5, max_rate: float = 100.0,
+                 rate_increase: float = 0.2, decrease_factor: float = 0.5,
+                 default_pause: float = 5.0, cooldown: float = 2.0):
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min(min_concurrency, max_concurrency)
+        self.concurrency = max_concurrency
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(initial_rate, min_rate), max_rate)
+        self.rate_increase = rate_increase
+        self.decrease_factor = decrease_factor
+        self.default_pause = default_pause
+        self.cooldown = cooldown
+
+        self.in_flight = 0
+        self.successes = 0
+        self.throttled = 0
+        self.errors = 0
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._successes_since_grow = 0
+        self._cond = asyncio.Condition()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'AdaptiveRateLimiter':
+        return cls(
+            max_concurrency=config.get("concurrent_requests", 5),
+            min_concurrency=config.get("min_concurrent_requests", 1),
+            initial_rate=config.get("initial_requests_per_second", 10.0),
+            min_rate=config.get("min_requests_per_second", 0.5),
+            max_rate=config.get("max_requests_per_second", 100.0),
+        )
+
+    async def __aenter__(self) -> 'AdaptiveRateLimiter':
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.release()
+
+    async def acquire(self) -> None:
+        await self._wait_pause()
+        async with self._cond:
+            while self.in_flight >= self.concurrency:
+                await self._cond.wait()
+            self.in_flight += 1
+        try:
+            await self._take_token()
+        except BaseException:
+            await self.release()
+            raise
+
+    async def release(self) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    async def _wait_pause(self) -> None:
+        slept = 0.0
+        while True:
+            delay = self._paused_until - time.monotonic()
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+            slept += delay
+        if slept:
+            metrics.observe('rate_limit_pause', slept)
+
+    async def _take_token(self) -> None:
+        while True:
+            now = time.monotonic()
+            # Відро вміщує не більше секунди запитів, щоб після простою не було сплеску
+            self._tokens = min(max(self.rate, 1.0), self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return
+            await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+    def on_success(self) -> None:
+        """Адитивне зростання: +rate_increase зап/с на успіх, +1 слот приблизно за кожне «коло» запитів."""
+        self.successes += 1
+        self.rate = min(self.max_rate, self.rate + self.rate_increase)
+        self._successes_since_grow += 1
+        if self._successes_since_grow >= self.concurrency and self.concurrency < self.max_concurrency:
+            self._successes_since_grow = 0
+            self.concurrency += 1
+            asyncio.get_running_loop().create_task(self._notify_all())
+
+    def on_rate_limited(self, delay: Optional[float] = None) -> None:
+        """Мультиплікативне зменшення та глобальна пауза на `delay` секунд (або default_pause з джитером)."""
+        self.throttled += 1
+        now = time.monotonic()
+        pause = delay if delay is not None else self.default_pause * random.uniform(0.8, 1.2)
+        self._paused_until = max(self._paused_until, now + pause)
+        # Десятки одночасних відмов — це один сигнал, а не десятки
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self.concurrency = max(self.min_concurrency, int(self.concurrency * self.decrease_factor))
+        self._successes_since_grow = 0
+
+    def on_error(self) -> None:
+        self.errors += 1
+
+    @staticmethod
+    def backoff(attempt: int, base: float = 1.0, cap: float = 20.0) -> float:
+        """Експоненційна затримка з повним джитером для повтору номер `attempt` (з 1)."""
+        return random.uniform(0, min(cap, base * 2 ** attempt))
+
+    async def _notify_all(self) -> None:
+        async with self._cond:
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict:
+        """Поточні показники для живого моніторингу."""
+        return {
+            'rate': round(self.rate, 2),
+            'concurrency': self.concurrency,
+            'in_flight': self.in_flight,
+            'paused_for': round(max(0.0, self._paused_until - time.monotonic()), 1),
+            'successes': self.successes,
+            'throttled': self.throttled,
+            'errors': self.errors,
+        }
+
+    def describe(self) -> str:
+        s = self.snapshot()
+        pause = f", пауза {s['paused_for']} с" if s['paused_for'] else ""
+        return (f"{s['rate']:.1f} зап/с, паралельність {s['in_flight']}/{s['concurrency']}, "
+                f"лімітів API {s['throttled']}{pause}")
@@ -0,0 +1,101 @@
+# response_cache.py
+import json
+import sqlite3
+import time
+from typing import Dict, Optional
+
+
+class ResponseCache:
+    """
+    Локальний кеш сторінок відповіді API у SQLite, ключ — (пошуковий запит, offset).
+
+    Дозволяє після аварійної зупинки не перезавантажувати вже отримані сторінки,
+    а однаковим запитам в межах прогону — не ходити в API повторно.
+    Записи старші за `ttl_seconds` вважаються простроченими; коли записів більше
+    ніж `max_entries`, видаляються ті, до яких найдовше не зверталися.
+    """
+
+    def __init__(self, path: str = 'response_cache.sqlite', ttl_seconds: float = 6 * 3600, max_entries: int = 200_000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._puts_since_trim = 0
+
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " query TEXT NOT NULL, offset INTEGER NOT NULL, body TEXT NOT NULL,"
+            " stored_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (query, offset))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)")
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional['ResponseCache']:
+        """Створює кеш за налаштуваннями config.json або повертає None, якщо кеш вимкнено."""
+        if not config.get("cache_enabled", True):
+            return None
+        return cls(
+            path=config.get("cache_path", 'response_cache.sqlite'),
+            ttl_seconds=config.get("cache_ttl_hours", 6) * 3600,
+            max_entries=config.get("cache_max_entries", 200_000),
+        )
+
+    def get(self, query: str, offset: int) -> Optional[Dict]:
+        row = self._conn.execute(
+            "SELECT body, stored_at FROM pages WHERE query = ? AND offset = ?", (query, offset)
+        ).fetchone()
+        now = time.time()
+        if row is None:
+            self.misses += 1
+            return None
+        body, stored_at = row
+        if now - stored_at > self.ttl_seconds:
+            self.expired += 1
+            self.misses += 1
+            self._conn.execute("DELETE FROM pages WHERE query = ? AND offset = ?", (query, offset))
+            return None
+        self.hits += 1
+        self._conn.execute("UPDATE pages SET accessed_at = ? WHERE query = ? AND offset = ?", (now, query, offset))
+        return json.loads(body)
+
+    def put(self, query: str, offset: int, data: Dict) -> None:
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO pages (query, offset, body, stored_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (query, offset, json.dumps(data, ensure_ascii=False), now, now),
+        )
+        self._puts_since_trim += 1
+        if self._puts_since_trim >= 500:
+            self.trim()
+
+    def trim(self) -> None:
+        """Видаляє прострочені записи і найстаріші за зверненням, якщо перевищено ліміт."""
+        self._puts_since_trim = 0
+        self._conn.execute("DELETE FROM pages WHERE stored_at < ?", (time.time() - self.ttl_seconds,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            # Звільняємо із запасом, щоб не чистити на кожній вставці
+            to_delete = excess + self.max_entries // 10
+            cursor = self._conn.execute(
+                "DELETE FROM pages WHERE rowid IN (SELECT rowid FROM pages ORDER BY accessed_at LIMIT ?)", (to_delete,)
+            )
+            self.evictions += cursor.rowcount
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self.trim()
+            self._conn.close()
+            self._conn = None
+
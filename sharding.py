@@ -0,0 +1,300 @@
+# sharding.py
+"""
+Шардований запуск: кілька процесів (або машин) розбирають спільну чергу завдань.
+
+    python main.py shard init                    # план запитів -> черга (shard_queue.sqlite)
+    python main.py shard work --processes 4      # 4 шарди на цій машині, кожен зі своїм лімітом
+    python main.py shard work --rate 20 --partition 0/2   # шард на іншій машині, лише свій розділ
+    python main.py shard status
+    python main.py shard requeue                 # ще одна спроба для завдань зі статусом failed
+    python main.py shard merge                   # результати з черги -> students_with_results.xlsx
+
+Кожен шард — звичайний run_pipeline зі своїм ApiClient і AdaptiveRateLimiter (власний
+бюджет запитів: --rate / --concurrency або shard_max_requests_per_second /
+shard_concurrent_requests). Групи студентів шард забирає з WorkQueue під оренду,
+а результати записує туди ж; оренду завдань упалого шарда заберуть інші шарди,
+коли вона спливе. Для кількох машин файл черги має лежати на спільному диску
+з робочими блокуваннями SQLite; інакше кожна машина працює зі своєю копією черги
+і своїм --partition, а результати зливаються merge з кожної копії.
+"""
+import argparse
+import asyncio
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from excel_reader import iter_students_from_excel
+from excel_writer import save_results_to_excel
+from planner import QueryGroup, plan_queries
+from work_queue import DONE, FAILED, LEASED, PENDING, WorkQueue
+
+
+class QueueSink:
+    """
+    Те саме, що ResultSink для run_pipeline, але результати йдуть у WorkQueue.
+
+    Запис у базу пачками (кожні `flush_every` результатів або `flush_interval` секунд):
+    завдання позначається виконаним в одній транзакції з результатами всіх його студентів,
+    тож після падіння шарда незбережені завдання просто обробляться ще раз.
+    """
+
+    def __init__(self, queue: WorkQueue, owner: str, flush_every: int = 50, flush_interval: float = 2.0):
+        self.queue = queue
+        self.owner = owner
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.pending: List[Dict] = []
+        self.finished_tasks: List[int] = []
+        self.recorded = 0
+        self._remaining: Dict[int, int] = {}
+        self._last_flush = time.monotonic()
+
+    def track(self, task_id: int, group: QueryGroup) -> None:
+        for student in group.students:
+            student['task_id'] = task_id
+        self._remaining[task_id] = len(group.students)
+
+    def record(self, student: Dict) -> None:
+        self.pending.append(student)
+        self.recorded += 1
+        task_id = student['task_id']
+        self._remaining[task_id] -= 1
+        if not self._remaining[task_id]:
+            del self._remaining[task_id]
+            self.finished_tasks.append(task_id)
+        if len(self.pending) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self.pending and not self.finished_tasks:
+            return
+        self.queue.complete(self.owner, self.finished_tasks, self.pending)
+        self.pending, self.finished_tasks = [], []
+
+
+def shard_config(config: Dict, name: str, rate: Optional[float] = None, concurrency: Optional[int] = None) -> Dict:
+    """Налаштування одного шарда: власний бюджет запитів і окремі файли логу та метрик."""
+    shard = dict(config)
+    rate = rate or config.get("shard_max_requests_per_second")
+    concurrency = concurrency or config.get("shard_concurrent_requests")
+    if rate:
+        shard["max_requests_per_second"] = rate
+        shard["initial_requests_per_second"] = min(config.get("initial_requests_per_second", 10.0), rate)
+    if concurrency:
+        shard["concurrent_requests"] = concurrency
+        shard["workers"] = concurrency
+        shard["connection_limit_per_host"] = concurrency
+    # Кілька процесів не можуть ротувати один і той самий лог
+    safe_name = re.sub(r'[^\w.-]', '_', name)
+    for key, default in (("log_file", "debug_log.txt"), ("metrics_report_path", "metrics_report.json")):
+        path = config.get(key, default)
+        if path:
+            root, ext = os.path.splitext(path)
+            shard[key] = f"{root}.{safe_name}{ext}"
+    return shard
+
+
+def init_queue(config: Dict, queue: WorkQueue, output_path: str, reset: bool = False) -> int:
+    """Планує запити для студентів без результату і кладе групи в чергу."""
+    from main import prepare_output_file
+
+    counts = queue.counts()
+    if any(c['tasks'] for c in counts.values()) and not reset:
+        print(f"⚠️ Черга '{queue.path}' вже заповнена. Додайте --reset, щоб почати заново.")
+        return 0
+    if reset:
+        queue.reset()
+    if not prepare_output_file(config['excel_file_path'], output_path):
+        return 0
+
+    col_name = config.get("output_column_name", "Результат перевірки")
+    print(f"📖 Читаю дані з файлу '{os.path.basename(output_path)}'...")
+    students = iter_students_from_excel(output_path, engine=config.get("excel_reader_engine"))
+    plan = plan_queries(student for student in students if not student.get(col_name))
+    tasks, student_count = queue.add_groups(plan.groups)
+    print(f"🧮 {plan.summary()}")
+    print(f"📥 У черзі '{queue.path}': {tasks} завдань, {student_count} студентів.")
+    return tasks
+
+
+async def work_async(config: Dict, queue: WorkQueue, owner: str,
+                     partition: Optional[Tuple[int, int]] = None, poll_interval: float = 5.0) -> int:
+    """
+    Один шард: бере групи з черги, поки вони є, і обробляє їх у run_pipeline.
+
+    Коли вільних завдань немає, але інші шарди ще тримають оренду, шард чекає:
+    якщо котрийсь із них упав, його завдання повернуться в чергу після закінчення оренди.
+    """
+    from api_parser import ApiClient
+    from main import _install_stop_handler, run_pipeline
+    from rate_limiter import AdaptiveRateLimiter
+
+    workers = config.get("workers", config.get("concurrent_requests", 5))
+    limiter = AdaptiveRateLimiter.from_config(config)
+    sink = QueueSink(queue, owner)
+    stop = asyncio.Event()
+    total = queue.counts()[PENDING]['students']
+
+    async def claimed_groups() -> AsyncIterator[QueryGroup]:
+        while not stop.is_set():
+            batch = queue.claim(owner, workers, partition)
+            if not batch:
+                sink.flush()
+                if not queue.leased_tasks(partition):
+                    return
+                await asyncio.sleep(min(poll_interval, queue.lease_seconds / 4))
+                continue
+            for task_id, group in batch:
+                sink.track(task_id, group)
+                yield group
+
+    async def heartbeat() -> None:
+        while True:
+            await asyncio.sleep(queue.lease_seconds / 3)
+            queue.heartbeat(owner)
+
+    print(f"🚚 Шард '{owner}': {workers} воркерів, до {config.get('max_requests_per_second', 100)} зап/с"
+          + (f", розділ {partition[0]}/{partition[1]}" if partition else ""))
+    remove_stop_handler = _install_stop_handler(stop)
+    heartbeat_task = asyncio.create_task(heartbeat())
+    try:
+        async with ApiClient.from_config(config) as client:
+            processed = await run_pipeline(
+                claimed_groups(), limiter, client, sink, workers, total, stop,
+                early_exit=config.get("early_exit_pagination", True),
+                dashboard_interval=config.get("dashboard_interval_sec", 1.0)
+            )
+            print(f"\n📊 {client.cache_summary()}")
+    finally:
+        heartbeat_task.cancel()
+        remove_stop_handler()
+        sink.flush()
+        released = queue.release(owner)
+        if released:
+            print(f"↩️ Повернуто в чергу {released} незавершених завдань.")
+    print(f"✅ Шард '{owner}' обробив {processed} студентів.")
+    return processed
+
+
+def merge_results(config: Dict, queue: WorkQueue, output_path: str) -> int:
+    """Переносить усі результати з черги в Excel одним збереженням."""
+    results = list(queue.iter_results())
+    if not results:
+        print("Немає результатів для перенесення.")
+        return 0
+    col_name = config.get("output_column_name", "Результат перевірки")
+    mode = config.get("excel_writer_mode", "xml_patch")
+    if not save_results_to_excel(output_path, results, col_name, mode):
+        return 0
+    print(f"📦 Перенесено {len(results)} результатів у '{output_path}'.")
+    print_status(queue)
+    return len(results)
+
+
+def print_status(queue: WorkQueue) -> None:
+    counts = queue.counts()
+    labels = {PENDING: "очікують", LEASED: "в роботі", DONE: "виконано", FAILED: "не вдалося"}
+    print(" | ".join(f"{labels[state]}: {c['tasks']} завд. / {c['students']} студ." for state, c in counts.items()))
+    now = time.time()
+    for owner, tasks, lease_until in queue.owners():
+        state = "оренда спливла" if lease_until < now else f"оренда ще {lease_until - now:.0f} с"
+        print(f"   шард '{owner}': {tasks} завдань ({state})")
+    if counts[FAILED]['tasks']:
+        print("⚠️ Частина завдань не вдалася після кількох падінь шардів; `python main.py shard requeue` поверне їх у чергу.")
+
+
+def _parse_partition(value: str) -> Tuple[int, int]:
+    match = re.fullmatch(r'(\d+)/(\d+)', value)
+    if not match or int(match.group(1)) >= int(match.group(2)):
+        raise argparse.ArgumentTypeError("очікується K/N, де 0 <= K < N")
+    return int(match.group(1)), int(match.group(2))
+
+
+def add_shard_arguments(parser: argparse.ArgumentParser) -> None:
+    sub = parser.add_subparsers(dest='shard_command', required=True)
+    parser.add_argument('--queue', help="файл черги (за замовчуванням shard_queue_path з config.json)")
+
+    init = sub.add_parser('init', help="заповнити чергу студентами без результату")
+    init.add_argument('--reset', action='store_true', help="очистити чергу і результати в ній")
+
+    work = sub.add_parser('work', help="обробляти завдання з черги")
+    work.add_argument('--name', help="ім'я шарда (за замовчуванням хост-pid)")
+    work.add_argument('--processes', type=int, default=1, help="скільки шардів запустити на цій машині")
+    work.add_argument('--rate', type=float, help="максимум запитів/с для кожного шарда")
+    work.add_argument('--concurrency', type=int, help="одночасних запитів у кожного шарда")
+    work.add_argument('--partition', type=_parse_partition, help="брати лише завдання розділу K/N (за хешем запиту)")
+
+    sub.add_parser('status', help="стан черги і шардів")
+    sub.add_parser('requeue', help="повернути в чергу завдання зі статусом failed")
+    sub.add_parser('merge', help="перенести результати з черги в Excel")
+
+
+def run_shard_command(args: argparse.Namespace, config: Dict, output_path: str) -> int:
+    """Виконує `shard <команда>`; повертає код виходу процесу."""
+    queue = WorkQueue.from_config(config, args.queue)
+    try:
+        if args.shard_command == 'init':
+            return 0 if init_queue(config, queue, output_path, args.reset) else 1
+        if args.shard_command == 'status':
+            print_status(queue)
+            return 0
+        if args.shard_command == 'requeue':
+            print(f"↩️ Повернуто в чергу {queue.requeue_failed()} завдань.")
+            return 0
+        if args.shard_command == 'merge':
+            return 0 if merge_results(config, queue, output_path) else 1
+        if args.processes > 1:
+            return 1 if _spawn_shards(args) else 0
+        _run_worker(args, config, queue)
+        return 0
+    finally:
+        queue.close()
+
+
+def _run_worker(args: argparse.Namespace, config: Dict, queue: WorkQueue) -> int:
+    from logging_setup import setup_logging_from_config
+    from metrics import registry as metrics
+
+    name = args.name or f"{socket.gethostname()}-{os.getpid()}"
+    config = shard_config(config, name, args.rate, args.concurrency)
+    stop_logging = setup_logging_from_config(config)
+    try:
+        return asyncio.run(work_async(config, queue, name, args.partition))
+    finally:
+        if config.get("metrics_report_path") and metrics.histograms:
+            metrics.write_report(config["metrics_report_path"])
+        stop_logging()
+
+
+def _spawn_shards(args: argparse.Namespace) -> int:
+    """Запускає --processes дочірніх `shard work` з іменами <хост>-1..N і чекає на них."""
+    base = args.name or socket.gethostname()
+    command = [sys.executable, os.path.abspath(sys.argv[0]), 'shard']
+    if args.queue:
+        command += ['--queue', args.queue]
+    command.append('work')
+    for flag, value in (('--rate', args.rate), ('--concurrency', args.concurrency)):
+        if value:
+            command += [flag, str(value)]
+    if args.partition:
+        command += ['--partition', f"{args.partition[0]}/{args.partition[1]}"]
+
+    children = [subprocess.Popen(command + ['--name', f"{base}-{number}"], stdout=subprocess.DEVNULL)
+                for number in range(1, args.processes + 1)]
+    print(f"🚀 Запущено {len(children)} шардів. Прогрес: python main.py shard status")
+    failed = 0
+    try:
+        for child in children:
+            failed += child.wait() != 0
+    except KeyboardInterrupt:
+        # Ctrl+C отримують і дочірні процеси (та сама група): чекаємо, поки вони віддадуть оренду
+        for child in children:
+            child.wait()
+    if failed:
+        print(f"⚠️ {failed} шардів завершились з помилкою; їхні завдання заберуть інші після закінчення оренди.")
+    return failed
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# Модулі проєкту лежать у корені репозиторію, без пакета
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,91 @@
+# tests/test_matching.py
+"""Семантика main._match_student на ApplicationIndex: допуск балу, спеціальність, крайові бали."""
+import math
+
+import pytest
+
+from application import Application, ApplicationIndex
+from main import _match_student
+
+SCORES = {'Українська мова': 180, 'Математика': 170, 'Англійська мова': 160}
+
+
+def make_app(score, specialty='F2', scores=None, originals=False) -> Application:
+    return Application.from_dict({
+        'degree_level_short': 'Б', 'degree_level_full': 'Бакалавр', 'applicant_name': 'Шевченко О. В.',
+        'status': 'Допущено', 'rank_position': 1, 'rank_url': '', 'priority': '1', 'places': {'total': 30},
+        'total_score': score, 'avg_document_score': '9,5',
+        'score_components': SCORES if scores is None else scores, 'coefficients': {'РК': '1.0'},
+        'university_name': 'КНУ', 'university_url': '', 'faculty_short': 'ФІТ', 'faculty_full': 'Факультет',
+        'specialty_code': specialty, 'specialty_name': '', 'specialization': '', 'quota': '',
+        'originals_submitted': originals,
+    })
+
+
+def match(apps, score, specialty_code=None) -> str:
+    index = apps if apps is None else ApplicationIndex(apps)
+    return _match_student({'score': score, 'specialty_code': specialty_code}, index)
+
+
+def test_no_pages_and_empty_result():
+    assert match(None, 180.0) == "Не знайдено жодної заяви"
+    assert match([], 180.0) == "Не знайдено. Треба дзвонити"
+
+
+@pytest.mark.parametrize('factor, found', [
+    (1 + 0.99e-5, True),
+    (1 - 0.99e-5, True),
+    (1 + 1.01e-5, False),
+    (1 - 1.01e-5, False),
+])
+def test_isclose_boundary(factor, found):
+    apps = [make_app(187.125)]
+    expected = "Потрібно дзвонити" if found else "Знайдено, але не ідентифіковано"
+    assert match(apps, 187.125 * factor) == expected
+    # Бал з Excel може прийти рядком
+    assert match(apps, str(187.125 * factor)) == expected
+
+
+def test_bucket_edge_scores():
+    # Бали по різні боки межі кошика індексу (ширина 0.01)
+    apps = [make_app(149.99999), make_app(150.00001, scores={'Математика': 150}, originals=True)]
+    assert match(apps, 150.0) == "Потрібно дзвонити"
+    assert match(apps, 150.00001) == "Потрібно дзвонити"
+
+
+@pytest.mark.parametrize('specialty_code', [None, ''])
+def test_empty_specialty_matches_first_app_in_order(specialty_code):
+    other = {'Математика': 150}
+    apps = [make_app(175.5, 'D1', scores=other), make_app(175.5, 'F2', originals=True)]
+    assert match(apps, 175.5, specialty_code) == "Потрібно дзвонити"
+
+
+def test_specialty_filters_reference():
+    other = {'Математика': 150}
+    apps = [make_app(175.5, 'D1', scores=other), make_app(175.5, 'F2', originals=True)]
+    assert match(apps, 175.5, 'F2') == "Вже визначився"
+    assert match(apps, 175.5, 'X9') == "Знайдено, але не ідентифіковано"
+
+
+@pytest.mark.parametrize('score', [float('nan'), 'abc', None, '190,5', float('inf')])
+def test_irregular_student_score_is_not_identified(score):
+    apps = [make_app(190.5), make_app(float('nan'), scores={'Математика': 150})]
+    assert match(apps, score) == "Знайдено, але не ідентифіковано"
+
+
+def test_irregular_app_scores_do_not_break_lookup():
+    apps = [make_app(math.inf, scores={'Математика': 150}), make_app(float('nan')), make_app(0.0, originals=True)]
+    assert match(apps, 0) == "Вже визначився"
+    assert match(apps, math.inf) == "Потрібно дзвонити"
+
+
+def test_empty_fingerprint():
+    assert match([make_app(160.0, scores={})], 160.0) == "Не вдалось отримати бали НМТ"
+
+
+def test_originals_in_another_application_with_same_scores():
+    other = {'Математика': 150}
+    apps = [make_app(160.0, 'F2'), make_app(162.5, 'D1', originals=True), make_app(160.0, 'F3', scores=other)]
+    assert match(apps, 160.0, 'F2') == "Вже визначився"
+    # Оригінали в заяві з іншими балами НМТ не рахуються
+    assert match(apps, 160.0, 'F3') == "Потрібно дзвонити"
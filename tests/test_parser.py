@@ -0,0 +1,27 @@
+# tests/test_parser.py
+"""
+Еталонний вивід parse_applications на сторінці з крайовими випадками.
+
+Очікуваний JSON (форма Application.to_dict()) записано з розбору сторінки вихідним
+парсером на BeautifulSoup, тож помилку, спільну для обох движків, тест теж помітить.
+"""
+import json
+import os
+
+import pytest
+
+from api_parser import PARSER_BACKENDS, parse_applications
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+
+
+def _read(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('backend', PARSER_BACKENDS)
+def test_edge_cases_match_golden_output(backend):
+    expected = json.loads(_read('statements_edge_cases.expected.json'))
+    applications = parse_applications(_read('statements_edge_cases.html'), backend)
+    assert [app.to_dict() for app in applications] == expected
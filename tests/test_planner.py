@@ -0,0 +1,51 @@
+# tests/test_planner.py
+"""Групування запитів: plan_queries по всьому входу і QueryPlanner вікнами."""
+from planner import QueryPlanner, normalize_query, plan_queries
+
+
+def students(*names):
+    return [{'index': index, 'search_name': name} for index, name in enumerate(names)]
+
+
+def test_normalize_query():
+    assert normalize_query("  Шевченко   Т.  Г. ") == normalize_query("шевченко т. г.")
+
+
+def test_plan_queries_groups_in_first_seen_order():
+    plan = plan_queries(students("Коваль О. В.", "Шевченко  Т. Г.", "коваль о. в."))
+    assert [group.query for group in plan.groups] == ["Коваль О. В.", "Шевченко Т. Г."]
+    assert [len(group.students) for group in plan.groups] == [2, 1]
+    assert plan.requests_saved == 1
+
+
+def test_planner_reads_one_window_at_a_time():
+    source = iter(students(*(f"Прізвище{i} О. В." for i in range(10))))
+    planner = QueryPlanner(source, window=4)
+    assert len(planner.next_window()) == 4
+    # Решта входу ще не прочитана
+    assert len(list(source)) == 6
+    assert planner.total is None
+
+
+def test_late_duplicate_joins_waiting_group():
+    planner = QueryPlanner(students("Коваль О. В.", "Шевченко Т. Г.", "КОВАЛЬ О. В."), window=2)
+    first = planner.next_window()
+    assert planner.next_window() == []
+    assert [student['index'] for student in first[0].students] == [0, 2]
+    assert planner.exhausted and planner.total == 3 and planner.groups == 2
+
+
+def test_late_duplicate_of_started_group_gets_new_group():
+    planner = QueryPlanner(students("Коваль О. В.", "Шевченко Т. Г.", "Коваль О. В."), window=2)
+    first = planner.next_window()
+    first[0].started = True
+    second = planner.next_window()
+    assert [group.query for group in second] == ["Коваль О. В."]
+    assert [student['index'] for student in first[0].students] == [0]
+    assert planner.groups == 3 and planner.requests_saved == 0 and planner.refetched == 1
+
+
+def test_iteration_yields_every_student_once():
+    names = [f"Прізвище{i % 7} О. В." for i in range(50)]
+    groups = list(QueryPlanner(students(*names), window=8))
+    assert sorted(student['index'] for group in groups for student in group.students) == list(range(50))
@@ -0,0 +1,196 @@
+# work_queue.py
+"""
+Спільна черга завдань у SQLite для шардованого запуску (див. sharding.py).
+
+Завдання — одна група студентів з однаковим запитом (planner.QueryGroup). Шард забирає
+завдання пачкою під оренду (lease) на `lease_seconds` і періодично її продовжує.
+Якщо процес шарда впав, оренда спливає, і завдання знову стають доступними
+іншим шардам; після `max_attempts` таких повторів завдання позначається як failed,
+щоб одне «отруйне» завдання не валило шарди по колу.
+
+Результати пишуться в ту ж базу (по студенту) і потім переносяться в Excel командою merge.
+Захоплення завдань — транзакція BEGIN IMMEDIATE, тож кілька процесів на одній машині
+(або на спільному диску з коректними блокуваннями) не заберуть одне завдання двічі.
+"""
+import json
+import sqlite3
+import time
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from planner import QueryGroup, normalize_query
+
+PENDING, LEASED, DONE, FAILED = 'pending', 'leased', 'done', 'failed'
+
+# Поля студента, потрібні для обробки; решта рядка Excel у черзі не зберігається
+STUDENT_FIELDS = ('index', 'search_name', 'score', 'specialty_code')
+
+
+def partition_of(query: str, partitions: int) -> int:
+    """Стабільний між процесами і машинами номер розділу запиту (hash() у Python рандомізований)."""
+    return zlib.crc32(normalize_query(query).encode('utf-8')) % partitions
+
+
+class WorkQueue:
+    def __init__(self, path: str, lease_seconds: float = 120, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._conn = sqlite3.connect(path, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " id INTEGER PRIMARY KEY, query TEXT NOT NULL, students TEXT NOT NULL, student_count INTEGER NOT NULL,"
+            " bucket INTEGER NOT NULL, state TEXT NOT NULL, owner TEXT, lease_until REAL,"
+            " attempts INTEGER NOT NULL DEFAULT 0, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, lease_until)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " student_index INTEGER PRIMARY KEY, search_name TEXT, final_result TEXT NOT NULL,"
+            " task_id INTEGER NOT NULL, owner TEXT, finished_at REAL NOT NULL)"
+        )
+
+    @classmethod
+    def from_config(cls, config: Dict, path: Optional[str] = None) -> 'WorkQueue':
+        return cls(
+            path=path or config.get("shard_queue_path", "shard_queue.sqlite"),
+            lease_seconds=config.get("shard_lease_sec", 120),
+            max_attempts=config.get("shard_max_attempts", 3),
+        )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def reset(self) -> None:
+        self._conn.execute("DELETE FROM tasks")
+        self._conn.execute("DELETE FROM results")
+
+    def add_groups(self, groups: Iterable[QueryGroup], partitions: int = 1024) -> Tuple[int, int]:
+        """Додає завдання; повертає (завдань, студентів). `bucket` — для розбиття за хешем (--partition)."""
+        now = time.time()
+        tasks = students = 0
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            for group in groups:
+                payload = [{key: student.get(key) for key in STUDENT_FIELDS} for student in group.students]
+                self._conn.execute(
+                    "INSERT INTO tasks (query, students, student_count, bucket, state, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (group.query, json.dumps(payload, ensure_ascii=False), len(payload),
+                     partition_of(group.query, partitions), PENDING, now),
+                )
+                tasks += 1
+                students += len(payload)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return tasks, students
+
+    def claim(self, owner: str, limit: int, partition: Optional[Tuple[int, int]] = None) -> List[Tuple[int, QueryGroup]]:
+        """
+        Забирає до `limit` вільних завдань під оренду `owner`.
+
+        Спершу повертає в чергу завдання з простроченою орендою (шард упав або завис).
+        `partition` = (k, n) обмежує вибір завданнями, у яких bucket % n == k.
+        """
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._reclaim_expired(now)
+            sql = "SELECT id, query, students FROM tasks WHERE state = ?"
+            params: list = [PENDING]
+            if partition is not None:
+                sql += " AND bucket % ? = ?"
+                params += [partition[1], partition[0]]
+            rows = self._conn.execute(sql + " ORDER BY id LIMIT ?", params + [limit]).fetchall()
+            self._conn.executemany(
+                "UPDATE tasks SET state = ?, owner = ?, lease_until = ?, updated_at = ? WHERE id = ?",
+                [(LEASED, owner, now + self.lease_seconds, now, task_id) for task_id, _, _ in rows],
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return [(task_id, QueryGroup(query, json.loads(students))) for task_id, query, students in rows]
+
+    def _reclaim_expired(self, now: float) -> None:
+        self._conn.execute(
+            "UPDATE tasks SET state = CASE WHEN attempts + 1 >= ? THEN ? ELSE ? END,"
+            " attempts = attempts + 1, owner = NULL, lease_until = NULL, updated_at = ?"
+            " WHERE state = ? AND lease_until < ?",
+            (self.max_attempts, FAILED, PENDING, now, LEASED, now),
+        )
+
+    def heartbeat(self, owner: str) -> int:
+        """Продовжує оренду всіх завдань шарда; повертає їх кількість."""
+        now = time.time()
+        cursor = self._conn.execute(
+            "UPDATE tasks SET lease_until = ?, updated_at = ? WHERE state = ? AND owner = ?",
+            (now + self.lease_seconds, now, LEASED, owner),
+        )
+        return cursor.rowcount
+
+    def complete(self, owner: str, task_ids: Iterable[int], students: Iterable[Dict]) -> None:
+        """Одна транзакція: результати студентів і позначка done для завершених завдань."""
+        now = time.time()
+        results = [(s['index'], s.get('search_name'), s['final_result'], s['task_id'], owner, now) for s in students]
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results (student_index, search_name, final_result, task_id, owner, finished_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)", results,
+            )
+            # Якщо оренду встигли забрати, результат однаково зараховується: повторна обробка дасть те саме
+            self._conn.executemany(
+                "UPDATE tasks SET state = ?, owner = ?, lease_until = NULL, updated_at = ? WHERE id = ?",
+                [(DONE, owner, now, task_id) for task_id in task_ids],
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def release(self, owner: str) -> int:
+        """Повертає в чергу незавершені завдання шарда (м'яка зупинка)."""
+        cursor = self._conn.execute(
+            "UPDATE tasks SET state = ?, owner = NULL, lease_until = NULL, updated_at = ? WHERE state = ? AND owner = ?",
+            (PENDING, time.time(), LEASED, owner),
+        )
+        return cursor.rowcount
+
+    def requeue_failed(self) -> int:
+        """Дає завданням зі статусом failed ще одну серію спроб."""
+        cursor = self._conn.execute(
+            "UPDATE tasks SET state = ?, attempts = 0, updated_at = ? WHERE state = ?", (PENDING, time.time(), FAILED),
+        )
+        return cursor.rowcount
+
+    def leased_tasks(self, partition: Optional[Tuple[int, int]] = None) -> int:
+        sql, params = "SELECT COUNT(*) FROM tasks WHERE state = ?", [LEASED]
+        if partition is not None:
+            sql += " AND bucket % ? = ?"
+            params += [partition[1], partition[0]]
+        return self._conn.execute(sql, params).fetchone()[0]
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """{стан: {'tasks': ..., 'students': ...}} для всіх станів."""
+        counts = {state: {'tasks': 0, 'students': 0} for state in (PENDING, LEASED, DONE, FAILED)}
+        for state, tasks, students in self._conn.execute(
+                "SELECT state, COUNT(*), COALESCE(SUM(student_count), 0) FROM tasks GROUP BY state"):
+            counts[state] = {'tasks': tasks, 'students': students}
+        return counts
+
+    def owners(self) -> List[Tuple[str, int, float]]:
+        """(шард, завдань в оренді, до якого часу оренда) для активних шардів."""
+        return self._conn.execute(
+            "SELECT owner, COUNT(*), MAX(lease_until) FROM tasks WHERE state = ? GROUP BY owner ORDER BY owner",
+            (LEASED,),
+        ).fetchall()
+
+    def iter_results(self) -> Iterator[Dict]:
+        for index, search_name, final_result in self._conn.execute(
+                "SELECT student_index, search_name, final_result FROM results ORDER BY student_index"):
+            yield {'index': index, 'search_name': search_name, 'final_result': final_result}
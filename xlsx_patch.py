@@ -0,0 +1,207 @@
+# xlsx_patch.py
+"""
+Точкове оновлення одного стовпця аркуша .xlsx без openpyxl.
+
+XML активного аркуша правиться як текст: змінюються лише рядки з новими значеннями,
+клітинки пишуться як inlineStr (sharedStrings.xml не чіпається), стиль клітинки
+зберігається. Решта частин архіву копіюється як є, а готовий файл атомарно
+замінює старий. Якщо аркуш має незвичну будову (префікси просторів імен, рядки
+чи клітинки без атрибута r, не UTF-8), піднімається UnsupportedSheetError —
+тоді варто зберегти через openpyxl.
+"""
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from typing import Dict, List, Optional, Tuple
+from html import escape
+
+from xlsx_stream import active_sheet_path, column_index, column_letters, iter_rows
+
+
+class UnsupportedSheetError(ValueError):
+    """Аркуш не можна безпечно оновити текстовою правкою XML."""
+
+
+_ROW_RE = re.compile(r'<row\b([^>]*?)(/?)>')
+_CELL_RE = re.compile(r'<c\b([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+_ROW_NUMBER_RE = re.compile(r'\br="(\d+)"')
+_CELL_REF_RE = re.compile(r'\br="([A-Z]+)(\d+)"')
+_CELL_LETTERS_RE = re.compile(r'<c\b[^>]*?\br="([A-Z]+)\d+"')
+_STYLE_RE = re.compile(r'\bs="\d+"')
+_SPANS_RE = re.compile(r'\bspans="(\d+):(\d+)"')
+_DIMENSION_RE = re.compile(r'<dimension\s+ref="([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?"')
+_ENCODING_RE = re.compile(r'<\?xml[^>]*encoding="([^"]+)"')
+# Керівні символи заборонені в XML 1.0 (openpyxl на них падає з IllegalCharacterError)
+_ILLEGAL_XML_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def read_layout(path: str) -> Tuple[List[Optional[object]], int]:
+    """
+    Перший рядок активного аркуша (None для порожніх клітинок) і номер останнього стовпця,
+    як sheet[1] і sheet.max_column в openpyxl.
+    """
+    header: List[Optional[object]] = []
+    rows = iter_rows(path)
+    try:
+        for row_number, values in rows:
+            if row_number == 1:
+                header = [values.get(i) for i in range(1, max(values) + 1)]
+            break
+    finally:
+        rows.close()
+
+    with zipfile.ZipFile(path) as archive:
+        with archive.open(active_sheet_path(archive)) as sheet:
+            head = sheet.read(64 * 1024).decode('utf-8', errors='ignore')
+        match = _DIMENSION_RE.search(head)
+        if match:
+            max_column = column_index(match.group(3) or match.group(1))
+        else:
+            # Без <dimension> доводиться пройти всі клітинки; різних літер стовпців небагато
+            text = archive.read(active_sheet_path(archive)).decode('utf-8', errors='ignore')
+            max_column = max(map(column_index, set(_CELL_LETTERS_RE.findall(text))), default=0)
+    return header, max(max_column, len(header))
+
+
+def patch_column(path: str, column: int, values: Dict[int, str]) -> None:
+    """Записує `values` ({номер рядка в Excel: текст}) у стовпець `column` (з 1) активного аркуша."""
+    directory = os.path.dirname(os.path.abspath(path))
+    with zipfile.ZipFile(path) as source:
+        sheet_path = active_sheet_path(source)
+        raw = source.read(sheet_path)
+        encoding = _ENCODING_RE.search(raw[:200].decode('ascii', errors='ignore'))
+        if encoding and encoding.group(1).lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            raise UnsupportedSheetError(f"кодування аркуша {encoding.group(1)}")
+        patched = patch_sheet_xml(raw.decode('utf-8'), column, values).encode('utf-8')
+
+        fd, tmp_path = tempfile.mkstemp(suffix='.xlsx', dir=directory)
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(tmp_path, 'w', allowZip64=True) as target:
+                for info in source.infolist():
+                    if info.filename == sheet_path:
+                        target.writestr(info, patched)
+                        continue
+                    with source.open(info) as src, target.open(info, 'w') as dst:
+                        shutil.copyfileobj(src, dst, 1024 * 1024)
+            shutil.copymode(path, tmp_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, path)
+
+
+def patch_sheet_xml(text: str, column: int, values: Dict[int, str]) -> str:
+    """Повертає XML аркуша з підставленими значеннями (див. patch_column)."""
+    data_start = text.find('<sheetData')
+    if data_start < 0:
+        raise UnsupportedSheetError("не знайдено <sheetData> без префікса простору імен")
+    data_open_end = text.index('>', data_start) + 1
+    if text[data_open_end - 2] == '/':
+        # Порожній аркуш: <sheetData/> -> <sheetData></sheetData>
+        text = text[:data_open_end - 2] + '></sheetData>' + text[data_open_end:]
+        data_open_end -= 1
+    data_end = text.index('</sheetData>', data_open_end)
+
+    letters = column_letters(column)
+    pending = sorted(values)
+    parts = [text[:data_open_end]]
+    position = data_open_end
+    next_index = 0
+
+    for match in _ROW_RE.finditer(text, data_open_end, data_end):
+        if next_index >= len(pending):
+            break
+        number_match = _ROW_NUMBER_RE.search(match.group(1))
+        if number_match is None:
+            raise UnsupportedSheetError("рядок без атрибута r")
+        row_number = int(number_match.group(1))
+
+        # Рядки, яких в аркуші немає, вставляються перед першим рядком з більшим номером
+        while next_index < len(pending) and pending[next_index] < row_number:
+            parts.append(text[position:match.start()])
+            position = match.start()
+            parts.append(_new_row(pending[next_index], letters, column, values[pending[next_index]]))
+            next_index += 1
+        if next_index >= len(pending) or pending[next_index] != row_number:
+            continue
+
+        if match.group(2):
+            row_end, inner = match.end(), ''
+        else:
+            close = text.index('</row>', match.end())
+            row_end, inner = close + len('</row>'), text[match.end():close]
+        parts.append(text[position:match.start()])
+        parts.append(_patched_row(match.group(1), inner, row_number, letters, column, values[row_number]))
+        position = row_end
+        next_index += 1
+
+    parts.append(text[position:data_end])
+    for row_number in pending[next_index:]:
+        parts.append(_new_row(row_number, letters, column, values[row_number]))
+    parts.append(text[data_end:])
+    return _update_dimension(''.join(parts), column, pending[-1] if pending else 0)
+
+
+def _inline_cell(ref: str, style: str, value: str) -> str:
+    text = escape(_ILLEGAL_XML_RE.sub('', str(value)), quote=False)
+    return f'<c r="{ref}"{style} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _new_row(row_number: int, letters: str, column: int, value: str) -> str:
+    return (f'<row r="{row_number}" spans="{column}:{column}">'
+            f'{_inline_cell(f"{letters}{row_number}", "", value)}</row>')
+
+
+def _patched_row(attributes: str, inner: str, row_number: int, letters: str, column: int, value: str) -> str:
+    ref = f"{letters}{row_number}"
+    existing = inner.find(f' r="{ref}"')
+    if existing >= 0:
+        # Клітинка вже є: стиль (формат, заливка) лишається, значення і тип — нові
+        cell = _CELL_RE.match(inner, inner.rfind('<c', 0, existing))
+        if cell is None or cell.end(1) < existing:
+            raise UnsupportedSheetError(f"не вдалося розібрати клітинку {ref}")
+        style = _STYLE_RE.search(cell.group(1))
+        cells = [inner[:cell.start()], _inline_cell(ref, f" {style.group(0)}" if style else "", value), inner[cell.end():]]
+    else:
+        insert_at = _insert_position(inner, row_number, column)
+        cells = [inner[:insert_at], _inline_cell(ref, "", value), inner[insert_at:]]
+
+    spans = _SPANS_RE.search(attributes)
+    if spans:
+        first, last = int(spans.group(1)), int(spans.group(2))
+        attributes = (attributes[:spans.start()] + f'spans="{min(first, column)}:{max(last, column)}"'
+                      + attributes[spans.end():])
+    return f'<row{attributes}>{"".join(cells)}</row>'
+
+
+def _insert_position(inner: str, row_number: int, column: int) -> int:
+    """Позиція нової клітинки в рядку: перед першою клітинкою з більшим номером стовпця."""
+    # Найчастіше стовпець результатів правіше за всі наявні — досить глянути на останню клітинку
+    last = inner.rfind('<c')
+    if last < 0 or _cell_column(_CELL_RE.match(inner, last), row_number) < column:
+        return len(inner)
+    for cell in _CELL_RE.finditer(inner):
+        if _cell_column(cell, row_number) > column:
+            return cell.start()
+    return len(inner)
+
+
+def _cell_column(cell, row_number: int) -> int:
+    ref_match = _CELL_REF_RE.search(cell.group(1)) if cell is not None else None
+    if ref_match is None:
+        raise UnsupportedSheetError(f"клітинка без атрибута r у рядку {row_number}")
+    return column_index(ref_match.group(1))
+
+
+def _update_dimension(text: str, column: int, last_row: int) -> str:
+    match = _DIMENSION_RE.search(text, 0, text.find('<sheetData'))
+    if match is None:
+        return text
+    first_letters, first_row = match.group(1), int(match.group(2))
+    last_letters = match.group(3) or first_letters
+    last_row = max(last_row, int(match.group(4) or first_row))
+    last_letters = column_letters(max(column_index(last_letters), column))
+    return f'{text[:match.start()]}<dimension ref="{first_letters}{first_row}:{last_letters}{last_row}"{text[match.end():]}'
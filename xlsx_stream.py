@@ -0,0 +1,137 @@
+# xlsx_stream.py
+"""
+Потокове читання аркуша .xlsx напряму з XML усередині zip-архіву.
+
+Розбираються лише потрібні стовпці, без побудови об'єктів клітинок openpyxl.
+Використовує тільки стандартну бібліотеку, тож годиться і для легких команд.
+"""
+import posixpath
+import re
+import zipfile
+from typing import IO, Dict, Iterator, List, Optional, Tuple, Union
+from xml.etree import ElementTree
+
+NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+_CELL_REF_RE = re.compile(r'([A-Z]+)(\d+)')
+
+
+def column_index(letters: str) -> int:
+    """'A' -> 1, 'Z' -> 26, 'AA' -> 27."""
+    index = 0
+    for char in letters:
+        index = index * 26 + (ord(char) - 64)
+    return index
+
+
+def column_letters(index: int) -> str:
+    """1 -> 'A', 27 -> 'AA'."""
+    letters = ''
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def active_sheet_path(archive: zipfile.ZipFile) -> str:
+    """Шлях до XML активного аркуша (як workbook.active в openpyxl)."""
+    workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+    view = workbook.find(f'{NS}bookViews/{NS}workbookView')
+    active = int(view.get('activeTab', 0)) if view is not None else 0
+    sheets = workbook.findall(f'{NS}sheets/{NS}sheet')
+    rel_id = sheets[min(active, len(sheets) - 1)].get(f'{REL_NS}id')
+
+    rels = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    for rel in rels.iter(f'{PKG_REL_NS}Relationship'):
+        if rel.get('Id') == rel_id:
+            target = rel.get('Target')
+            return target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+    raise KeyError(f"Не знайдено аркуш з id '{rel_id}' у книзі")
+
+
+def shared_strings(archive: zipfile.ZipFile) -> List[str]:
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    strings = []
+    with archive.open('xl/sharedStrings.xml') as f:
+        for _, element in ElementTree.iterparse(f):
+            if element.tag == f'{NS}si':
+                strings.append(_rich_text(element))
+                element.clear()
+    return strings
+
+
+def _rich_text(element) -> str:
+    # Текст — або <t> напряму, або склеєні <r><t>; фонетичні підказки <rPh> пропускаємо
+    direct = element.find(f'{NS}t')
+    if direct is not None:
+        return direct.text or ''
+    return ''.join(t.text or '' for t in element.findall(f'{NS}r/{NS}t'))
+
+
+def _cell_value(cell, strings: List[str]):
+    cell_type = cell.get('t', 'n')
+    if cell_type == 'inlineStr':
+        inline = cell.find(f'{NS}is')
+        return _rich_text(inline) if inline is not None else None
+    raw = cell.findtext(f'{NS}v')
+    if raw is None:
+        return None
+    if cell_type == 's':
+        return strings[int(raw)]
+    if cell_type == 'n':
+        # Так само, як openpyxl: ціле, якщо немає дробової частини чи експоненти
+        return float(raw) if ('.' in raw or 'E' in raw or 'e' in raw) else int(raw)
+    if cell_type == 'b':
+        return raw == '1'
+    return raw
+
+
+def iter_rows(path: Union[str, IO[bytes]], columns: Optional[Dict[int, str]] = None) -> Iterator[Tuple[int, Dict]]:
+    """
+    Віддає (номер рядка в Excel, {ім'я: значення}) для кожного непорожнього рядка активного аркуша.
+
+    `columns` — {номер стовпця (з 1): ім'я}; якщо не задано, повертаються всі стовпці
+    з ключами-номерами. Рядки без жодного значення у вибраних стовпцях пропускаються.
+    """
+    with zipfile.ZipFile(path) as archive:
+        strings = shared_strings(archive)
+        with archive.open(active_sheet_path(archive)) as sheet:
+            row_number = 0
+            sheet_data = None
+            for event, element in ElementTree.iterparse(sheet, events=('start', 'end')):
+                if event == 'start':
+                    if element.tag == f'{NS}sheetData':
+                        sheet_data = element
+                    continue
+                if element.tag != f'{NS}row':
+                    continue
+                row_number = int(element.get('r', row_number + 1))
+                values = {}
+                position = 0
+                for cell in element.iter(f'{NS}c'):
+                    ref = cell.get('r')
+                    match = _CELL_REF_RE.match(ref) if ref else None
+                    position = column_index(match.group(1)) if match else position + 1
+                    key = position if columns is None else columns.get(position)
+                    if key is None:
+                        continue
+                    value = _cell_value(cell, strings)
+                    if value is not None:
+                        values[key] = value
+                # Розібрані рядки одразу викидаємо з дерева: пам'ять не росте з розміром аркуша
+                element.clear()
+                if sheet_data is not None:
+                    sheet_data.remove(element)
+                if values:
+                    yield row_number, values
+
+
+def read_header(path: Union[str, IO[bytes]]) -> List[str]:
+    """Значення першого рядка як рядки ('' для порожніх клітинок)."""
+    for row_number, values in iter_rows(path):
+        width = max(values)
+        return [str(values[i]).strip() if i in values else '' for i in range(1, width + 1)]
+    return []